@@ -1,17 +1,83 @@
 from __future__ import annotations
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 import streamlit as st
-import re
 import numpy as np
-from scipy.stats import poisson
 from streamlit_autorefresh import st_autorefresh
-from typing import Dict, List
+from typing import Dict
 import time
+import bisect
+import hashlib
+import json
+import os
+import threading
+import random
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from nucleo import (
+    COLUNAS_MERCADOS_EXIBICAO, COLUNAS_NUMERICAS_PREVISOES, MEIA_VIDA_AVALIACAO, MODELO_LAMBDA, MODO_PREVISAO,
+    MODO_REDE, NUM_SIMULACOES, VERSAO_CACHE,
+    AvaliacoesJogadores, CacheDisco, CachePrevisoes, GravacoesPaginas, HistoricoResultados, IndiceJogos, Medicao,
+    Predicado, agora_fontes, colunas_numericas, etapa, extrair_linhas_tabela, filtrar_previsoes, formatar_porcentagem,
+    formatar_porcentagem_radar, formatar_porcentagem_sem_icone, gravar_retrato_arrow, interpretar_filtro,
+    ler_retrato_arrow, montar_resultados, prever_em_blocos
+)
 
 URL = "https://www.aceodds.com/pt/bet365-transmissao-ao-vivo.html"
 URL_RESULTADOS = "https://www.fifastats.net/resultados"
+# Avaliações de ataque/defesa dos jogadores (modelo "avaliacoes"), gravadas a cada ciclo com jogos novos
+AVALIACOES_ARQUIVO = "fifalgorithm_data/avaliacoes_jogadores.json"
+# Tudo o que muda os números previstos além das páginas: entra na chave das previsões guardadas em disco
+CONFIGURACAO_PREVISOES = (VERSAO_CACHE, MODELO_LAMBDA, MODO_PREVISAO, NUM_SIMULACOES, MEIA_VIDA_AVALIACAO)
+# Nome curto de cada fonte nas métricas por etapa
+NOMES_FONTES = {
+    URL: "ao_vivo",
+    URL_RESULTADOS: "resultados"
+}
+
+# REDE: timeout (conexão, leitura) por fonte e novas tentativas com backoff
+TIMEOUT_PADRAO = (5, 20)
+TIMEOUT_FONTES = {
+    URL: (5, 15),
+    URL_RESULTADOS: (5, 25)
+}
+MAX_TENTATIVAS = 3
+BACKOFF_BASE = 0.5
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+# Quanto o quadro ao vivo espera pelos resultados antes de usar o histórico local
+ESPERA_RESULTADOS = 3
+
+# RADAR FIFA: janelas por quantidade de jogos (int) ou por período (Timedelta)
+JANELAS_RADAR = {
+    "Últimos 15": 15,
+    "Últimos 50": 50,
+    "Última hora": pd.Timedelta(hours=1),
+    "Últimas 24h": pd.Timedelta(hours=24)
+}
+RADAR_MIN_JOGOS = 5
+
+# MÉTRICAS: uma linha JSON por ciclo do trabalhador e por renderização da página
+METRICAS_ARQUIVO = "fifalgorithm_data/metricas.jsonl"
+METRICAS_MAX_BYTES = 5 * 2 ** 20
+# Painel de depuração na barra lateral (também com ?debug=1 na URL) e pico de memória via tracemalloc
+DEPURACAO = os.environ.get("FIFA_DEPURACAO") == "1"
+MEDIR_MEMORIA = os.environ.get("FIFA_MEDIR_MEMORIA") == "1"
+
+# TRABALHADOR EM SEGUNDO PLANO: intervalo entre ciclos e espera máxima pelo primeiro retrato
+INTERVALO_ATUALIZACAO = 300
+ESPERA_PRIMEIRO_RETRATO = 60
+# Último retrato completo em Arrow: exibido na hora ao iniciar o processo, marcado como desatualizado
+RETRATO_DIR = "fifalgorithm_data/retrato"
+# Frames de exibição guardados por retrato (combinações de filtros, janelas do Radar); os mais antigos saem
+MAX_DERIVADOS_RETRATO = 32
+# Previsões em blocos (mais próximas primeiro): retratos parciais no máximo a cada INTERVALO_PUBLICACAO_PARCIAL
+# segundos; enquanto o retrato exibido é provisório, a página confere a cada INTERVALO_ACOMPANHAMENTO segundos
+INTERVALO_PUBLICACAO_PARCIAL = 1.0
+INTERVALO_ACOMPANHAMENTO = 1.0
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
@@ -23,6 +89,10 @@ ALLOWED_COMPETITIONS = {
     "E-soccer - Battle - 8 minutos de jogo"
 }
 
+# Cache de previsões por partida (mesmos jogadores + mesmo histórico recente -> mesma previsão)
+CACHE_PREVISOES_MAX_ITENS = 2000
+CACHE_PREVISOES_TTL = 3600
+
 # CONFIGURAÇÃO DO TEMA ESCURO E ESTILOS
 st.set_page_config(
     page_title="FifaAlgorithm",
@@ -110,750 +180,892 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-class PoissonMonteCarloPredictor:
-    def __init__(self, num_simulacoes=1000):
-        self.num_simulacoes = num_simulacoes
-        self.max_gols = 8
-
-    def calcular_lambda_ponderado(self, jogador: str, confrontos: pd.DataFrame, forma: pd.DataFrame,
-                                  df_resultados: pd.DataFrame) -> float:
-        """Calcula lambda Poisson com pesos para confrontos + forma recente"""
-        if not confrontos.empty:
-            estat_confrontos = self.analisar_desempenho_jogos(jogador, confrontos)
-            lambda_confrontos = estat_confrontos['media_gols_feitos_ft']
-            peso_confrontos = min(0.5, 0.3 + (len(confrontos) * 0.04))
-        else:
-            lambda_confrontos = 0
-            peso_confrontos = 0
-
-        estat_forma = self.analisar_desempenho_jogos(jogador, forma)
-        lambda_forma = estat_forma['media_gols_feitos_ft']
-        peso_forma = 0.35
-
-        historico = self.obter_ultimos_jogos_gerais(jogador, df_resultados, 20)
-        estat_historico = self.analisar_desempenho_jogos(jogador, historico)
-        lambda_historico = estat_historico['media_gols_feitos_ft']
-        peso_historico = 0.15
-
-        pesos_total = peso_confrontos + peso_forma + peso_historico
-        if pesos_total > 0:
-            lambda_final = (
-                                   (lambda_confrontos * peso_confrontos) +
-                                   (lambda_forma * peso_forma) +
-                                   (lambda_historico * peso_historico)
-                           ) / pesos_total
-        else:
-            lambda_final = 1.5
-
-        return max(0.3, min(lambda_final, 3.5))
-
-    def calcular_lambda_ht(self, lambda_ft: float) -> float:
-        """Calcula lambda para o primeiro tempo (40% dos gols em média)"""
-        lambda_ht = lambda_ft * 0.4
-        return max(0.1, min(lambda_ht, 2.0))
-
-    def analisar_desempenho_jogos(self, jogador: str, jogos: pd.DataFrame) -> Dict:
-        """Analisa desempenho em um conjunto de jogos"""
-        if jogos.empty:
-            return {'media_gols_feitos_ft': 1.5, 'media_gols_sofridos_ft': 1.5}
-
-        gols_feitos = 0
-        gols_sofridos = 0
-
-        for _, jogo in jogos.iterrows():
-            eh_mandante = jogo['Mandante'] == jogador
-            try:
-                if eh_mandante:
-                    gols_feitos += int(jogo['Mandante FT']) if jogo['Mandante FT'] not in ['', 'NaN'] else 0
-                    gols_sofridos += int(jogo['Visitante FT']) if jogo['Visitante FT'] not in ['', 'NaN'] else 0
-                else:
-                    gols_feitos += int(jogo['Visitante FT']) if jogo['Visitante FT'] not in ['', 'NaN'] else 0
-                    gols_sofridos += int(jogo['Mandante FT']) if jogo['Mandante FT'] not in ['', 'NaN'] else 0
-            except (ValueError, TypeError):
-                continue
-
-        total_jogos = len(jogos)
-        return {
-            'media_gols_feitos_ft': gols_feitos / total_jogos if total_jogos > 0 else 1.5,
-            'media_gols_sofridos_ft': gols_sofridos / total_jogos if total_jogos > 0 else 1.5
-        }
-
-    def obter_ultimos_jogos_gerais(self, jogador: str, df_resultados: pd.DataFrame, limite: int) -> pd.DataFrame:
-        """Busca últimos jogos gerais"""
-        jogos = df_resultados[
-            (df_resultados['Mandante'] == jogador) |
-            (df_resultados['Visitante'] == jogador)
-            ].sort_values('Data', ascending=False).head(limite)
-        return jogos
-
-    def simular_monte_carlo_avancado(self, lambda_casa_ht: float, lambda_fora_ht: float,
-                                     lambda_casa_ft: float, lambda_fora_ft: float) -> Dict:
-        """Simulação Monte Carlo completa para HT e FT"""
-        resultados = {
-            'over_05_ht': 0, 'over_15_ht': 0, 'over_25_ht': 0,
-            'over_05_ft': 0, 'over_15_ft': 0, 'over_25_ft': 0,
-            'over_35_ft': 0, 'over_45_ft': 0, 'over_55_ft': 0,
-            'btts_ht': 0, 'btts_ft': 0,
-            'vitorias_casa': 0, 'empates': 0, 'vitorias_fora': 0
-        }
-
-        for _ in range(self.num_simulacoes):
-            # Simular gols FT com Poisson
-            gols_casa_ft = np.random.poisson(lambda_casa_ft)
-            gols_fora_ft = np.random.poisson(lambda_fora_ft)
-            gols_casa_ft = min(gols_casa_ft, self.max_gols)
-            gols_fora_ft = min(gols_fora_ft, self.max_gols)
-
-            # Simular HT com Poisson separado
-            gols_casa_ht = np.random.poisson(lambda_casa_ht)
-            gols_fora_ht = np.random.poisson(lambda_fora_ht)
-            gols_casa_ht = min(gols_casa_ht, self.max_gols)
-            gols_fora_ht = min(gols_fora_ht, self.max_gols)
-
-            # Analisar HT
-            total_ht = gols_casa_ht + gols_fora_ht
-            if total_ht > 0.5: resultados['over_05_ht'] += 1
-            if total_ht > 1.5: resultados['over_15_ht'] += 1
-            if total_ht > 2.5: resultados['over_25_ht'] += 1
-            if gols_casa_ht > 0 and gols_fora_ht > 0: resultados['btts_ht'] += 1
-
-            # Analisar FT
-            total_ft = gols_casa_ft + gols_fora_ft
-            if total_ft > 0.5: resultados['over_05_ft'] += 1
-            if total_ft > 1.5: resultados['over_15_ft'] += 1
-            if total_ft > 2.5: resultados['over_25_ft'] += 1
-            if total_ft > 3.5: resultados['over_35_ft'] += 1
-            if total_ft > 4.5: resultados['over_45_ft'] += 1
-            if total_ft > 5.5: resultados['over_55_ft'] += 1
-            if gols_casa_ft > 0 and gols_fora_ft > 0: resultados['btts_ft'] += 1
-
-            # Resultado final
-            if gols_casa_ft > gols_fora_ft:
-                resultados['vitorias_casa'] += 1
-            elif gols_casa_ft == gols_fora_ft:
-                resultados['empates'] += 1
-            else:
-                resultados['vitorias_fora'] += 1
-
-        return self._calcular_probabilidades_finais(resultados)
-
-    def _calcular_probabilidades_finais(self, resultados: Dict) -> Dict:
-        """Calcula probabilidades finais"""
-        total = self.num_simulacoes
-        return {
-            'over_05_ht': (resultados['over_05_ht'] / total) * 100,
-            'over_15_ht': (resultados['over_15_ht'] / total) * 100,
-            'over_25_ht': (resultados['over_25_ht'] / total) * 100,
-            'over_05_ft': (resultados['over_05_ft'] / total) * 100,
-            'over_15_ft': (resultados['over_15_ft'] / total) * 100,
-            'over_25_ft': (resultados['over_25_ft'] / total) * 100,
-            'over_35_ft': (resultados['over_35_ft'] / total) * 100,
-            'over_45_ft': (resultados['over_45_ft'] / total) * 100,
-            'over_55_ft': (resultados['over_55_ft'] / total) * 100,
-            'btts_ht': (resultados['btts_ht'] / total) * 100,
-            'btts_ft': (resultados['btts_ft'] / total) * 100,
-            'casa_vence': (resultados['vitorias_casa'] / total) * 100,
-            'empate': (resultados['empates'] / total) * 100,
-            'fora_vence': (resultados['vitorias_fora'] / total) * 100
+# FUNÇÕES DE SCRAPING MELHORADAS
+class BuscadorPaginas:
+    """Busca condicional (ETag/If-Modified-Since) com atalho por hash do conteúdo.
+
+    Com um CacheDisco, a última versão de cada página e os frames montados dela sobrevivem a reinícios;
+    com GravacoesPaginas, o modo "gravar" guarda cada página baixada e o modo "reproduzir" só lê as gravadas.
+    """
+
+    def __init__(self, cache: CacheDisco = None, modo: str = "normal", gravacoes: GravacoesPaginas = None):
+        if modo not in ("normal", "gravar", "reproduzir"):
+            raise ValueError(f"modo de rede desconhecido: {modo}")
+        self.cache = cache
+        self.modo = modo
+        self.gravacoes = gravacoes or GravacoesPaginas()
+        self._lock = threading.Lock()
+        self._paginas: Dict[str, Dict] = {}
+        self._reutilizaveis: Dict[str, tuple] = {}
+        self.contadores = {
+            'requisicoes': 0, 'nao_modificadas': 0, 'conteudo_igual': 0,
+            'conteudo_novo': 0, 'falhas': 0, 'reutilizacoes': 0, 'reconstrucoes': 0,
+            'paginas_disco': 0, 'frames_disco': 0
         }
+        # Situação por fonte: tentativas, falhas, último erro e duração da última busca
+        self.fontes: Dict[str, Dict] = {}
+
+        # Sessão keep-alive compartilhada; as novas tentativas são feitas em _requisitar
+        self._sessao = requests.Session()
+        self._sessao.headers.update(HEADERS)
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self._sessao.mount("https://", adaptador)
+        self._sessao.mount("http://", adaptador)
+
+    def _registrar_fonte(self, url: str, **campos) -> None:
+        with self._lock:
+            fonte = self.fontes.setdefault(url, {
+                'tentativas': 0, 'falhas': 0, 'ok': None, 'ultimo_erro': "", 'duracao': 0.0
+            })
+            for campo, valor in campos.items():
+                fonte[campo] = fonte[campo] + valor if campo in ('tentativas', 'falhas') else valor
+
+    def _requisitar(self, url: str, headers: Dict) -> requests.Response:
+        """GET com novas tentativas limitadas e backoff exponencial com jitter"""
+        if self.modo == "reproduzir":
+            return self._reproduzir(url)
+        timeout = TIMEOUT_FONTES.get(url, TIMEOUT_PADRAO)
+        for tentativa in range(1, MAX_TENTATIVAS + 1):
+            self._registrar_fonte(url, tentativas=1)
+            try:
+                resp = self._sessao.get(url, headers=headers, timeout=timeout)
+                if resp.status_code not in STATUS_REPETIR or tentativa == MAX_TENTATIVAS:
+                    return resp
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if tentativa == MAX_TENTATIVAS:
+                    raise
+            time.sleep(BACKOFF_BASE * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+
+    def _reproduzir(self, url: str) -> requests.Response:
+        """Resposta 200 montada a partir da página gravada (sem rede)"""
+        self._registrar_fonte(url, tentativas=1)
+        conteudo = self.gravacoes.ler(url)
+        if conteudo is None:
+            raise requests.exceptions.ConnectionError(f"sem gravação de {url} em {self.gravacoes.pasta}")
+        resp = requests.Response()
+        resp.status_code, resp.url, resp.encoding = 200, url, "utf-8"
+        resp._content = conteudo
+        return resp
+
+    def _anterior_do_disco(self, url: str):
+        """Última versão da página gravada no cache em disco (primeira busca depois de um reinício)"""
+        if self.cache is None:
+            return None
+        meta = self.cache.ler_json(('pagina', url))
+        html = self.cache.ler_bytes(('html', url)) if meta else None
+        if html is None or hashlib.sha1(html).hexdigest() != meta['versao']:
+            return None
+        anterior = dict(meta, linhas=extrair_linhas_tabela(html.decode("utf-8", errors="replace")))
+        with self._lock:
+            self.contadores['paginas_disco'] += 1
+            self._paginas.setdefault(url, anterior)
+        return anterior
+
+    def buscar(self, url: str, medicao: Medicao = None) -> list[list[str]]:
+        """Baixa a página; se o servidor responder 304 ou o conteúdo for idêntico, reaproveita as linhas"""
+        inicio = time.perf_counter()
+        try:
+            linhas = self._buscar(url, medicao)
+        except Exception as e:
+            with self._lock:
+                self.contadores['falhas'] += 1
+            self._registrar_fonte(url, falhas=1, ok=False, ultimo_erro=f"{type(e).__name__}: {e}",
+                                  duracao=time.perf_counter() - inicio)
+            return []
+        self._registrar_fonte(url, ok=True, ultimo_erro="", duracao=time.perf_counter() - inicio)
+        return linhas
+
+    def _buscar(self, url: str, medicao: Medicao = None) -> list[list[str]]:
+        nome = NOMES_FONTES.get(url, url)
+        with self._lock:
+            anterior = self._paginas.get(url)
+        if anterior is None:
+            anterior = self._anterior_do_disco(url)
+
+        headers = {}
+        if anterior:
+            if anterior.get('etag'):
+                headers['If-None-Match'] = anterior['etag']
+            if anterior.get('last_modified'):
+                headers['If-Modified-Since'] = anterior['last_modified']
+
+        with etapa(medicao, f"{nome}.http"):
+            resp = self._requisitar(url, headers)
+
+        with self._lock:
+            self.contadores['requisicoes'] += 1
+            if resp.status_code == 304 and anterior:
+                self.contadores['nao_modificadas'] += 1
+                return [list(r) for r in anterior['linhas']]
 
-
-# FUNÇÕES AUXILIARES
-def obter_confrontos_diretos(jogador1: str, jogador2: str, df_resultados: pd.DataFrame,
-                             limite: int = 5) -> pd.DataFrame:
-    """Busca últimos confrontos diretos entre dois jogadores"""
-    confrontos = df_resultados[
-        ((df_resultados['Mandante'] == jogador1) & (df_resultados['Visitante'] == jogador2)) |
-        ((df_resultados['Mandante'] == jogador2) & (df_resultados['Visitante'] == jogador1))
-        ].sort_values('Data', ascending=False).head(limite)
-    return confrontos
-
-
-def obter_ultimos_jogos_gerais(jogador: str, df_resultados: pd.DataFrame, limite: int = 10,
-                               excluir: pd.DataFrame = None) -> pd.DataFrame:
-    """Busca últimos jogos gerais excluindo confrontos já considerados"""
-    todos_jogos = df_resultados[
-        (df_resultados['Mandante'] == jogador) |
-        (df_resultados['Visitante'] == jogador)
-        ].sort_values('Data', ascending=False)
-
-    if excluir is not None and not excluir.empty:
-        mask = ~todos_jogos.index.isin(excluir.index)
-        todos_jogos = todos_jogos[mask]
-
-    return todos_jogos.head(limite)
-
-
-def calcular_estatisticas_jogador(jogador: str, jogos: pd.DataFrame) -> Dict:
-    """Calcula estatísticas básicas do jogador"""
-    if jogos.empty:
-        return {
-            'vitorias': 0, 'empates': 0, 'derrotas': 0,
-            'forma': 0, 'record': "0-0-0", 'forma_emoji': "⚡0%"
+        resp.raise_for_status()
+        if resp.status_code != 200:
+            raise requests.exceptions.HTTPError(f"status {resp.status_code}", response=resp)
+
+        if self.modo == "gravar":
+            self.gravacoes.gravar(url, resp.content)
+        versao = hashlib.sha1(resp.content).hexdigest()
+        if anterior and anterior['versao'] == versao:
+            with self._lock:
+                self.contadores['conteudo_igual'] += 1
+            return [list(r) for r in anterior['linhas']]
+
+        with etapa(medicao, f"{nome}.parse"):
+            linhas = extrair_linhas_tabela(resp.text)
+        meta = {
+            'versao': versao,
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified')
         }
+        with self._lock:
+            self.contadores['conteudo_novo'] += 1
+            self._paginas[url] = dict(meta, linhas=linhas)
+        if self.cache is not None:
+            self.cache.gravar_bytes(('html', url), resp.content)
+            self.cache.gravar_json(('pagina', url), meta)
+        return [list(r) for r in linhas]
+
+    def situacao_fontes(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {url: dict(fonte) for url, fonte in self.fontes.items()}
+
+    def falhas_recentes(self) -> Dict[str, str]:
+        """Fontes cuja última busca falhou -> mensagem do erro"""
+        with self._lock:
+            return {url: fonte['ultimo_erro'] for url, fonte in self.fontes.items() if fonte['ok'] is False}
+
+    def versao(self, url: str):
+        """Hash do último conteúdo recebido da URL (None se nunca baixada)"""
+        with self._lock:
+            pagina = self._paginas.get(url)
+        return pagina['versao'] if pagina else None
+
+    def reutilizar(self, nome: str, versao, construir):
+        """Devolve o último valor de `nome` se a versão das entradas não mudou; senão reconstrói.
+
+        Frames também vão para o cache em disco, então o primeiro ciclo depois de um reinício reaproveita
+        o frame da mesma versão da página em vez de remontá-lo.
+        """
+        with self._lock:
+            anterior = self._reutilizaveis.get(nome)
+        if versao is not None and anterior is not None and anterior[0] == versao:
+            with self._lock:
+                self.contadores['reutilizacoes'] += 1
+            return anterior[1]
+
+        valor = None
+        if versao is not None and self.cache is not None:
+            valor = self.cache.ler_frame((nome, versao))
+        if valor is not None:
+            with self._lock:
+                self.contadores['frames_disco'] += 1
+        else:
+            valor = construir()
+            with self._lock:
+                self.contadores['reconstrucoes'] += 1
+            if versao is not None and self.cache is not None and isinstance(valor, pd.DataFrame):
+                self.cache.gravar_frame((nome, versao), valor)
+        if versao is not None:
+            with self._lock:
+                self._reutilizaveis[nome] = (versao, valor)
+        return valor
 
-    vitorias = empates = derrotas = 0
-    for _, jogo in jogos.iterrows():
-        eh_mandante = jogo['Mandante'] == jogador
-        try:
-            if eh_mandante:
-                gols_feito = int(jogo['Mandante FT']) if jogo['Mandante FT'] not in ['', 'NaN', None] else 0
-                gols_sofrido = int(jogo['Visitante FT']) if jogo['Visitante FT'] not in ['', 'NaN', None] else 0
-            else:
-                gols_feito = int(jogo['Visitante FT']) if jogo['Visitante FT'] not in ['', 'NaN', None] else 0
-                gols_sofrido = int(jogo['Mandante FT']) if jogo['Mandante FT'] not in ['', 'NaN', None] else 0
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            contadores = dict(self.contadores)
+        contadores['acertos'] = contadores['nao_modificadas'] + contadores['conteudo_igual']
+        contadores['falhas_cache'] = contadores['conteudo_novo']
+        return contadores
 
-            if gols_feito > gols_sofrido:
-                vitorias += 1
-            elif gols_feito == gols_sofrido:
-                empates += 1
-            else:
-                derrotas += 1
-        except (ValueError, TypeError):
-            continue
-
-    total_jogos = len(jogos)
-    forma = (vitorias / total_jogos * 100) if total_jogos > 0 else 0
-
-    return {
-        'vitorias': vitorias,
-        'empates': empates,
-        'derrotas': derrotas,
-        'forma': forma,
-        'record': f"{vitorias}-{empates}-{derrotas}",
-        'forma_emoji': f"⚡{forma:.0f}%"
-    }
 
+@st.cache_resource(show_spinner=False)
+def obter_cache_disco() -> CacheDisco:
+    return CacheDisco()
 
-def identificar_valor_aposta(previsao: Dict, confianca: float) -> str:
-    """Identifica oportunidades de valor"""
-    if confianca < 70:
-        return ""
 
-    if (previsao['over_25_ft'] > 70 and previsao['btts_ft'] > 65 and confianca > 85):
-        return "💎"
-    elif (previsao['over_25_ft'] > 65 or previsao['btts_ft'] > 60) and confianca > 75:
-        return "🔶"
-    else:
-        return ""
+@st.cache_resource(show_spinner=False)
+def obter_buscador() -> BuscadorPaginas:
+    return BuscadorPaginas(obter_cache_disco(), MODO_REDE, GravacoesPaginas())
 
 
-def calcular_confianca(confrontos: pd.DataFrame, forma_casa: pd.DataFrame, forma_fora: pd.DataFrame) -> float:
-    """Calcula confiança baseada na qualidade dos dados"""
-    confianca = 50
+def scrape_page(url: str, medicao: Medicao = None) -> list[list[str]]:
+    """Função de scraping; erros ficam registrados por fonte no buscador e a página volta vazia"""
+    with etapa(medicao, f"{NOMES_FONTES.get(url, url)}.busca"):
+        return obter_buscador().buscar(url, medicao)
 
-    if len(confrontos) >= 3:
-        confianca += 20
-    elif len(confrontos) >= 1:
-        confianca += 10
 
-    if len(forma_casa) >= 8 and len(forma_fora) >= 8:
-        confianca += 20
-    elif len(forma_casa) >= 5 and len(forma_fora) >= 5:
-        confianca += 10
+@st.cache_resource(show_spinner=False)
+def obter_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="fifa-busca")
 
-    return min(95, confianca)
 
+def scrape_resultados(medicao: Medicao = None) -> pd.DataFrame:
+    """Scraping de resultados com fallback"""
+    try:
+        rows = scrape_page(URL_RESULTADOS, medicao)
+        if not rows:
+            return pd.DataFrame()
 
-def formatar_porcentagem(valor: float) -> str:
-    """Formata porcentagem com cor"""
-    if valor >= 70:
-        return f"🟢 {valor:.1f}%"
-    elif valor >= 55:
-        return f"🟡 {valor:.1f}%"
-    else:
-        return f"🔴 {valor:.1f}%"
+        def montar() -> pd.DataFrame:
+            with etapa(medicao, "resultados.frame"):
+                return montar_resultados(rows)
 
+        buscador = obter_buscador()
+        return buscador.reutilizar('resultados', buscador.versao(URL_RESULTADOS), montar).copy()
 
-def formatar_porcentagem_sem_icone(valor: float) -> str:
-    """Formata porcentagem SEM ícones (para Casa Vence/Empate/Fora Vence)"""
-    return f"{valor:.1f}%"
+    except Exception:
+        return pd.DataFrame()
 
 
-def formatar_porcentagem_radar(valor: float) -> str:
-    """Formata porcentagem para o Radar FIFA COM ícones"""
-    if valor >= 80:
-        return f"🟢 {valor:.0f}%"
-    elif valor >= 60:
-        return f"🟡 {valor:.0f}%"
-    else:
-        return f"🔴 {valor:.0f}%"
-
-
-def classificar_ht_ft(xg_casa_ht: float, xg_fora_ht: float, xg_casa_ft: float, xg_fora_ft: float) -> Dict:
-    """Classifica separadamente HT e FT"""
-
-    total_ht = xg_casa_ht + xg_fora_ht
-    total_ft = xg_casa_ft + xg_fora_ft
-
-    # CLASSIFICAÇÃO FT
-    if total_ft >= 3.5:
-        classificacao_ft = "🔥 OVER EXPLOSIVO"
-    elif total_ft >= 2.8:
-        classificacao_ft = "⚡ OVER ALTO"
-    elif total_ft >= 2.3:
-        classificacao_ft = "🎯 OVER"
-    elif total_ft <= 1.5:
-        classificacao_ft = "🛡️ UNDER"
-    elif total_ft <= 2.0:
-        classificacao_ft = "⚖️ UNDER LEVE"
+def jogadores_com_novos_resultados(df_anterior: pd.DataFrame, df_novo: pd.DataFrame) -> set:
+    """Jogadores com jogos novos (ou placar alterado) na página de resultados desde a anterior"""
+    if df_novo is None or df_novo.empty:
+        return set()
+    colunas = [c for c in ['Data', 'Liga', 'Mandante', 'Visitante', 'Mandante FT', 'Visitante FT']
+               if c in df_novo.columns]
+    if df_anterior is None or df_anterior.empty:
+        novos = df_novo
     else:
-        classificacao_ft = "🎲 EQUILIBRADO"
-
-    # CLASSIFICAÇÃO HT
-    if total_ht >= 1.5:
-        classificacao_ht = "🚀 HT OFENSIVO"
-    elif total_ht >= 1.2:
-        classificacao_ht = "⚡ HT NORMAL"
-    elif total_ht <= 0.6:
-        classificacao_ht = "🛡️ HT DEFENSIVO"
-    else:
-        classificacao_ht = "⚖️ HT EQUILIBRADO"
-
-    return {
-        'classificacao_ft': classificacao_ft,
-        'classificacao_ht': classificacao_ht,
-        'total_ht': total_ht,
-        'total_ft': total_ft
-    }
+        vistos = pd.MultiIndex.from_frame(df_anterior[colunas].astype(str))
+        novos = df_novo[~pd.MultiIndex.from_frame(df_novo[colunas].astype(str)).isin(vistos)]
+    return set(novos['Mandante']) | set(novos['Visitante'])
 
 
-# FUNÇÕES DE SCRAPING MELHORADAS
-@st.cache_data(show_spinner=False, ttl=300)
-def scrape_page(url: str) -> list[list[str]]:
-    """Função de scraping com tratamento robusto de erros"""
+def load_data(medicao: Medicao = None) -> pd.DataFrame:
+    """Carrega dados ao vivo com fallback para dados de exemplo"""
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=30)
-
-        if resp.status_code != 200:
-            return []
-
-        resp.raise_for_status()
+        rows = scrape_page(URL, medicao)
+        if not rows:
+            return criar_dados_exemplo()
 
-        soup = BeautifulSoup(resp.text, "lxml")
-        rows = [
-            [cell.get_text(strip=True) for cell in tr.find_all(["th", "td"])]
-            for tr in soup.find_all("tr")
-            if tr.find_all(["th", "td"])
-        ]
+        def montar() -> pd.DataFrame:
+            with etapa(medicao, "ao_vivo.frame"):
+                return montar_dados_ao_vivo(rows)
 
-        return rows
+        buscador = obter_buscador()
+        return buscador.reutilizar('ao_vivo', buscador.versao(URL), montar).copy()
 
-    except requests.exceptions.Timeout:
-        return []
-    except requests.exceptions.ConnectionError:
-        return []
-    except requests.exceptions.RequestException:
-        return []
     except Exception:
-        return []
+        return criar_dados_exemplo()
 
 
-@st.cache_data(show_spinner=False, ttl=300)
-def scrape_resultados() -> pd.DataFrame:
-    """Scraping de resultados com fallback"""
-    try:
-        rows = scrape_page(URL_RESULTADOS)
-        if not rows:
-            return pd.DataFrame()
+def montar_dados_ao_vivo(rows: list[list[str]]) -> pd.DataFrame:
+    """Monta o DataFrame ao vivo a partir das linhas da tabela"""
+    df = pd.DataFrame(rows).fillna('')
 
-        max_cols = max(len(r) for r in rows)
-        for r in rows:
-            r.extend([""] * (max_cols - len(r)))
-        df = pd.DataFrame(rows)
-
-        if len(df) <= 1:
-            df.columns = [f"Coluna {i + 1}" for i in range(df.shape[1])]
-            return df
+    if df.shape[1] < 4:
+        return criar_dados_exemplo()
 
-        df.columns = df.iloc[0]
-        df = df.iloc[1:].reset_index(drop=True)
-        df.columns = [str(c).strip() if pd.notna(c) else f"Coluna {i + 1}" for i, c in enumerate(df.columns)]
-
-        def sem_parenteses(txt: str) -> str:
-            return re.sub(r'\s*\([^)]*\)', '', str(txt)).strip()
-
-        if 'Jogador 1' in df.columns:
-            df['Jogador 1'] = df['Jogador 1'].apply(sem_parenteses)
-        if 'Jogador 2' in df.columns:
-            df['Jogador 2'] = df['Jogador 2'].apply(sem_parenteses)
-
-        df = df.rename(columns={
-            'Campeonato': 'Liga',
-            'Jogador 1': 'Mandante',
-            'Jogador 2': 'Visitante',
-            'Placar': 'Placar Final'
-        })
-
-        liga_map_resultados = {
-            "GT League": "GT 12 Min",
-            "H2H 8m": "H2H 8 Min",
-            "Battle 8m": "Battle 8 Min",
-            "Battle 6m": "Volta 6 Min"
-        }
-        df['Liga'] = df['Liga'].replace(liga_map_resultados)
-
-        if 'Placar HT' in df.columns:
-            ht = (
-                df['Placar HT'].fillna('')
-                .astype(str).str.replace(' ', '', regex=False).str.strip()
-                .str.split('x', n=1, expand=True)
-                .reindex(columns=[0, 1], fill_value='')
-            )
-            df['Mandante HT'] = ht[0].str.strip()
-            df['Visitante HT'] = ht[1].str.strip()
-
-        if 'Placar Final' in df.columns:
-            ft = (
-                df['Placar Final'].fillna('')
-                .astype(str).str.replace(' ', '', regex=False).str.strip()
-                .str.split('x', n=1, expand=True)
-                .reindex(columns=[0, 1], fill_value='')
-            )
-            df['Mandante FT'] = ft[0].str.strip()
-            df['Visitante FT'] = ft[1].str.strip()
+    df = df[df[3].isin(ALLOWED_COMPETITIONS)].reset_index(drop=True)
+    df = df.drop(columns=[1])
+    df.columns = ["Hora", "Confronto", "Liga"] + [f"Coluna {i}" for i in range(4, df.shape[1] + 1)]
+
+    jogadores = (
+        df['Confronto'].astype(str).str.replace("Ao Vivo Agora", "", regex=False).str.strip()
+        .str.extract(r'\(([^)]+)\).*?x.*?\(([^)]+)\)')
+    )
+    df['Mandante'] = jogadores[0].str.strip().fillna("")
+    df['Visitante'] = jogadores[1].str.strip().fillna("")
+    df = df.drop(columns=['Confronto'])
+
+    liga_map_ao_vivo = {
+        "E-soccer - H2H GG League - 8 minutos de jogo": "H2H 8 Min",
+        "E-soccer - GT Leagues - 12 mins de jogo": "GT 12 Min",
+        "Esoccer Battle Volta - 6 Minutos de Jogo": "Volta 6 Min",
+        "E-soccer - Battle - 8 minutos de jogo": "Battle 8 Min"
+    }
+    df['Liga'] = df['Liga'].replace(liga_map_ao_vivo)
 
-        df['Total HT'] = (
-                pd.to_numeric(df['Mandante HT'], errors='coerce').fillna(0) +
-                pd.to_numeric(df['Visitante HT'], errors='coerce').fillna(0)
-        ).astype(int)
+    ordem = ['Hora', 'Liga', 'Mandante', 'Visitante']
+    df = df[ordem + [c for c in df.columns if c not in ordem]]
+    return df
 
-        df['Total FT'] = (
-                pd.to_numeric(df['Mandante FT'], errors='coerce').fillna(0) +
-                pd.to_numeric(df['Visitante FT'], errors='coerce').fillna(0)
-        ).astype(int)
 
-        df = df.drop(columns=[c for c in ['Placar HT', 'Placar Final'] if c in df.columns])
+def criar_dados_exemplo() -> pd.DataFrame:
+    """Cria dados de exemplo quando o scraping falha"""
+    dados_exemplo = {
+        'Hora': ['10:00', '11:30', '13:00', '14:30'],
+        'Liga': ['H2H 8 Min', 'GT 12 Min', 'Battle 8 Min', 'Volta 6 Min'],
+        'Mandante': ['Player A', 'Player C', 'Player E', 'Player G'],
+        'Visitante': ['Player B', 'Player D', 'Player F', 'Player H']
+    }
+    return pd.DataFrame(dados_exemplo)
 
-        col_final = [
-            'Data', 'Liga', 'Mandante', 'Visitante',
-            'Mandante HT', 'Visitante HT', 'Total HT',
-            'Mandante FT', 'Visitante FT', 'Total FT'
-        ]
-        df = df[[c for c in col_final if c in df.columns]]
 
-        return df
+@st.cache_resource(show_spinner=False)
+def obter_cache_previsoes() -> CachePrevisoes:
+    return CachePrevisoes(max_itens=CACHE_PREVISOES_MAX_ITENS, ttl=CACHE_PREVISOES_TTL)
 
-    except Exception:
-        return pd.DataFrame()
 
+@st.cache_resource(show_spinner=False)
+def obter_historico_resultados() -> HistoricoResultados:
+    return HistoricoResultados()
 
-def aplicar_previsoes_avancadas(df_live: pd.DataFrame, df_resultados: pd.DataFrame) -> pd.DataFrame:
-    """Aplica previsões Poisson + Monte Carlo aos dados ao vivo"""
-    if df_live.empty:
-        return df_live
-
-    predictor = PoissonMonteCarloPredictor(num_simulacoes=1000)
-
-    # NOVA ORDEM DE COLUNAS CONFORME SOLICITADO
-    ordem_colunas = [
-        'Hora', 'Liga', 'Mandante', 'Visitante',
-        'xG Casa FT', 'xG Fora FT',
-        'Casa Vence', 'Empate', 'Fora Vence',
-        'Valor', 'Confiança',
-        'Classificação HT', 'Gols HT',
-        'Over 0.5 HT', 'Over 1.5 HT', 'Over 2.5 HT', 'BTTS HT',
-        'Classificação FT', 'Gols FT',
-        'Over 0.5 FT', 'Over 1.5 FT', 'Over 2.5 FT', 'Over 3.5 FT',
-        'Over 4.5 FT', 'Over 5.5 FT', 'BTTS FT'
-    ]
 
-    for coluna in ordem_colunas:
-        if coluna not in df_live.columns:
-            df_live[coluna] = ""
+class RegistroMetricas:
+    """Guarda as últimas medições em memória (painel de depuração) e grava cada uma como linha JSON"""
 
-    # Add progress bar
-    if len(df_live) > 0:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+    def __init__(self, caminho: str = METRICAS_ARQUIVO, max_itens: int = 20):
+        self.caminho = caminho
+        self.medir_memoria = MEDIR_MEMORIA
+        self._recentes: Dict[str, deque] = {}
+        self._max_itens = max_itens
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
 
-    for idx, row in df_live.iterrows():
-        casa = row['Mandante']
-        fora = row['Visitante']
+    def iniciar_memoria(self) -> None:
+        """Zera o pico do tracemalloc para a próxima medição (liga/desliga conforme medir_memoria)"""
+        if self.medir_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        elif tracemalloc.is_tracing():
+            tracemalloc.stop()
 
-        if len(df_live) > 0:
-            progresso = (idx + 1) / len(df_live)
-            progress_bar.progress(progresso)
-            status_text.text(f"Processando partida {idx + 1} de {len(df_live)}: {casa} vs {fora}")
+    def publicar(self, medicao: Medicao, com_memoria: bool = False) -> None:
+        medicao.finalizar()
+        if com_memoria and tracemalloc.is_tracing():
+            medicao.pico_memoria = tracemalloc.get_traced_memory()[1]
+        registro = medicao.como_dict()
 
-        if casa and fora:
+        with self._lock:
+            self._recentes.setdefault(medicao.tipo, deque(maxlen=self._max_itens)).append(medicao)
             try:
-                confrontos = obter_confrontos_diretos(casa, fora, df_resultados, 5)
-                forma_casa = obter_ultimos_jogos_gerais(casa, df_resultados, 10, confrontos)
-                forma_fora = obter_ultimos_jogos_gerais(fora, df_resultados, 10, confrontos)
-
-                estat_casa = calcular_estatisticas_jogador(casa, forma_casa)
-                estat_fora = calcular_estatisticas_jogador(fora, forma_fora)
+                # Rotação simples: o arquivo cheio vira .1 e um novo começa
+                if os.path.exists(self.caminho) and os.path.getsize(self.caminho) > METRICAS_MAX_BYTES:
+                    os.replace(self.caminho, self.caminho + ".1")
+                with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
 
-                # Calcular lambda FT
-                lambda_casa_ft = predictor.calcular_lambda_ponderado(casa, confrontos, forma_casa, df_resultados)
-                lambda_fora_ft = predictor.calcular_lambda_ponderado(fora, confrontos, forma_fora, df_resultados)
+    def ultima(self, tipo: str) -> Medicao:
+        with self._lock:
+            recentes = self._recentes.get(tipo)
+            return recentes[-1] if recentes else None
 
-                # Calcular lambda HT
-                lambda_casa_ht = predictor.calcular_lambda_ht(lambda_casa_ft)
-                lambda_fora_ht = predictor.calcular_lambda_ht(lambda_fora_ft)
 
-                # Simular Monte Carlo
-                simulacoes = predictor.simular_monte_carlo_avancado(
-                    lambda_casa_ht, lambda_fora_ht,
-                    lambda_casa_ft, lambda_fora_ft
-                )
+@st.cache_resource(show_spinner=False)
+def obter_metricas() -> RegistroMetricas:
+    return RegistroMetricas()
 
-                # Calcular confiança e valor
-                confianca = calcular_confianca(confrontos, forma_casa, forma_fora)
-                valor = identificar_valor_aposta(simulacoes, confianca)
-
-                # Classificar partida
-                classificacao = classificar_ht_ft(
-                    lambda_casa_ht, lambda_fora_ht,
-                    lambda_casa_ft, lambda_fora_ft
-                )
 
-                # Preencher dados principais
-                df_live.at[idx, 'Mandante'] = f"{casa} ({estat_casa['record']}) {estat_casa['forma_emoji']}"
-                df_live.at[idx, 'Visitante'] = f"{fora} ({estat_fora['record']}) {estat_fora['forma_emoji']}"
-
-                # Preencher xG FT COM 2 CASAS DECIMAIS
-                df_live.at[idx, 'xG Casa FT'] = f"{lambda_casa_ft:.2f}"
-                df_live.at[idx, 'xG Fora FT'] = f"{lambda_fora_ft:.2f}"
-
-                # Preencher classificações e totais
-                df_live.at[idx, 'Classificação HT'] = classificacao['classificacao_ht']
-                df_live.at[idx, 'Gols HT'] = f"{classificacao['total_ht']:.2f}"
-                df_live.at[idx, 'Classificação FT'] = classificacao['classificacao_ft']
-                df_live.at[idx, 'Gols FT'] = f"{classificacao['total_ft']:.2f}"
-
-                # Preencher resultados - AGORA SEM ÍCONES para Casa Vence/Empate/Fora Vence
-                df_live.at[idx, 'Casa Vence'] = formatar_porcentagem_sem_icone(simulacoes['casa_vence'])
-                df_live.at[idx, 'Empate'] = formatar_porcentagem_sem_icone(simulacoes['empate'])
-                df_live.at[idx, 'Fora Vence'] = formatar_porcentagem_sem_icone(simulacoes['fora_vence'])
-                df_live.at[idx, 'Valor'] = valor
-                df_live.at[idx, 'Confiança'] = f"{confianca:.0f}%"
-
-                # Preencher probabilidades HT (mantém ícones)
-                df_live.at[idx, 'Over 0.5 HT'] = formatar_porcentagem(simulacoes['over_05_ht'])
-                df_live.at[idx, 'Over 1.5 HT'] = formatar_porcentagem(simulacoes['over_15_ht'])
-                df_live.at[idx, 'Over 2.5 HT'] = formatar_porcentagem(simulacoes['over_25_ht'])
-                df_live.at[idx, 'BTTS HT'] = formatar_porcentagem(simulacoes['btts_ht'])
-
-                # Preencher probabilidades FT (mantém ícones)
-                df_live.at[idx, 'Over 0.5 FT'] = formatar_porcentagem(simulacoes['over_05_ft'])
-                df_live.at[idx, 'Over 1.5 FT'] = formatar_porcentagem(simulacoes['over_15_ft'])
-                df_live.at[idx, 'Over 2.5 FT'] = formatar_porcentagem(simulacoes['over_25_ft'])
-                df_live.at[idx, 'Over 3.5 FT'] = formatar_porcentagem(simulacoes['over_35_ft'])
-                df_live.at[idx, 'Over 4.5 FT'] = formatar_porcentagem(simulacoes['over_45_ft'])
-                df_live.at[idx, 'Over 5.5 FT'] = formatar_porcentagem(simulacoes['over_55_ft'])
-                df_live.at[idx, 'BTTS FT'] = formatar_porcentagem(simulacoes['btts_ft'])
-
-            except Exception:
-                df_live.at[idx, 'Confiança'] = "0%"
-                continue
-
-    if len(df_live) > 0:
-        progress_bar.empty()
-        status_text.empty()
+# ==============================================
+# TRABALHADOR EM SEGUNDO PLANO: BUSCA -> PROCESSAMENTO -> PREVISÕES
+# ==============================================
 
-    colunas_existentes = [col for col in ordem_colunas if col in df_live.columns]
-    colunas_restantes = [col for col in df_live.columns if col not in ordem_colunas]
+@dataclass(frozen=True)
+class RetratoDados:
+    """Resultado publicado de um ciclo completo; imutável (os frames não devem ser modificados)"""
+    versao: int
+    gerado_em: datetime
+    df_previsoes: pd.DataFrame
+    df_radar: pd.DataFrame
+    df_resultados_pagina: pd.DataFrame
+    tem_historico: bool
+    parcial: bool
+    falhas: Dict[str, str] = field(default_factory=dict)
+    # Lido do disco na inicialização: dados de `gerado_em`, ainda sem nenhum ciclo deste processo
+    restaurado: bool = False
+    # (partidas previstas, total) enquanto as previsões do ciclo ainda saem em blocos; None quando completas
+    progresso: tuple = None
+    # Frames de exibição derivados desta versão (filtros, Radar formatado); reaproveitados entre reruns e
+    # sessões, então só DataFrames (nunca Stylers, que mudam de estado ao renderizar), em LRU limitado
+    derivados: "OrderedDict[tuple, pd.DataFrame]" = field(default_factory=OrderedDict, repr=False, compare=False)
+    _lock_derivados: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def em_andamento(self) -> bool:
+        return self.progresso is not None
+
+    def derivado(self, chave: tuple, construir) -> pd.DataFrame:
+        """Frame derivado desta versão, montado na primeira vez que é pedido"""
+        with self._lock_derivados:
+            if chave in self.derivados:
+                self.derivados.move_to_end(chave)
+                return self.derivados[chave]
+        df = construir()
+        with self._lock_derivados:
+            self.derivados[chave] = df
+            while len(self.derivados) > MAX_DERIVADOS_RETRATO:
+                self.derivados.popitem(last=False)
+        return df
 
-    df_live = df_live[colunas_existentes + colunas_restantes]
-    return df_live
 
+def salvar_retrato(retrato: RetratoDados, pasta: str = RETRATO_DIR) -> None:
+    frames = {
+        'previsoes': retrato.df_previsoes,
+        'radar': retrato.df_radar,
+        'resultados_pagina': retrato.df_resultados_pagina
+    }
+    gravar_retrato_arrow(pasta, frames, {
+        'gerado_em': retrato.gerado_em.isoformat(), 'tem_historico': retrato.tem_historico
+    })
+
+
+def carregar_retrato_salvo(pasta: str = RETRATO_DIR) -> RetratoDados:
+    """Retrato gravado pelo último ciclo completo (de qualquer processo); None se não houver"""
+    lido = ler_retrato_arrow(pasta)
+    if lido is None:
+        return None
+    frames, meta = lido
+    return RetratoDados(
+        versao=0,
+        gerado_em=datetime.fromisoformat(meta['gerado_em']),
+        df_previsoes=frames['previsoes'],
+        df_radar=frames['radar'],
+        df_resultados_pagina=frames['resultados_pagina'],
+        tem_historico=meta['tem_historico'],
+        parcial=False,
+        restaurado=True
+    )
+
+
+class TrabalhadorPrevisoes:
+    """Thread de longa duração que busca as páginas, atualiza o histórico, prevê e publica retratos"""
+
+    def __init__(self, intervalo: int = INTERVALO_ATUALIZACAO):
+        self.intervalo = intervalo
+        self._retrato: RetratoDados = None
+        self._versao = 0
+        self._indice: IndiceJogos = None
+        # Estado para a atualização incremental: última página de resultados e registros por partida
+        self._pagina_anterior: pd.DataFrame = None
+        self._registros: Dict[tuple, Dict] = None
+        self.estatisticas_ciclo = {'partidas': 0, 'recalculadas': 0}
+        self._radar: RadarIncremental = None
+        self._avaliacoes: AvaliacoesJogadores = None
+        # versao do HistoricoResultados em que Radar, avaliações e registros foram montados
+        self._versao_historico = 0
+        self._condicao = threading.Condition()
+        self._acordar = threading.Event()
+        # Inicialização a quente: o retrato salvo fica disponível até o primeiro ciclo publicar
+        self._retrato = carregar_retrato_salvo()
+        self._thread = threading.Thread(target=self._executar, name="fifa-trabalhador", daemon=True)
+        self._thread.start()
+
+    def retrato(self) -> RetratoDados:
+        """Último retrato publicado (o salvo em disco, ou None, antes do primeiro ciclo terminar)"""
+        with self._condicao:
+            return self._retrato
+
+    def aguardar_retrato(self, timeout: float) -> RetratoDados:
+        """Espera o primeiro retrato (só bloqueia na inicialização do processo)"""
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._retrato is not None, timeout=timeout)
+            return self._retrato
+
+    def solicitar_atualizacao(self) -> None:
+        """Antecipa o próximo ciclo (botão Atualizar Dados)"""
+        self._acordar.set()
+
+    def _executar(self) -> None:
+        metricas = obter_metricas()
+        while True:
+            metricas.iniciar_memoria()
+            medicao = Medicao("ciclo")
+            try:
+                self._ciclo(medicao)
+            except Exception as e:
+                obter_buscador()._registrar_fonte("trabalhador", falhas=1, ok=False,
+                                                  ultimo_erro=f"{type(e).__name__}: {e}")
+            medicao.extras.update(versao=self._versao, **self.estatisticas_ciclo)
+            metricas.publicar(medicao, com_memoria=True)
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+    def _ciclo(self, medicao: Medicao = None) -> None:
+        historico = obter_historico_resultados()
+        historico.obter_resultados()  # relê o histórico se o arquivo mudou
+        if historico.versao != self._versao_historico:
+            # Outro processo (coletor_historico) gravou no histórico: o estado incremental não tem esses jogos
+            self._versao_historico = historico.versao
+            self._radar = None
+            self._avaliacoes = None
+            self._registros = None
+        avaliacoes = self._obter_avaliacoes(historico, medicao)
+
+        # Resultados e jogos ao vivo são buscados ao mesmo tempo
+        futuro_resultados = obter_executor().submit(scrape_resultados, medicao)
+        df_live = load_data(medicao)
+        try:
+            with etapa(medicao, "espera_resultados"):
+                df_pagina = futuro_resultados.result(timeout=ESPERA_RESULTADOS)
+        except FuturesTimeoutError:
+            # Página de resultados lenta: publica antes com o histórico já gravado
+            self._publicar(df_live, historico, df_pagina=None, medicao=medicao)
+            df_pagina = futuro_resultados.result()
+
+        with etapa(medicao, "historico.anexar"):
+            historico.anexar(df_pagina)
+            if self._radar is not None:
+                self._radar.ingerir(historico.ultimos_anexados)
+            # Cada jogo novo atualiza só os dois jogadores; o estado vai para o disco a cada ciclo com jogos
+            if avaliacoes is not None and avaliacoes.ingerir(historico.ultimos_anexados):
+                avaliacoes.salvar(AVALIACOES_ARQUIVO)
+
+        # Só partidas com jogadores que ganharam resultados (ou partidas novas) são recalculadas
+        jogadores_alterados = None
+        if self._pagina_anterior is not None:
+            jogadores_alterados = jogadores_com_novos_resultados(self._pagina_anterior, df_pagina)
+        if not df_pagina.empty:
+            self._pagina_anterior = df_pagina
+
+        self._publicar(df_live, historico, df_pagina, jogadores_alterados, medicao)
+
+    def _obter_avaliacoes(self, historico: HistoricoResultados, medicao: Medicao = None) -> AvaliacoesJogadores:
+        """Avaliações dos jogadores: lidas do disco na inicialização; refeitas do histórico só se não baterem"""
+        if MODELO_LAMBDA != "avaliacoes":
+            return None
+        if self._avaliacoes is None:
+            with etapa(medicao, "avaliacoes.carregar"):
+                df_resultados = historico.obter_resultados()
+                avaliacoes = AvaliacoesJogadores.carregar(AVALIACOES_ARQUIVO)
+                # Sem arquivo, de outra configuração ou defasado (processo parou entre anexar e salvar)
+                if avaliacoes is None or avaliacoes.jogos != int(df_resultados['Válido'].sum()):
+                    avaliacoes = AvaliacoesJogadores()
+                    avaliacoes.ingerir(df_resultados)
+                    avaliacoes.salvar(AVALIACOES_ARQUIVO)
+                self._avaliacoes = avaliacoes
+        return self._avaliacoes
+
+    def _publicar(self, df_live: pd.DataFrame, historico: HistoricoResultados,
+                  df_pagina: pd.DataFrame = None, jogadores_alterados: set = None,
+                  medicao: Medicao = None) -> None:
+        buscador = obter_buscador()
+        df_resultados = historico.obter_resultados()
+        parcial = df_pagina is None
+
+        if self._indice is None or self._indice.df_resultados is not df_resultados:
+            with etapa(medicao, "historico.indice"):
+                self._indice = IndiceJogos(df_resultados)
+        indice = self._indice
+
+        # Radar: carga inicial do histórico; depois só os contadores móveis recebem os jogos novos
+        if self._radar is None:
+            with etapa(medicao, "radar.carregar"):
+                self._radar = RadarIncremental()
+                self._radar.carregar(df_resultados)
+
+        anterior = self.retrato()
+        if df_pagina is None:
+            df_pagina = anterior.df_resultados_pagina if anterior else pd.DataFrame()
+        with etapa(medicao, "radar.tabela"):
+            df_radar = self._radar.tabela()
+        falhas = buscador.falhas_recentes()
+
+        def publicar(df_previsoes: pd.DataFrame, progresso: tuple = None) -> RetratoDados:
+            with self._condicao:
+                self._versao += 1
+                self._retrato = RetratoDados(
+                    versao=self._versao,
+                    gerado_em=datetime.now(),
+                    df_previsoes=df_previsoes,
+                    df_radar=df_radar,
+                    df_resultados_pagina=df_pagina,
+                    tem_historico=not df_resultados.empty,
+                    parcial=parcial,
+                    falhas=falhas,
+                    progresso=progresso
+                )
+                self._condicao.notify_all()
+                return self._retrato
+
+        recalculadas = {'partidas': 0}
+
+        def prever() -> pd.DataFrame:
+            # Blocos em ordem de Hora: ciclos demorados publicam as partidas mais próximas antes das demais
+            for df, previstas, total in prever_em_blocos(
+                df_live, df_resultados, intervalo=INTERVALO_PUBLICACAO_PARCIAL, indice=indice,
+                cache=obter_cache_previsoes(), registros_anteriores=self._registros,
+                jogadores_alterados=jogadores_alterados, medicao=medicao, avaliacoes=self._avaliacoes
+            ):
+                if previstas < total:
+                    publicar(df, progresso=(previstas, total))
+            # Os registros ficam no trabalhador: em df.attrs seriam copiados (deepcopy) a cada filtro da tela
+            recalculadas['partidas'] = df.attrs.pop('partidas_recalculadas', 0)
+            self._registros = df.attrs.pop('registros_previsao', self._registros)
+            return df
 
-def load_data() -> pd.DataFrame:
-    """Carrega dados ao vivo com fallback para dados de exemplo"""
-    try:
-        rows = scrape_page(URL)
-        if not rows:
-            return criar_dados_exemplo()
+        if df_live.empty:
+            df_previsoes = df_live
+        else:
+            # Páginas (e configuração do modelo) inalteradas desde o último ciclo: reaproveita as previsões
+            versao_previsoes = None if parcial else (
+                buscador.versao(URL), buscador.versao(URL_RESULTADOS), CONFIGURACAO_PREVISOES
+            )
+            with etapa(medicao, "previsoes"):
+                df_previsoes = buscador.reutilizar('previsoes', versao_previsoes, prever)
+        self.estatisticas_ciclo = {'partidas': len(df_live), 'recalculadas': recalculadas['partidas']}
 
-        max_cols = max(len(r) for r in rows)
-        for r in rows:
-            r.extend([''] * (max_cols - len(r)))
-        df = pd.DataFrame(rows)
+        retrato = publicar(df_previsoes)
 
-        if df.shape[1] < 4:
-            return criar_dados_exemplo()
+        # Só ciclos completos e sem falhas substituem o retrato salvo (nunca troca dados bons por vazios)
+        if not parcial and not retrato.falhas:
+            try:
+                with etapa(medicao, "retrato.gravar"):
+                    salvar_retrato(retrato)
+            except Exception as e:
+                buscador._registrar_fonte("retrato", falhas=1, ok=False, ultimo_erro=f"{type(e).__name__}: {e}")
 
-        df = df[df[3].isin(ALLOWED_COMPETITIONS)].reset_index(drop=True)
-        df = df.drop(columns=[1])
-        df.columns = ["Hora", "Confronto", "Liga"] + [f"Coluna {i}" for i in range(4, df.shape[1] + 1)]
 
-        def players(txt: str):
-            clean = str(txt).replace("Ao Vivo Agora", "").strip()
-            m = re.search(r'\(([^)]+)\).*?x.*?\(([^)]+)\)', clean)
-            return (m.group(1).strip(), m.group(2).strip()) if m else ("", "")
+@st.cache_resource(show_spinner=False)
+def obter_trabalhador() -> TrabalhadorPrevisoes:
+    return TrabalhadorPrevisoes()
 
-        df[['Mandante', 'Visitante']] = df['Confronto'].apply(lambda x: pd.Series(players(x)))
-        df = df.drop(columns=['Confronto'])
 
-        liga_map_ao_vivo = {
-            "E-soccer - H2H GG League - 8 minutos de jogo": "H2H 8 Min",
-            "E-soccer - GT Leagues - 12 mins de jogo": "GT 12 Min",
-            "Esoccer Battle Volta - 6 Minutos de Jogo": "Volta 6 Min",
-            "E-soccer - Battle - 8 minutos de jogo": "Battle 8 Min"
-        }
-        df['Liga'] = df['Liga'].replace(liga_map_ao_vivo)
+# ==============================================
+# EXIBIÇÃO DAS PREVISÕES: o frame guarda números; cores, ícones e retrospecto entram só aqui
+# ==============================================
 
-        ordem = ['Hora', 'Liga', 'Mandante', 'Visitante']
-        df = df[ordem + [c for c in df.columns if c not in ordem]]
-        return df
+# Resultados SEM ÍCONES; Over/BTTS HT e FT com ícones de cor
+COLUNAS_RESULTADO_1X2 = ['Casa Vence', 'Empate', 'Fora Vence']
+COLUNAS_PORCENTAGEM_ICONE = [coluna for coluna in COLUNAS_MERCADOS_EXIBICAO if coluna not in COLUNAS_RESULTADO_1X2]
+COLUNAS_RETROSPECTO = ['Retrospecto Casa', 'Forma Casa', 'Retrospecto Fora', 'Forma Fora']
 
-    except Exception:
-        return criar_dados_exemplo()
 
+def nomes_com_retrospecto(jogadores: pd.Series, retrospecto: pd.Series, forma: pd.Series) -> pd.Series:
+    """'Jogador (V-E-D) ⚡forma%' nas partidas previstas; só o nome nas demais"""
+    texto = jogadores + " (" + retrospecto + ") ⚡" + forma.round().astype("Int64").astype(str) + "%"
+    return texto.where(forma.notna(), jogadores)
 
-def criar_dados_exemplo() -> pd.DataFrame:
-    """Cria dados de exemplo quando o scraping falha"""
-    dados_exemplo = {
-        'Hora': ['10:00', '11:30', '13:00', '14:30'],
-        'Liga': ['H2H 8 Min', 'GT 12 Min', 'Battle 8 Min', 'Volta 6 Min'],
-        'Mandante': ['Player A', 'Player C', 'Player E', 'Player G'],
-        'Visitante': ['Player B', 'Player D', 'Player F', 'Player H']
-    }
-    return pd.DataFrame(dados_exemplo)
 
+def estilizar_previsoes(df: pd.DataFrame):
+    """Styler da tabela de previsões: formata na exibição sem alterar os valores (a ordenação usa os números)"""
+    df_exibicao = df.drop(columns=[c for c in COLUNAS_RETROSPECTO if c in df.columns])
+    if 'Forma Casa' in df.columns:
+        df_exibicao['Mandante'] = nomes_com_retrospecto(df['Mandante'], df['Retrospecto Casa'], df['Forma Casa'])
+        df_exibicao['Visitante'] = nomes_com_retrospecto(df['Visitante'], df['Retrospecto Fora'],
+                                                         df['Forma Fora'])
 
-@st.cache_data(show_spinner=False, ttl=300)
-def load_data_with_update(update_param: int) -> pd.DataFrame:
-    return load_data()
+    return (
+        df_exibicao.style
+        .format("{:.2f}", subset=['xG Casa FT', 'xG Fora FT', 'Gols HT', 'Gols FT'], na_rep="")
+        .format(formatar_porcentagem_sem_icone, subset=COLUNAS_RESULTADO_1X2, na_rep="")
+        .format("{:.0f}%", subset=['Confiança'], na_rep="")
+        .format(formatar_porcentagem, subset=COLUNAS_PORCENTAGEM_ICONE, na_rep="")
+    )
 
 
-@st.cache_data(show_spinner=False, ttl=300)
-def scrape_resultados_with_update(update_param: int) -> pd.DataFrame:
-    return scrape_resultados()
+# Opções dos filtros da tela -> predicados sobre o frame de previsões
+FILTROS_VALOR = {
+    "Todas as Partidas": [],
+    "Apenas 💎 Diamante": [Predicado('Valor', '==', "💎")],
+    "💎 Diamante + 🔶 Laranja": [Predicado('Valor', 'em', ("💎", "🔶"))],
+}
+FILTROS_CLASSIFICACAO = {
+    "Todas as Classificações": [],
+    "🚀 HT OFENSIVO": [Predicado('Classificação HT', '==', "🚀 HT OFENSIVO")],
+    "🛡️ HT DEFENSIVO": [Predicado('Classificação HT', '==', "🛡️ HT DEFENSIVO")],
+    "🔥 OVER EXPLOSIVO": [Predicado('Classificação FT', '==', "🔥 OVER EXPLOSIVO")],
+    "⚡ OVER ALTO": [Predicado('Classificação FT', '==', "⚡ OVER ALTO")],
+    "🎯 OVER": [Predicado('Classificação FT', '==', "🎯 OVER")],
+    "🛡️ UNDER": [Predicado('Classificação FT', '==', "🛡️ UNDER")],
+}
 
 
 def aplicar_filtros(df: pd.DataFrame, liga_selecionada: str, filtro_valor: str,
-                    filtro_classificacao: str) -> pd.DataFrame:
-    """Aplica filtros ao DataFrame"""
-    df_filtrado = df.copy()
-
+                    filtro_classificacao: str, filtro_avancado: str = "", ordenar_por: str = None,
+                    limite: int = None) -> pd.DataFrame:
+    """Aplica filtros ao DataFrame (uma única máscara vetorizada; ValueError se o filtro avançado for inválido)"""
+    predicados = list(FILTROS_VALOR[filtro_valor]) + list(FILTROS_CLASSIFICACAO[filtro_classificacao])
     if liga_selecionada != "Todas":
-        df_filtrado = df_filtrado[df_filtrado['Liga'] == liga_selecionada]
-
-    if filtro_valor == "Apenas 💎 Diamante":
-        df_filtrado = df_filtrado[df_filtrado['Valor'] == "💎"]
-    elif filtro_valor == "💎 Diamante + 🔶 Laranja":
-        df_filtrado = df_filtrado[df_filtrado['Valor'].isin(["💎", "🔶"])]
-
-    # NOVO FILTRO: CLASSIFICAÇÃO HT E FT
-    if filtro_classificacao != "Todas as Classificações":
-        if filtro_classificacao == "🚀 HT OFENSIVO":
-            df_filtrado = df_filtrado[df_filtrado['Classificação HT'] == "🚀 HT OFENSIVO"]
-        elif filtro_classificacao == "🛡️ HT DEFENSIVO":
-            df_filtrado = df_filtrado[df_filtrado['Classificação HT'] == "🛡️ HT DEFENSIVO"]
-        elif filtro_classificacao == "🔥 OVER EXPLOSIVO":
-            df_filtrado = df_filtrado[df_filtrado['Classificação FT'] == "🔥 OVER EXPLOSIVO"]
-        elif filtro_classificacao == "⚡ OVER ALTO":
-            df_filtrado = df_filtrado[df_filtrado['Classificação FT'] == "⚡ OVER ALTO"]
-        elif filtro_classificacao == "🎯 OVER":
-            df_filtrado = df_filtrado[df_filtrado['Classificação FT'] == "🎯 OVER"]
-        elif filtro_classificacao == "🛡️ UNDER":
-            df_filtrado = df_filtrado[df_filtrado['Classificação FT'] == "🛡️ UNDER"]
-
-    return df_filtrado
+        predicados.append(Predicado('Liga', '==', liga_selecionada))
+    predicados += interpretar_filtro(filtro_avancado, df.columns, colunas_numericas(df))
+
+    return filtrar_previsoes(df, predicados, ordenar_por, limite)
 
 
 # ==============================================
 # FUNÇÃO ATUALIZADA: RADAR FIFA CORRIGIDO COM ÍCONES
 # ==============================================
 
-def criar_radar_fifa_corrigido(df_resultados: pd.DataFrame):
-    """Cria o Radar FIFA usando dados históricos REAIS da aba Resultados"""
-
-    st.header("⚡️ Radar FIFA ")
-    st.markdown("⭐️ **Indicador em Tempo Real do Cenario de Cada Liga**")
-
-    if df_resultados.empty:
-        st.info("⏳ Aguardando dados históricos...")
-        return
-
-    # ORDEM ESPECÍFICA SOLICITADA
-    ORDEM_COLUNAS = [
-        'Liga',
-        'Média HT',
-        'Média FT',
-        'Over 0.5 HT',
-        'Over 1.5 HT',
-        'Over 2.5 HT',
-        'Over 0.5 FT',
-        'Over 1.5 FT',
-        'Over 2.5 FT',
-        'Over 3.5 FT',
-        'Over 4.5 FT',
-        'Over 5.5 FT'
-    ]
-
-    # Agrupar por liga e pegar últimos 15 jogos REAIS
-    ligas_unicas = df_resultados['Liga'].unique()
-    resultados_radar = []
+# ORDEM ESPECÍFICA SOLICITADA
+COLUNAS_METRICAS_RADAR = [
+    'Média HT',
+    'Média FT',
+    'Over 0.5 HT',
+    'Over 1.5 HT',
+    'Over 2.5 HT',
+    'Over 0.5 FT',
+    'Over 1.5 FT',
+    'Over 2.5 FT',
+    'Over 3.5 FT',
+    'Over 4.5 FT',
+    'Over 5.5 FT'
+]
+COLUNAS_RADAR = ['Janela', 'Liga', 'Jogos'] + COLUNAS_METRICAS_RADAR
+
+
+def metricas_radar(total_ht: np.ndarray, total_ft: np.ndarray) -> np.ndarray:
+    """Uma linha por jogo: totais HT/FT e 100/0 para cada linha de over (a média vira a porcentagem)"""
+    total_ht = np.asarray(total_ht, dtype=float)
+    total_ft = np.asarray(total_ft, dtype=float)
+    colunas = [total_ht, total_ft]
+    colunas += [(total_ht > limite) * 100.0 for limite in (0.5, 1.5, 2.5)]
+    colunas += [(total_ft > limite) * 100.0 for limite in (0.5, 1.5, 2.5, 3.5, 4.5, 5.5)]
+    return np.column_stack(colunas)
+
+
+def _jogos_validos_radar(df_resultados: pd.DataFrame) -> pd.DataFrame:
+    df = df_resultados
+    if 'Válido' in df.columns:
+        df = df[df['Válido']]
+    return df[df['Liga'].notna() & (df['Liga'] != '')]
+
+
+class RadarIncremental:
+    """Contadores móveis por liga e janela: cada resultado novo soma/subtrai em O(1)
+
+    As janelas por período usam o relógio no fuso das fontes (agora_fontes), o mesmo das datas raspadas.
+    """
+
+    def __init__(self, janelas: Dict = None):
+        self.janelas = janelas or JANELAS_RADAR
+        # (janela, liga) -> {'jogos': deque[(data, métricas)], 'soma': np.ndarray}
+        self._contadores: Dict[tuple, Dict] = {}
+        # (Data, Liga, Mandante, Visitante) dos jogos já contados: um jogo repetido não soma duas vezes
+        self._vistos: set = set()
+        self._limite_vistos = None
+
+    def carregar(self, df_resultados: pd.DataFrame, agora: datetime = None) -> None:
+        """Inicializa os contadores a partir do histórico em uma passada (groupby por janela)"""
+        self._contadores = {}
+        self._vistos = set()
+        self._limite_vistos = None
+        if df_resultados.empty:
+            return
+
+        agora = agora or agora_fontes()
+        df = _jogos_validos_radar(df_resultados).dropna(subset=['Data'])
+        df = df.sort_values('Data', ascending=False, kind='stable')
+        posicao_na_liga = df.groupby('Liga', sort=False, observed=True).cumcount().to_numpy()
+
+        # Só as linhas que cabem em alguma janela entram nas métricas e nos grupos
+        maior_contagem = max([j for j in self.janelas.values() if isinstance(j, int)], default=0)
+        maior_periodo = max([j for j in self.janelas.values() if not isinstance(j, int)], default=None)
+        necessarios = posicao_na_liga < maior_contagem
+        if maior_periodo is not None:
+            necessarios |= (df['Data'] >= agora - maior_periodo).to_numpy()
+        df, posicao_na_liga = df[necessarios], posicao_na_liga[necessarios]
+
+        ligas = df['Liga'].to_numpy()
+        datas = df['Data'].to_numpy()
+        metricas = metricas_radar(df['Total HT'], df['Total FT'])
+        self._vistos = set(zip(datas, ligas, df['Mandante'].to_numpy(), df['Visitante'].to_numpy()))
+
+        for nome, janela in self.janelas.items():
+            if isinstance(janela, int):
+                na_janela = np.flatnonzero(posicao_na_liga < janela)
+            else:
+                na_janela = np.flatnonzero(datas >= np.datetime64(agora - janela))
+            grupos = pd.DataFrame(metricas[na_janela]).groupby(ligas[na_janela], sort=False)
+            somas = grupos.sum()
+            for liga, posicoes in grupos.indices.items():
+                # Deque do jogo mais antigo para o mais recente, como o ingerir monta
+                posicoes = na_janela[posicoes[::-1]]
+                self._contadores[(nome, liga)] = {
+                    'jogos': deque(zip(datas[posicoes], metricas[posicoes])),
+                    'soma': somas.loc[liga].to_numpy(dtype=float, copy=True)
+                }
+
+    def ingerir(self, df_novos: pd.DataFrame) -> None:
+        """Adiciona resultados novos aos contadores de cada janela"""
+        if df_novos is None or df_novos.empty:
+            return
+        df = _jogos_validos_radar(df_novos).dropna(subset=['Data']).sort_values('Data', kind='stable')
+        metricas = metricas_radar(df['Total HT'], df['Total FT'])
+        chaves = zip(df['Data'].to_numpy(), df['Liga'].to_numpy(), df['Mandante'].to_numpy(),
+                     df['Visitante'].to_numpy())
+        for chave, vetor in zip(chaves, metricas):
+            if chave in self._vistos:
+                continue
+            self._vistos.add(chave)
+            data, liga = chave[:2]
+            for nome, janela in self.janelas.items():
+                self._adicionar(nome, janela, liga, data, vetor)
+        self._podar_vistos()
+
+    def _podar_vistos(self) -> None:
+        """Esquece os jogos mais antigos que tudo o que as janelas guardam: se voltarem, já saem na hora"""
+        antigos = [contador['jogos'][0][0] for contador in self._contadores.values() if contador['jogos']]
+        limite = min(antigos) if antigos else None
+        if limite is not None and limite != self._limite_vistos:
+            self._vistos = {chave for chave in self._vistos if chave[0] >= limite}
+            self._limite_vistos = limite
+
+    def _adicionar(self, nome: str, janela, liga: str, data, vetor: np.ndarray) -> None:
+        contador = self._contadores.setdefault((nome, liga), {'jogos': deque(), 'soma': np.zeros(len(vetor))})
+        jogos = contador['jogos']
+        if not jogos or data >= jogos[-1][0]:
+            jogos.append((data, vetor))
+            contador['soma'] += vetor
+        else:
+            # Resultado fora de ordem (placar completado depois): insere na posição e refaz a soma
+            jogos.insert(bisect.bisect_right([d for d, _ in jogos], data), (data, vetor))
+            contador['soma'] = np.sum([v for _, v in jogos], axis=0)
+
+        if isinstance(janela, int):
+            while len(jogos) > janela:
+                contador['soma'] -= jogos.popleft()[1]
+
+    def _expirar(self, agora: datetime) -> None:
+        limite_agora = np.datetime64(agora)
+        for (nome, _), contador in self._contadores.items():
+            janela = self.janelas[nome]
+            if isinstance(janela, int):
+                continue
+            jogos = contador['jogos']
+            while jogos and jogos[0][0] < limite_agora - np.timedelta64(janela):
+                contador['soma'] -= jogos.popleft()[1]
+
+    def tabela(self, agora: datetime = None) -> pd.DataFrame:
+        """Radar atual a partir dos contadores: uma linha por janela e liga, nas colunas de COLUNAS_RADAR"""
+        self._expirar(agora or agora_fontes())
+        self._podar_vistos()
+        linhas = [
+            [nome, liga, len(contador['jogos'])] + list(contador['soma'] / len(contador['jogos']))
+            for (nome, liga), contador in sorted(self._contadores.items(),
+                                                 key=lambda item: (list(self.janelas).index(item[0][0]), item[0][1]))
+            if contador['jogos']
+        ]
+        return pd.DataFrame(linhas, columns=COLUNAS_RADAR)
 
-    for liga in ligas_unicas:
-        # 🎯 15 JOGOS REAIS da aba Resultados
-        jogos_reais_da_liga = df_resultados[df_resultados['Liga'] == liga].sort_values('Data', ascending=False).head(15)
-        total_jogos = len(jogos_reais_da_liga)
 
-        if total_jogos < 5:  # Mínimo de 5 jogos válidos
-            continue
+def formatar_radar(df_radar: pd.DataFrame, janela: str) -> pd.DataFrame:
+    """Linhas da janela com jogos suficientes, já formatadas para exibição"""
+    df_radar = df_radar[(df_radar['Janela'] == janela) & (df_radar['Jogos'] >= RADAR_MIN_JOGOS)]
 
-        # Calcular estatísticas REAIS
-        try:
-            # Médias de gols REAIS
-            media_gols_ht = jogos_reais_da_liga['Total HT'].mean()
-            media_gols_ft = jogos_reais_da_liga['Total FT'].mean()
-
-            # Contar ocorrências REAIS dos mercados
-            over_05_ht = (jogos_reais_da_liga['Total HT'] > 0.5).sum()
-            over_15_ht = (jogos_reais_da_liga['Total HT'] > 1.5).sum()
-            over_25_ht = (jogos_reais_da_liga['Total HT'] > 2.5).sum()
-
-            over_05_ft = (jogos_reais_da_liga['Total FT'] > 0.5).sum()
-            over_15_ft = (jogos_reais_da_liga['Total FT'] > 1.5).sum()
-            over_25_ft = (jogos_reais_da_liga['Total FT'] > 2.5).sum()
-            over_35_ft = (jogos_reais_da_liga['Total FT'] > 3.5).sum()
-            over_45_ft = (jogos_reais_da_liga['Total FT'] > 4.5).sum()
-            over_55_ft = (jogos_reais_da_liga['Total FT'] > 5.5).sum()
+    # Formatação só na exibição: médias com 2 casas e porcentagens COM ÍCONES
+    df_exibicao = df_radar.drop(columns=['Janela']).reset_index(drop=True)
+    for coluna in ['Média HT', 'Média FT']:
+        df_exibicao[coluna] = df_exibicao[coluna].map(lambda valor: f"{valor:.2f}")
+    for coluna in COLUNAS_METRICAS_RADAR[2:]:
+        df_exibicao[coluna] = df_exibicao[coluna].map(formatar_porcentagem_radar)
+    return df_exibicao
 
-        except Exception as e:
-            continue
-
-        # Calcular porcentagens REAIS COM ÍCONES
-        linha_liga = {
-            'Liga': liga,
-            'Média HT': f"{media_gols_ht:.2f}",
-            'Média FT': f"{media_gols_ft:.2f}",
-            'Over 0.5 HT': formatar_porcentagem_radar((over_05_ht / total_jogos) * 100),
-            'Over 1.5 HT': formatar_porcentagem_radar((over_15_ht / total_jogos) * 100),
-            'Over 2.5 HT': formatar_porcentagem_radar((over_25_ht / total_jogos) * 100),
-            'Over 0.5 FT': formatar_porcentagem_radar((over_05_ft / total_jogos) * 100),
-            'Over 1.5 FT': formatar_porcentagem_radar((over_15_ft / total_jogos) * 100),
-            'Over 2.5 FT': formatar_porcentagem_radar((over_25_ft / total_jogos) * 100),
-            'Over 3.5 FT': formatar_porcentagem_radar((over_35_ft / total_jogos) * 100),
-            'Over 4.5 FT': formatar_porcentagem_radar((over_45_ft / total_jogos) * 100),
-            'Over 5.5 FT': formatar_porcentagem_radar((over_55_ft / total_jogos) * 100)
-        }
 
-        resultados_radar.append(linha_liga)
+@st.fragment
+def criar_radar_fifa_corrigido(retrato: RetratoDados):
+    """Exibe o Radar FIFA já calculado (trocar a janela só reexecuta este trecho)"""
 
-    # Criar DataFrame do Radar
-    if resultados_radar:
-        df_radar = pd.DataFrame(resultados_radar)
+    st.header("⚡️ Radar FIFA ")
+    st.markdown("⭐️ **Indicador em Tempo Real do Cenario de Cada Liga**")
 
-        # Limpar DataFrame
-        df_radar = df_radar[df_radar['Liga'].notna()]
-        df_radar = df_radar[df_radar['Liga'] != '']
+    if not retrato.tem_historico:
+        st.info("⏳ Aguardando dados históricos...")
+        return
 
-        # Garantir ordem solicitada
-        colunas_existentes = [col for col in ORDEM_COLUNAS if col in df_radar.columns]
-        df_radar = df_radar[colunas_existentes]
+    janela = st.radio("Janela", list(JANELAS_RADAR), horizontal=True, key="janela_radar")
+    df_exibicao = retrato.derivado(('radar', janela), lambda: formatar_radar(retrato.df_radar, janela))
 
+    if not df_exibicao.empty:
         # Exibir radar
         st.markdown('<div class="radar-table">', unsafe_allow_html=True)
         st.dataframe(
-            df_radar,
+            df_exibicao,
             use_container_width=True,
-            height=min(400, 35 * (len(df_radar) + 1))
+            height=min(400, 35 * (len(df_exibicao) + 1))
         )
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -871,7 +1083,146 @@ def criar_radar_fifa_corrigido(df_resultados: pd.DataFrame):
         st.info("📊 Nenhum dado disponível para o Radar FIFA no momento.")
 
 
+def exibir_estatisticas_busca() -> None:
+    """Mostra quantas atualizações foram reaproveitadas sem baixar/processar de novo"""
+    estatisticas = obter_buscador().estatisticas()
+    with st.expander("📡 Estatísticas de Atualização"):
+        st.markdown(
+            f"- **Requisições:** {estatisticas['requisicoes']}\n"
+            f"- **Acertos (sem mudança):** {estatisticas['acertos']} "
+            f"(304: {estatisticas['nao_modificadas']}, mesmo conteúdo: {estatisticas['conteudo_igual']})\n"
+            f"- **Falhas de cache (conteúdo novo):** {estatisticas['falhas_cache']}\n"
+            f"- **Erros HTTP:** {estatisticas['falhas']}\n"
+            f"- **Processamentos reaproveitados:** {estatisticas['reutilizacoes']} "
+            f"de {estatisticas['reutilizacoes'] + estatisticas['reconstrucoes']}"
+        )
+        disco = obter_cache_disco().estatisticas()
+        st.markdown(
+            f"- **Cache em disco:** {disco['itens']} arquivos, {disco['bytes'] / 2 ** 20:.1f} de "
+            f"{disco['max_bytes'] / 2 ** 20:.0f} MB, acertos {disco['acertos']} / falhas {disco['falhas']} "
+            f"({disco['taxa_acerto']:.0f}%), despejos {disco['despejos']} — páginas retomadas "
+            f"{estatisticas['paginas_disco']}, frames lidos {estatisticas['frames_disco']}"
+            + (f" — modo de rede: **{MODO_REDE}**" if MODO_REDE != "normal" else "")
+        )
+        cache = obter_cache_previsoes().estatisticas()
+        st.markdown(
+            f"- **Cache de previsões:** {cache['itens']} partidas, acertos {cache['acertos']} / "
+            f"falhas {cache['falhas']} ({cache['taxa_acerto']:.0f}%), "
+            f"expirados {cache['expirados']}, despejos {cache['despejos']}"
+        )
+        ciclo = obter_trabalhador().estatisticas_ciclo
+        st.markdown(
+            f"- **Último ciclo:** {ciclo['recalculadas']} de {ciclo['partidas']} partidas recalculadas"
+        )
+        for url, fonte in obter_buscador().situacao_fontes().items():
+            situacao = "✅" if fonte['ok'] else "❌"
+            st.markdown(
+                f"{situacao} `{url}` — {fonte['duracao']:.2f}s, tentativas: {fonte['tentativas']}, "
+                f"falhas: {fonte['falhas']}" + (f" — {fonte['ultimo_erro']}" if fonte['ultimo_erro'] else "")
+            )
+
+
+def tabela_etapas(registro: Dict) -> pd.DataFrame:
+    """Etapas de uma medição, da mais cara para a mais barata"""
+    linhas = [
+        [nome, etapa_medida['n'], etapa_medida['total_ms'], etapa_medida['total_ms'] / etapa_medida['n'],
+         etapa_medida['max_ms']]
+        for nome, etapa_medida in registro['etapas'].items()
+    ]
+    df = pd.DataFrame(linhas, columns=['Etapa', 'N', 'Total (ms)', 'Média (ms)', 'Máx (ms)'])
+    return df.sort_values('Total (ms)', ascending=False).round(1)
+
+
+def exibir_painel_depuracao(medicao_render: Medicao) -> None:
+    """Barra lateral com os tempos por etapa do último ciclo do trabalhador e desta renderização"""
+    metricas = obter_metricas()
+    with st.sidebar:
+        st.markdown("### 🛠️ Depuração")
+        # O tracemalloc vale para o processo inteiro: pela URL (?debug=1) o painel só mostra, não liga
+        medir_memoria = st.checkbox("Medir pico de memória (tracemalloc)", value=metricas.medir_memoria,
+                                    disabled=not DEPURACAO,
+                                    help="Vale a partir do próximo ciclo; deixa o processamento mais lento"
+                                    + ("" if DEPURACAO else ". Disponível só com FIFA_DEPURACAO=1"))
+        if DEPURACAO:
+            metricas.medir_memoria = medir_memoria
+        for titulo, medicao in (("Último ciclo", metricas.ultima("ciclo")), ("Esta renderização", medicao_render)):
+            if medicao is None:
+                st.caption(f"{titulo}: aguardando a primeira medição...")
+                continue
+            registro = medicao.como_dict()
+            pico = registro['pico_memoria_mb']
+            st.markdown(f"**{titulo}** — {registro['duracao_ms']:.0f} ms"
+                        + (f", pico de memória {pico:.1f} MB" if pico is not None else ""))
+            st.dataframe(tabela_etapas(registro), hide_index=True, use_container_width=True)
+        st.caption(f"Métricas por ciclo/renderização em `{metricas.caminho}`")
+
+
+@st.fragment
+def exibir_previsoes(retrato: RetratoDados, medicao: Medicao = None) -> None:
+    """Filtros e tabela de previsões; mexer nos filtros só reexecuta este trecho, a partir do retrato já calculado"""
+    df_live_com_previsoes = retrato.df_previsoes
+    if not df_live_com_previsoes.empty:
+        st.success(f"✅ {len(df_live_com_previsoes)} Partidas Ao Vivo Processadas")
+
+        # FILTROS INTELIGENTES - AGORA COM 3 COLUNAS
+        st.markdown("---")
+        st.markdown("#### 🔍 Filtros Inteligentes")
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            ligas_disponiveis = ["Todas"] + sorted(df_live_com_previsoes['Liga'].unique().tolist())
+            liga_selecionada = st.selectbox("Liga", ligas_disponiveis)
+
+        with col2:
+            filtro_valor = st.selectbox("Oportunidades", list(FILTROS_VALOR))
+
+        with col3:
+            # NOVO FILTRO: CLASSIFICAÇÃO HT E FT
+            filtro_classificacao = st.selectbox("Classificação HT e FT", list(FILTROS_CLASSIFICACAO))
+
+        # FILTRO AVANÇADO: condições numéricas combinadas e top-K por qualquer mercado
+        col4, col5, col6 = st.columns([3, 2, 1])
+        with col4:
+            filtro_avancado = st.text_input("Filtro avançado",
+                                            placeholder="Over 2.5 FT >= 72 e BTTS FT >= 60 e Confiança >= 80")
+        with col5:
+            ordenar_por = st.selectbox("Ordenar por", ["Hora"] + COLUNAS_NUMERICAS_PREVISOES)
+        with col6:
+            limite = st.number_input("Top", min_value=0, value=0, step=5, help="0 = todas")
+
+        filtros = (liga_selecionada, filtro_valor, filtro_classificacao, filtro_avancado.strip(),
+                   None if ordenar_por == "Hora" else ordenar_por, int(limite) or None)
+
+        # Aplicar filtros (COM NOVO FILTRO DE CLASSIFICAÇÃO)
+        with etapa(medicao, "filtros"):
+            try:
+                df_filtrado = retrato.derivado(('filtros',) + filtros,
+                                               lambda: aplicar_filtros(df_live_com_previsoes, *filtros))
+            except ValueError as erro:
+                st.warning(f"⚠️ Filtro avançado: {erro}")
+                return
+        st.success(f"**{len(df_filtrado)}** partidas filtradas")
+
+        # Exibir dataframe
+        with etapa(medicao, "tabela_previsoes"):
+            st.dataframe(estilizar_previsoes(df_filtrado), use_container_width=True)
+
+    else:
+        st.info("📊 Nenhuma partida ao vivo encontrada no momento.")
+
+
+@st.fragment(run_every=INTERVALO_ACOMPANHAMENTO)
+def acompanhar_trabalhador(versao_exibida: int = None) -> None:
+    """Reexecuta a página só quando o trabalhador publica um retrato novo (sem recarregar a cada intervalo)"""
+    retrato = obter_trabalhador().retrato()
+    if retrato is not None and retrato.versao != versao_exibida:
+        st.rerun()
+
+
 def main() -> None:
+    medicao = Medicao("render")
+
     # Header personalizado
     st.markdown("""
     <div class="main-header">
@@ -882,16 +1233,35 @@ def main() -> None:
     </div>
     """, unsafe_allow_html=True)
 
-    # ATUALIZAÇÃO AUTOMÁTICA A CADA 5 MINUTOS (300.000 ms)
-    count = st_autorefresh(interval=300000, limit=None, key="auto_refresh")
+    # ATUALIZAÇÃO AUTOMÁTICA A CADA 5 MINUTOS (300.000 ms) - só relê o último retrato publicado
+    st_autorefresh(interval=INTERVALO_ATUALIZACAO * 1000, limit=None, key="auto_refresh")
 
     # BOTÃO À ESQUERDA - NOVO ESTILO
     col_botoes = st.columns([1, 4, 1])
     with col_botoes[0]:  # Primeira coluna (esquerda)
         atualizar = st.button("🔄 Atualizar Dados")
 
-    # Parâmetro para invalidar cache: 1 se atualizar manual, senão count da auto atualização
-    update_param = 1 if atualizar else count
+    # Busca, histórico e previsões rodam no trabalhador em segundo plano; a página só lê o retrato
+    trabalhador = obter_trabalhador()
+    if atualizar:
+        trabalhador.solicitar_atualizacao()
+
+    with st.spinner("Carregando dados ao vivo e aplicando previsões..."), etapa(medicao, "aguardar_retrato"):
+        retrato = trabalhador.aguardar_retrato(timeout=ESPERA_PRIMEIRO_RETRATO)
+
+    # Retrato provisório (nenhum, o salvo em disco ou previsões ainda em blocos): acompanha o trabalhador
+    if retrato is None or retrato.restaurado or retrato.em_andamento:
+        acompanhar_trabalhador(retrato.versao if retrato else None)
+
+    if retrato is None:
+        st.info("⏳ Primeira coleta de dados em andamento... a página atualiza sozinha.")
+        return
+
+    if retrato.restaurado:
+        st.warning(f"🕒 Dados salvos — desatualizados desde {retrato.gerado_em:%d/%m %H:%M:%S}. "
+                   "Atualizando em segundo plano...")
+    else:
+        st.caption(f"🕒 Dados de {retrato.gerado_em:%H:%M:%S} (versão {retrato.versao})")
 
     # AGORA COM 3 ABAS - ADICIONANDO O RADAR FIFA
     tab1, tab2, tab3 = st.tabs(["⭐️ Ao Vivo - Previsões", "⚡️ Radar FIFA", "⚽️ Resultados"])
@@ -899,79 +1269,48 @@ def main() -> None:
     with tab1:
         st.markdown("###  🌎 API Bet365")
 
-        with st.spinner("Carregando dados ao vivo e aplicando previsões..."):
-            try:
-                df_live = load_data_with_update(update_param)
-                df_resultados = scrape_resultados_with_update(update_param)
-
-                if not df_live.empty:
-                    df_live_com_previsoes = aplicar_previsoes_avancadas(df_live, df_resultados)
-                    st.success(f"✅ {len(df_live_com_previsoes)} Partidas Ao Vivo Processadas")
-
-                    # FILTROS INTELIGENTES - AGORA COM 3 COLUNAS
-                    st.markdown("---")
-                    st.markdown("#### 🔍 Filtros Inteligentes")
-
-                    col1, col2, col3 = st.columns(3)
-
-                    with col1:
-                        ligas_disponiveis = ["Todas"] + sorted(df_live_com_previsoes['Liga'].unique().tolist())
-                        liga_selecionada = st.selectbox("Liga", ligas_disponiveis)
-
-                    with col2:
-                        opcoes_valor = [
-                            "Todas as Partidas",
-                            "Apenas 💎 Diamante",
-                            "💎 Diamante + 🔶 Laranja"
-                        ]
-                        filtro_valor = st.selectbox("Oportunidades", opcoes_valor)
-
-                    with col3:
-                        # NOVO FILTRO: CLASSIFICAÇÃO HT E FT
-                        opcoes_classificacao = [
-                            "Todas as Classificações",
-                            "🚀 HT OFENSIVO",
-                            "🛡️ HT DEFENSIVO",
-                            "🔥 OVER EXPLOSIVO",
-                            "⚡ OVER ALTO",
-                            "🎯 OVER",
-                            "🛡️ UNDER"
-                        ]
-                        filtro_classificacao = st.selectbox("Classificação HT e FT", opcoes_classificacao)
-
-                    # Aplicar filtros (COM NOVO FILTRO DE CLASSIFICAÇÃO)
-                    df_filtrado = aplicar_filtros(df_live_com_previsoes, liga_selecionada, filtro_valor,
-                                                  filtro_classificacao)
-                    st.success(f"**{len(df_filtrado)}** partidas filtradas")
-
-                    # Exibir dataframe
-                    st.dataframe(df_filtrado, use_container_width=True)
-
-                else:
-                    st.info("📊 Nenhuma partida ao vivo encontrada no momento.")
+        try:
+            if retrato.parcial:
+                st.caption("⏳ Resultados ainda carregando — previsões com o histórico local.")
+            if retrato.em_andamento:
+                previstas, total = retrato.progresso
+                st.progress(previstas / total,
+                            text=f"⏳ Previsões em andamento: {previstas} de {total} partidas "
+                                 "(mais próximas primeiro)")
 
-            except Exception as e:
-                st.error(f"💥 Erro crítico no processamento: {e}")
+            for url_falha, erro in retrato.falhas.items():
+                st.warning(f"⚠️ Falha ao buscar {url_falha}: {erro}")
 
-    with tab2:  # NOVA ABA RADAR FIFA
-        with st.spinner("Carregando Radar FIFA com dados reais..."):
-            df_resultados = scrape_resultados_with_update(update_param)
-            criar_radar_fifa_corrigido(df_resultados)
+            exibir_previsoes(retrato, medicao)
+
+        except Exception as e:
+            st.error(f"💥 Erro crítico no processamento: {e}")
+
+    with tab2, etapa(medicao, "radar"):  # NOVA ABA RADAR FIFA
+        criar_radar_fifa_corrigido(retrato)
 
     with tab3:
         st.markdown("### ⚽️ Resultados Recentes")
-        with st.spinner("Carregando resultados..."):
-            df_res = scrape_resultados_with_update(update_param)
+        df_res = retrato.df_resultados_pagina
 
         if not df_res.empty:
             st.success(f"📈 {len(df_res)} linhas de resultados encontradas.")
-            st.dataframe(df_res, use_container_width=True)
+            with etapa(medicao, "tabela_resultados"):
+                st.dataframe(df_res, use_container_width=True)
         else:
             st.info("📭 Nenhum resultado encontrado.")
 
+    with etapa(medicao, "estatisticas"):
+        exibir_estatisticas_busca()
+
     st.caption(
         "Apresentação gerada pelo sistema FifaAlgorithm - Todos os direitos reservados | DESENVOLVEDOR - VAGNER")
 
+    medicao.extras['versao'] = retrato.versao
+    obter_metricas().publicar(medicao)
+    if DEPURACAO or st.query_params.get("debug") == "1":
+        exibir_painel_depuracao(medicao)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""Backtest cronológico do modelo: cada jogo do histórico é previsto só com os jogos anteriores a ele.
+
+Uso:
+    python backtest.py --resultados historico.parquet [--saida previsoes_backtest.parquet]
+
+Reproduz a previsão do app (mesmos recortes de confrontos/forma/histórico, mesmo modelo de lambda — janelas
+ou avaliações dos jogadores —, mesma confiança e mesmo critério de valor 💎/🔶) e avalia Brier, log-loss,
+calibração por faixa e a taxa de acerto por nível de valor. Só entram jogos com placar final válido; jogos
+com a mesma data/hora não se enxergam.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from nucleo import (
+    COLUNAS_MERCADOS, MEIA_VIDA_AVALIACAO, MODELO_LAMBDA, AvaliacoesJogadores, PoissonMonteCarloPredictor,
+    identificar_valor_aposta, ponderar_lambda, pontuar_confianca
+)
+from prever_lote import gravar_tabela, ler_tabela, preparar_resultados
+
+# Mesmos recortes da previsão ao vivo (coletar_partida)
+LIMITE_CONFRONTOS = 5
+LIMITE_FORMA = 10
+LIMITE_HISTORICO = 20
+TAMANHO_LOTE = 20000
+FAIXAS_CALIBRACAO = 10
+EPSILON_LOG = 1e-6
+# Acima dessa fração de datas que não convertem o histórico está em formato errado: o backtest para em vez de
+# avaliar só o que sobrou
+MAX_DATAS_INVALIDAS = 0.01
+
+# Mercado binário -> função (gols HT casa, HT fora, FT casa, FT fora) -> acertou
+MERCADOS_BINARIOS = {
+    'Over 0.5 HT': lambda hc, hf, fc, ff: hc + hf > 0.5,
+    'Over 1.5 HT': lambda hc, hf, fc, ff: hc + hf > 1.5,
+    'Over 2.5 HT': lambda hc, hf, fc, ff: hc + hf > 2.5,
+    'BTTS HT': lambda hc, hf, fc, ff: (hc > 0) & (hf > 0),
+    'Over 0.5 FT': lambda hc, hf, fc, ff: fc + ff > 0.5,
+    'Over 1.5 FT': lambda hc, hf, fc, ff: fc + ff > 1.5,
+    'Over 2.5 FT': lambda hc, hf, fc, ff: fc + ff > 2.5,
+    'Over 3.5 FT': lambda hc, hf, fc, ff: fc + ff > 3.5,
+    'Over 4.5 FT': lambda hc, hf, fc, ff: fc + ff > 4.5,
+    'Over 5.5 FT': lambda hc, hf, fc, ff: fc + ff > 5.5,
+    'BTTS FT': lambda hc, hf, fc, ff: (fc > 0) & (ff > 0),
+}
+
+
+class IndiceAsOf:
+    """Jogos de cada jogador e de cada confronto em ordem cronológica, consultados "até" uma posição
+
+    Com o histórico ordenado do mais antigo para o mais recente, os jogos anteriores a uma posição são
+    um prefixo de cada lista (busca binária), sem refiltrar o frame a cada partida.
+    """
+
+    def __init__(self, mandantes: np.ndarray, visitantes: np.ndarray, gols_casa: np.ndarray, gols_fora: np.ndarray):
+        num_jogos = len(mandantes)
+        posicoes = np.arange(num_jogos)
+
+        # Jogador -> (posições, gols feitos em cada jogo), intercalando mandante e visitante
+        jogadores = pd.Series(np.column_stack([mandantes, visitantes]).ravel())
+        posicoes_jogador = np.repeat(posicoes, 2)
+        gols_feitos = np.column_stack([gols_casa, gols_fora]).ravel()
+        self.por_jogador: Dict[str, tuple] = {
+            jogador: (posicoes_jogador[grupo], gols_feitos[grupo])
+            for jogador, grupo in jogadores.groupby(jogadores, sort=False).indices.items()
+        }
+
+        # Par não ordenado -> posições dos confrontos
+        menor = np.where(mandantes <= visitantes, mandantes, visitantes)
+        maior = np.where(mandantes <= visitantes, visitantes, mandantes)
+        pares = pd.DataFrame({'menor': menor, 'maior': maior})
+        self.por_confronto: Dict[tuple, np.ndarray] = {
+            par: posicoes[grupo] for par, grupo in pares.groupby(['menor', 'maior'], sort=False).indices.items()
+        }
+
+    def jogos_antes(self, jogador: str, corte: int, limite: int) -> tuple:
+        """Posições e gols feitos dos últimos `limite` jogos do jogador antes de `corte` (mais recente primeiro)"""
+        posicoes, gols = self.por_jogador[jogador]
+        fim = np.searchsorted(posicoes, corte)
+        inicio = max(0, fim - limite)
+        return posicoes[inicio:fim][::-1], gols[inicio:fim][::-1]
+
+    def confrontos_antes(self, jogador1: str, jogador2: str, corte: int, limite: int) -> np.ndarray:
+        """Posições dos últimos `limite` confrontos diretos antes de `corte` (mais recente primeiro)"""
+        par = (jogador1, jogador2) if jogador1 <= jogador2 else (jogador2, jogador1)
+        posicoes = self.por_confronto[par]
+        fim = np.searchsorted(posicoes, corte)
+        return posicoes[max(0, fim - limite):fim][::-1]
+
+
+def _media_gols(gols: np.ndarray) -> float:
+    return gols.mean() if len(gols) else 1.5
+
+
+def coletar_estatisticas(df: pd.DataFrame) -> pd.DataFrame:
+    """Contagens e médias de gols de cada jogo usando só os jogos com data anterior (um jogo por linha)"""
+    mandantes = df['Mandante'].to_numpy(dtype=object)
+    visitantes = df['Visitante'].to_numpy(dtype=object)
+    gols_casa = df['Mandante FT'].to_numpy(dtype=float)
+    gols_fora = df['Visitante FT'].to_numpy(dtype=float)
+    indice = IndiceAsOf(mandantes, visitantes, gols_casa, gols_fora)
+
+    # Jogos com a mesma data/hora não entram na previsão um do outro: corte = primeira posição daquela data
+    datas = df['Data'].to_numpy()
+    cortes = np.searchsorted(datas, datas, side='left')
+
+    num_jogos = len(df)
+    estatisticas = np.empty((num_jogos, 9))
+    for i in range(num_jogos):
+        casa, fora, corte = mandantes[i], visitantes[i], cortes[i]
+        confrontos = indice.confrontos_antes(casa, fora, corte, LIMITE_CONFRONTOS)
+        eh_casa = mandantes[confrontos] == casa
+        linha = [len(confrontos)]
+
+        for jogador, do_mandante in ((casa, eh_casa), (fora, ~eh_casa)):
+            gols_confrontos = np.where(do_mandante, gols_casa[confrontos], gols_fora[confrontos])
+
+            # Forma: últimos jogos sem os confrontos já considerados; histórico: últimos 20 jogos
+            posicoes, gols = indice.jogos_antes(jogador, corte, LIMITE_HISTORICO + LIMITE_CONFRONTOS)
+            fora_dos_confrontos = ~np.isin(posicoes, confrontos)
+            gols_forma = gols[fora_dos_confrontos][:LIMITE_FORMA]
+
+            linha += [_media_gols(gols_confrontos), len(gols_forma), _media_gols(gols_forma),
+                      _media_gols(gols[:LIMITE_HISTORICO])]
+        estatisticas[i] = linha
+
+    return pd.DataFrame(estatisticas, index=df.index, columns=[
+        'Confrontos',
+        'Média Confrontos Casa', 'Forma Casa', 'Média Forma Casa', 'Média Histórico Casa',
+        'Média Confrontos Fora', 'Forma Fora', 'Média Forma Fora', 'Média Histórico Fora'
+    ])
+
+
+def lambdas_avaliacoes(df: pd.DataFrame, avaliacoes: AvaliacoesJogadores) -> np.ndarray:
+    """Lambdas FT (casa, fora) de cada jogo pelas avaliações de antes dele; o jogo entra nelas depois
+
+    Como em coletar_estatisticas, jogos com a mesma data/hora só entram depois de todos serem previstos.
+    """
+    ligas = df['Liga'].to_numpy(dtype=object)
+    mandantes = df['Mandante'].to_numpy(dtype=object)
+    visitantes = df['Visitante'].to_numpy(dtype=object)
+    gols_casa = df['Mandante FT'].to_numpy(dtype=float)
+    gols_fora = df['Visitante FT'].to_numpy(dtype=float)
+    datas = df['Data'].to_numpy()
+    cortes = np.searchsorted(datas, datas, side='left')
+
+    lambdas = np.empty((len(df), 2))
+    pendentes_desde = 0
+    for i in range(len(df)):
+        if cortes[i] > pendentes_desde:
+            for j in range(pendentes_desde, cortes[i]):
+                avaliacoes.registrar(ligas[j], mandantes[j], visitantes[j], gols_casa[j], gols_fora[j])
+            pendentes_desde = cortes[i]
+        lambdas[i] = avaliacoes.lambdas(ligas[i], mandantes[i], visitantes[i])
+    return lambdas
+
+
+def conferir_datas(df_resultados: pd.DataFrame) -> None:
+    """ValueError se uma parte relevante das datas não converteu (jogos sem data ficariam fora sem aviso)"""
+    invalidas = int(df_resultados['Data'].isna().sum())
+    if invalidas > MAX_DATAS_INVALIDAS * len(df_resultados):
+        raise ValueError(f"{invalidas} de {len(df_resultados)} datas do histórico não foram reconhecidas")
+
+
+def prever_historico(df_resultados: pd.DataFrame, min_jogos: int = 0, modelo: str = MODELO_LAMBDA,
+                     meia_vida: float = MEIA_VIDA_AVALIACAO) -> pd.DataFrame:
+    """Previsão de cada jogo válido do histórico só com o passado dele, mais os placares reais"""
+    conferir_datas(df_resultados)
+    df = df_resultados[df_resultados['Válido'] & df_resultados['Data'].notna()]
+    df = df.sort_values('Data', kind='stable').reset_index(drop=True)
+    estat = coletar_estatisticas(df)
+
+    if modelo == "avaliacoes":
+        lambda_casa_ft, lambda_fora_ft = lambdas_avaliacoes(df, AvaliacoesJogadores(meia_vida)).T
+    else:
+        lambda_casa_ft = ponderar_lambda(estat['Média Confrontos Casa'], estat['Confrontos'],
+                                         estat['Média Forma Casa'], estat['Média Histórico Casa'])
+        lambda_fora_ft = ponderar_lambda(estat['Média Confrontos Fora'], estat['Confrontos'],
+                                         estat['Média Forma Fora'], estat['Média Histórico Fora'])
+    # Mesma regra de calcular_lambda_ht
+    lambdas = np.column_stack([np.clip(lambda_casa_ft * 0.4, 0.1, 2.0), np.clip(lambda_fora_ft * 0.4, 0.1, 2.0),
+                               lambda_casa_ft, lambda_fora_ft])
+    confianca = pontuar_confianca(estat['Confrontos'], estat['Forma Casa'], estat['Forma Fora']).astype(float)
+
+    predictor = PoissonMonteCarloPredictor(modo="exato")
+    partes = []
+    for inicio in range(0, len(df), TAMANHO_LOTE):
+        mercados = predictor.calcular_probabilidades_exatas_lote(lambdas[inicio:inicio + TAMANHO_LOTE])
+        valores = [identificar_valor_aposta(previsao, c)
+                   for previsao, c in zip(mercados, confianca[inicio:inicio + TAMANHO_LOTE])]
+        parte = pd.DataFrame(mercados)[list(COLUNAS_MERCADOS.values())]
+        parte.columns = list(COLUNAS_MERCADOS)
+        parte['Valor'] = valores
+        partes.append(parte)
+
+    previsoes = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=list(COLUNAS_MERCADOS))
+    resultado = df[['Data', 'Liga', 'Mandante', 'Visitante', 'Mandante HT', 'Visitante HT',
+                    'Mandante FT', 'Visitante FT']].copy()
+    resultado[['xG Casa HT', 'xG Fora HT', 'xG Casa FT', 'xG Fora FT']] = lambdas
+    resultado['Confiança'] = confianca
+    resultado = pd.concat([resultado, previsoes], axis=1)
+
+    # Jogadores sem passado suficiente ficam fora da avaliação
+    jogos_previos = np.minimum(estat['Forma Casa'], estat['Forma Fora'])
+    return resultado[jogos_previos >= min_jogos].reset_index(drop=True)
+
+
+def _placares(df: pd.DataFrame) -> tuple:
+    colunas = ['Mandante HT', 'Visitante HT', 'Mandante FT', 'Visitante FT']
+    return tuple(df[c].to_numpy(dtype=float, na_value=np.nan) for c in colunas)
+
+
+def avaliar_mercados(df: pd.DataFrame) -> pd.DataFrame:
+    """Brier e log-loss de cada mercado binário e do 1X2 (multiclasse)"""
+    hc, hf, fc, ff = _placares(df)
+    tem_ht = ~(np.isnan(hc) | np.isnan(hf))
+    linhas = []
+    for mercado, acertou in MERCADOS_BINARIOS.items():
+        validos = tem_ht if mercado.endswith('HT') else np.ones(len(df), dtype=bool)
+        p = np.clip(df[mercado].to_numpy(dtype=float)[validos] / 100, EPSILON_LOG, 1 - EPSILON_LOG)
+        y = acertou(hc, hf, fc, ff)[validos].astype(float)
+        linhas.append({
+            'Mercado': mercado, 'Jogos': int(validos.sum()),
+            'Prob. Média': p.mean() * 100 if len(p) else np.nan,
+            'Frequência Real': y.mean() * 100 if len(y) else np.nan,
+            'Brier': np.mean((p - y) ** 2) if len(p) else np.nan,
+            'Log-loss': -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)) if len(p) else np.nan
+        })
+
+    # 1X2: Brier multiclasse (soma nas 3 classes) e log-loss da classe que aconteceu
+    p = np.clip(df[['Casa Vence', 'Empate', 'Fora Vence']].to_numpy(dtype=float) / 100, EPSILON_LOG, 1)
+    classe = np.select([fc > ff, fc == ff], [0, 1], 2)
+    y = np.eye(3)[classe]
+    linhas.append({
+        'Mercado': '1X2', 'Jogos': len(df),
+        'Prob. Média': np.nan, 'Frequência Real': np.nan,
+        'Brier': np.mean(((p - y) ** 2).sum(axis=1)) if len(df) else np.nan,
+        'Log-loss': -np.mean(np.log(p[np.arange(len(df)), classe])) if len(df) else np.nan
+    })
+    return pd.DataFrame(linhas)
+
+
+def calibracao(df: pd.DataFrame, mercado: str, faixas: int = FAIXAS_CALIBRACAO) -> pd.DataFrame:
+    """Probabilidade prevista x frequência observada por faixa de probabilidade de um mercado binário"""
+    hc, hf, fc, ff = _placares(df)
+    validos = ~(np.isnan(hc) | np.isnan(hf)) if mercado.endswith('HT') else np.ones(len(df), dtype=bool)
+    p = df[mercado].to_numpy(dtype=float)[validos]
+    y = MERCADOS_BINARIOS[mercado](hc, hf, fc, ff)[validos] * 100.0
+
+    limites = np.linspace(0, 100, faixas + 1)
+    faixa = np.clip(np.digitize(p, limites[1:-1]), 0, faixas - 1)
+    tabela = pd.DataFrame({'faixa': faixa, 'p': p, 'y': y}).groupby('faixa').agg(
+        Jogos=('p', 'size'), **{'Prob. Média': ('p', 'mean'), 'Frequência Real': ('y', 'mean')}
+    )
+    tabela.insert(0, 'Faixa', [f"{limites[i]:.0f}-{limites[i + 1]:.0f}%" for i in tabela.index])
+    return tabela.reset_index(drop=True)
+
+
+def acerto_por_valor(df: pd.DataFrame) -> pd.DataFrame:
+    """Taxa de acerto de Over 2.5 FT e BTTS FT em cada nível de valor (💎, 🔶 e sem valor)"""
+    _, _, fc, ff = _placares(df)
+    tabela = pd.DataFrame({
+        'Valor': df['Valor'].replace("", "—").to_numpy(),
+        'Over 2.5 FT': (fc + ff > 2.5) * 100.0,
+        'BTTS FT': ((fc > 0) & (ff > 0)) * 100.0,
+        'Prob. Over 2.5 FT': df['Over 2.5 FT'].to_numpy(dtype=float),
+        'Prob. BTTS FT': df['BTTS FT'].to_numpy(dtype=float)
+    })
+    agregado = tabela.groupby('Valor').agg(
+        Jogos=('Over 2.5 FT', 'size'),
+        **{'Acerto Over 2.5 FT': ('Over 2.5 FT', 'mean'), 'Prob. Over 2.5 FT': ('Prob. Over 2.5 FT', 'mean'),
+           'Acerto BTTS FT': ('BTTS FT', 'mean'), 'Prob. BTTS FT': ('Prob. BTTS FT', 'mean')}
+    )
+    return agregado.reindex([v for v in ["💎", "🔶", "—"] if v in agregado.index]).reset_index()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resultados", required=True, help="histórico de resultados (CSV ou Parquet)")
+    parser.add_argument("--saida", help="grava a previsão de cada jogo (CSV ou Parquet)")
+    parser.add_argument("--min-jogos", type=int, default=0,
+                        help="só avalia jogos em que os dois jogadores têm pelo menos N jogos de forma")
+    parser.add_argument("--modelo", choices=["janelas", "avaliacoes"], default=MODELO_LAMBDA,
+                        help="lambdas pelas janelas de jogos ou pelas avaliações exponenciais dos jogadores")
+    parser.add_argument("--meia-vida", type=float, default=MEIA_VIDA_AVALIACAO,
+                        help="meia-vida (em jogos) das avaliações")
+    parser.add_argument("--calibracao", nargs="*", default=['Over 2.5 FT', 'BTTS FT'],
+                        choices=list(MERCADOS_BINARIOS), help="mercados com tabela de calibração")
+    args = parser.parse_args(argv)
+
+    try:
+        df_resultados = preparar_resultados(ler_tabela(args.resultados))
+    except (OSError, ValueError) as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    try:
+        df = prever_historico(df_resultados, args.min_jogos, args.modelo, args.meia_vida)
+    except ValueError as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+    print(f"{len(df)} jogos avaliados em {time.perf_counter() - inicio:.1f}s\n")
+    if df.empty:
+        return 0
+
+    with pd.option_context('display.float_format', '{:.4f}'.format, 'display.width', 200):
+        print(avaliar_mercados(df).to_string(index=False), "\n")
+        for mercado in args.calibracao:
+            print(f"Calibração {mercado}")
+            print(calibracao(df, mercado).to_string(index=False), "\n")
+        print(acerto_por_valor(df).to_string(index=False))
+
+    if args.saida:
+        gravar_tabela(df, args.saida)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Benchmark da ingestão HTML: caminho antigo (BeautifulSoup + apply por linha) x leitura em fluxo do app.
+
+Uso:
+    python benchmarks/bench_ingest.py --ao-vivo pagina_aceodds.html --resultados pagina_fifastats.html
+
+Sem arquivos, gera páginas com o mesmo formato das duas fontes (benchmarks/sintetico.py).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402
+from sintetico import gerar_pagina_ao_vivo, gerar_pagina_resultados  # noqa: E402
+
+
+def referencia_linhas(html: str) -> list[list[str]]:
+    """Caminho antigo: árvore BeautifulSoup completa da página"""
+    soup = BeautifulSoup(html, "lxml")
+    return [
+        [cell.get_text(strip=True) for cell in tr.find_all(["th", "td"])]
+        for tr in soup.find_all("tr")
+        if tr.find_all(["th", "td"])
+    ]
+
+
+def referencia_ao_vivo(rows: list[list[str]]) -> pd.DataFrame:
+    """Caminho antigo de load_data: preenchimento em Python e apply com pd.Series por linha"""
+    max_cols = max(len(r) for r in rows)
+    for r in rows:
+        r.extend([''] * (max_cols - len(r)))
+    df = pd.DataFrame(rows)
+    df = df[df[3].isin(app.ALLOWED_COMPETITIONS)].reset_index(drop=True)
+
+    def players(txt: str):
+        clean = str(txt).replace("Ao Vivo Agora", "").strip()
+        m = re.search(r'\(([^)]+)\).*?x.*?\(([^)]+)\)', clean)
+        return (m.group(1).strip(), m.group(2).strip()) if m else ("", "")
+
+    df[['Mandante', 'Visitante']] = df[2].apply(lambda x: pd.Series(players(x)))
+    return df
+
+
+def referencia_resultados(rows: list[list[str]]) -> pd.DataFrame:
+    """Caminho antigo de scrape_resultados: preenchimento em Python e re.sub por linha"""
+    max_cols = max(len(r) for r in rows)
+    for r in rows:
+        r.extend([""] * (max_cols - len(r)))
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    for coluna in ['Jogador 1', 'Jogador 2']:
+        df[coluna] = df[coluna].apply(lambda txt: re.sub(r'\s*\([^)]*\)', '', str(txt)).strip())
+    return df
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ao-vivo", help="cópia salva da página ao vivo (aceodds)")
+    parser.add_argument("--resultados", help="cópia salva da página de resultados (fifastats)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    html_ao_vivo = open(args.ao_vivo, encoding="utf-8").read() if args.ao_vivo else gerar_pagina_ao_vivo()
+    html_resultados = (open(args.resultados, encoding="utf-8").read()
+                       if args.resultados else gerar_pagina_resultados())
+
+    casos = {
+        "ao vivo": (html_ao_vivo, referencia_ao_vivo, app.montar_dados_ao_vivo),
+        "resultados": (html_resultados, referencia_resultados, app.montar_resultados),
+    }
+    print(f"{'página':<12}{'etapa':<10}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>8}")
+    for nome, (html, montar_antigo, montar_novo) in casos.items():
+        assert referencia_linhas(html) == app.extrair_linhas_tabela(html)
+        etapas = {
+            "parse": (lambda: referencia_linhas(html), lambda: app.extrair_linhas_tabela(html)),
+            "frame": (lambda: montar_antigo(referencia_linhas(html)),
+                      lambda: montar_novo(app.extrair_linhas_tabela(html))),
+        }
+        for etapa, (antes, depois) in etapas.items():
+            t_antes = cronometrar(antes, args.repeticoes)
+            t_depois = cronometrar(depois, args.repeticoes)
+            print(f"{nome:<12}{etapa:<10}{t_antes * 1000:>12.1f}{t_depois * 1000:>13.1f}{t_antes / t_depois:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Suíte de benchmarks offline: inicialização, ingestão, previsões, Radar e filtros, comparada com a linha de base.
+
+Uso:
+    python benchmarks/executar.py                    # roda tudo e compara com benchmarks/linha_base.json
+    python benchmarks/executar.py --gravar           # grava os tempos atuais como nova linha de base
+    python benchmarks/executar.py --max-jogos 100000 --casos radar previsoes
+
+As páginas vêm de benchmarks/paginas/ e os históricos (1k a 1M jogos nas quatro ligas) de sintetico.py,
+então nada acessa a rede. Os casos de inicialização medem o import de nucleo/app num processo novo e a leitura
+do retrato salvo que a página exibe antes do primeiro ciclo; os de primeiro_bloco, o tempo até o primeiro
+bloco de previsões publicado pelo trabalhador; os do Radar, a carga, os jogos novos de cada ciclo e a tabela
+do RadarIncremental. Sai com código 1 se algum caso ficar mais lento que a linha de base além da tolerância.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import nucleo  # noqa: E402
+import app  # noqa: E402
+import sintetico  # noqa: E402
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(PASTA)
+PAGINAS = os.path.join(PASTA, "paginas")
+LINHA_BASE = os.path.join(PASTA, "linha_base.json")
+
+TAMANHOS_HISTORICO = [1_000, 10_000, 100_000, 1_000_000]
+PARTIDAS_PREVISAO = [10, 100, 1000]
+# Histórico usado nos casos de previsão e filtros (limitado por --max-jogos)
+HISTORICO_PREVISAO = 100_000
+# Jogos novos por ciclo somados ao Radar já carregado (ordem de grandeza da página de resultados)
+JOGOS_NOVOS_RADAR = 500
+COMBINACOES_FILTROS = [
+    ("Todas", "Todas as Partidas", "Todas as Classificações"),
+    ("GT 12 Min", "Todas as Partidas", "Todas as Classificações"),
+    ("Todas", "💎 Diamante + 🔶 Laranja", "Todas as Classificações"),
+    ("Volta 6 Min", "Apenas 💎 Diamante", "🔥 OVER EXPLOSIVO"),
+    ("Todas", "Todas as Partidas", "🚀 HT OFENSIVO"),
+    ("Todas", "Todas as Partidas", "Todas as Classificações", "Over 2.5 FT >= 72 e BTTS FT >= 60 e Confiança >= 80",
+     "Over 2.5 FT", 20),
+]
+
+
+class Dados:
+    """Históricos, índices e frames de entrada montados uma vez e compartilhados entre os casos"""
+
+    def __init__(self):
+        self._cache: Dict[tuple, object] = {}
+
+    def _obter(self, chave: tuple, construir: Callable):
+        if chave not in self._cache:
+            self._cache[chave] = construir()
+        return self._cache[chave]
+
+    def pagina(self, nome: str) -> str:
+        def ler():
+            with open(os.path.join(PAGINAS, f"{nome}.html"), encoding="utf-8") as arquivo:
+                return arquivo.read()
+        return self._obter(('pagina', nome), ler)
+
+    def historico(self, num_jogos: int):
+        return self._obter(('historico', num_jogos), lambda: sintetico.gerar_historico(num_jogos))
+
+    def indice(self, num_jogos: int):
+        return self._obter(('indice', num_jogos), lambda: app.IndiceJogos(self.historico(num_jogos)))
+
+    def avaliacoes(self, num_jogos: int):
+        def montar():
+            avaliacoes = app.AvaliacoesJogadores()
+            avaliacoes.ingerir(self.historico(num_jogos))
+            return avaliacoes
+        return self._obter(('avaliacoes', num_jogos), montar)
+
+    def previsoes(self, num_partidas: int, num_jogos: int):
+        """Frame de previsões como o publicado pelo trabalhador (sem os registros em attrs)"""
+        def prever():
+            df = nucleo.aplicar_previsoes_avancadas(sintetico.gerar_partidas(num_partidas), self.historico(num_jogos),
+                                                    indice=self.indice(num_jogos),
+                                                    avaliacoes=self.avaliacoes(num_jogos))
+            df.attrs.clear()
+            return df
+        return self._obter(('previsoes', num_partidas, num_jogos), prever)
+
+    def radar(self, num_jogos: int, chave: str = 'radar'):
+        """RadarIncremental carregado com o histórico (cada chave é um objeto próprio, que os casos alteram)"""
+        def carregar():
+            radar = app.RadarIncremental()
+            radar.carregar(self.historico(num_jogos), agora=sintetico.FIM_HISTORICO)
+            return radar
+        return self._obter((chave, num_jogos), carregar)
+
+    def jogos_novos(self, num_jogos: int) -> pd.DataFrame:
+        """Resultados posteriores ao fim do histórico, como os que o trabalhador anexa a cada ciclo"""
+        def gerar():
+            df = sintetico.gerar_historico(num_jogos, semente=1)
+            df['Data'] += df['Data'].max() - df['Data'].min() + pd.Timedelta(minutes=1)
+            return df
+        return self._obter(('jogos_novos', num_jogos), gerar)
+
+    def lote_radar(self, num_jogos: int) -> pd.DataFrame:
+        """jogos_novos deslocado para depois do lote anterior: cada chamada é um lote inédito e em ordem
+
+        Reingerir o mesmo lote mediria só o descarte de jogos repetidos do RadarIncremental.
+        """
+        jogos = self.jogos_novos(num_jogos)
+        vez = self._cache.get(('lote_radar', num_jogos), -1) + 1
+        self._cache[('lote_radar', num_jogos)] = vez
+        passo = jogos['Data'].max() - jogos['Data'].min() + pd.Timedelta(minutes=1)
+        return jogos.assign(Data=jogos['Data'] + vez * passo)
+
+    def retrato(self, num_partidas: int, num_jogos: int) -> str:
+        """Pasta temporária com o retrato salvo (previsões, Radar e página de resultados) como o do app"""
+        def gravar():
+            pasta = tempfile.TemporaryDirectory(prefix="retrato_")
+            nucleo.gravar_retrato_arrow(pasta.name, {
+                'previsoes': self.previsoes(num_partidas, num_jogos),
+                'radar': self.radar(num_jogos).tabela(agora=sintetico.FIM_HISTORICO),
+                'resultados_pagina': app.montar_resultados(app.extrair_linhas_tabela(self.pagina("resultados")))
+            }, {'gerado_em': sintetico.FIM_HISTORICO.isoformat(), 'tem_historico': True})
+            return pasta
+        return self._obter(('retrato', num_partidas, num_jogos), gravar).name
+
+
+def montar_casos(dados: Dados, max_jogos: int) -> Dict[str, Dict[str, Callable]]:
+    """Grupo -> nome do caso -> função cronometrada (sem argumentos)"""
+    tamanhos = [n for n in TAMANHOS_HISTORICO if n <= max_jogos]
+    jogos_previsao = min(HISTORICO_PREVISAO, max_jogos)
+    agora = sintetico.FIM_HISTORICO
+
+    def importar(modulo: str) -> Callable:
+        comando = [sys.executable, "-c", f"import {modulo}"]
+        return lambda: subprocess.run(comando, cwd=RAIZ, check=True,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def filtrar():
+        df = dados.previsoes(max(PARTIDAS_PREVISAO), jogos_previsao)
+        for combinacao in COMBINACOES_FILTROS:
+            app.aplicar_filtros(df, *combinacao)
+
+    return {
+        'inicio': {
+            'inicio/importar_nucleo': importar("nucleo"),
+            'inicio/importar_app': importar("app"),
+            'inicio/retrato_salvo': lambda: app.carregar_retrato_salvo(
+                dados.retrato(max(PARTIDAS_PREVISAO), jogos_previsao)),
+        },
+        'parse': {
+            'parse/ao_vivo': lambda: app.montar_dados_ao_vivo(app.extrair_linhas_tabela(dados.pagina("ao_vivo"))),
+            'parse/resultados': lambda: app.montar_resultados(
+                app.extrair_linhas_tabela(dados.pagina("resultados"))),
+        },
+        'indice': {
+            f'indice/{n}': (lambda n=n: app.IndiceJogos(dados.historico(n))) for n in tamanhos
+        },
+        'previsoes': {
+            f'previsoes/{k}': (lambda k=k: nucleo.aplicar_previsoes_avancadas(
+                sintetico.gerar_partidas(k), dados.historico(jogos_previsao), indice=dados.indice(jogos_previsao),
+                avaliacoes=dados.avaliacoes(jogos_previsao)
+            )) for k in PARTIDAS_PREVISAO
+        },
+        'primeiro_bloco': {
+            f'primeiro_bloco/{k}': (lambda k=k: next(nucleo.prever_em_blocos(
+                sintetico.gerar_partidas(k), dados.historico(jogos_previsao), indice=dados.indice(jogos_previsao),
+                avaliacoes=dados.avaliacoes(jogos_previsao)
+            ))) for k in PARTIDAS_PREVISAO
+        },
+        'radar': {
+            **{f'radar/carregar/{n}': (lambda n=n: app.RadarIncremental().carregar(dados.historico(n), agora=agora))
+               for n in tamanhos},
+            f'radar/ingerir/{JOGOS_NOVOS_RADAR}': lambda: dados.radar(jogos_previsao, 'radar_ingerir').ingerir(
+                dados.lote_radar(JOGOS_NOVOS_RADAR)),
+            f'radar/tabela/{jogos_previsao}': lambda: dados.radar(jogos_previsao).tabela(agora=agora),
+        },
+        'filtros': {
+            f'filtros/{max(PARTIDAS_PREVISAO)}': filtrar
+        },
+    }
+
+
+def cronometrar(funcao: Callable, repeticoes: int) -> float:
+    """Melhor tempo de `repeticoes` execuções (depois de uma execução de aquecimento)"""
+    funcao()
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def carregar_linha_base(caminho: str) -> Dict:
+    if not os.path.exists(caminho):
+        return {'casos': {}}
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_linha_base(caminho: str, tempos: Dict[str, float], linha_base: Dict) -> None:
+    """Atualiza só os casos executados, mantendo os demais da linha de base anterior"""
+    casos = dict(linha_base.get('casos', {}))
+    casos.update({nome: round(segundos, 6) for nome, segundos in tempos.items()})
+    conteudo = {
+        'maquina': f"{platform.machine()} {platform.processor() or platform.system()} ({os.cpu_count()} CPUs)",
+        'python': platform.python_version(),
+        'gravado_em': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'casos': dict(sorted(casos.items()))
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(conteudo, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", nargs="*", help="grupos ou nomes de casos (padrão: todos)")
+    parser.add_argument("--max-jogos", type=int, default=max(TAMANHOS_HISTORICO),
+                        help="maior histórico sintético usado")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--tolerancia", type=float, default=0.30,
+                        help="lentidão relativa aceita antes de acusar regressão (0.30 = 30%%)")
+    parser.add_argument("--linha-base", default=LINHA_BASE)
+    parser.add_argument("--gravar", action="store_true", help="grava os tempos como nova linha de base")
+    args = parser.parse_args(argv)
+
+    dados = Dados()
+    grupos = montar_casos(dados, args.max_jogos)
+    selecionados = {
+        nome: funcao for grupo, casos in grupos.items() for nome, funcao in casos.items()
+        if not args.casos or grupo in args.casos or nome in args.casos
+    }
+    linha_base = carregar_linha_base(args.linha_base)
+    referencia = linha_base.get('casos', {})
+
+    print(f"{'caso':<24}{'tempo (ms)':>12}{'base (ms)':>12}{'razão':>8}  situação")
+    tempos = {}
+    regressoes = []
+    for nome, funcao in selecionados.items():
+        tempos[nome] = cronometrar(funcao, args.repeticoes)
+        base = referencia.get(nome)
+        if base:
+            razao = tempos[nome] / base
+            situacao = "REGRESSÃO" if razao > 1 + args.tolerancia else "ok"
+            if situacao != "ok":
+                regressoes.append(nome)
+            print(f"{nome:<24}{tempos[nome] * 1000:>12.1f}{base * 1000:>12.1f}{razao:>7.2f}x  {situacao}")
+        else:
+            print(f"{nome:<24}{tempos[nome] * 1000:>12.1f}{'-':>12}{'-':>8}  sem linha de base")
+
+    if args.gravar:
+        gravar_linha_base(args.linha_base, tempos, linha_base)
+        print(f"\nlinha de base gravada em {args.linha_base}")
+        return 0
+
+    if regressoes:
+        print(f"\n{len(regressoes)} caso(s) acima da tolerância de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
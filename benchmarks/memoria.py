@@ -0,0 +1,43 @@
+"""Memória do histórico de resultados: layout compacto do app x colunas de texto.
+
+Uso:
+    python benchmarks/memoria.py --jogos 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sintetico import gerar_historico  # noqa: E402
+
+PLACARES = ['Mandante HT', 'Visitante HT', 'Mandante FT', 'Visitante FT']
+
+
+def megabytes(df) -> float:
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jogos", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    compacto = gerar_historico(args.jogos)
+    # Nomes como texto e totais int64 (layout anterior); e tudo como texto, como sai da página
+    nomes_texto = compacto.astype({'Liga': str, 'Mandante': str, 'Visitante': str,
+                                   'Total HT': np.int64, 'Total FT': np.int64})
+    tudo_texto = nomes_texto.astype({c: object for c in ['Liga', 'Mandante', 'Visitante'] + PLACARES})
+    tudo_texto['Data'] = tudo_texto['Data'].dt.strftime("%d/%m/%Y %H:%M")
+
+    print(f"{args.jogos} jogos")
+    for nome, df in [("tudo texto", tudo_texto), ("nomes texto", nomes_texto), ("compacto", compacto)]:
+        print(f"{nome:<14}{megabytes(df):>9.1f} MB")
+    print(f"redução       {megabytes(nomes_texto) / megabytes(compacto):>9.1f}x sobre nomes texto")
+
+
+if __name__ == "__main__":
+    main()
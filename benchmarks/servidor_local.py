@@ -0,0 +1,141 @@
+"""Servidor HTTP local que serve páginas de resultados gravadas, para exercitar o coletor_historico.py offline.
+
+Uso:
+    python benchmarks/servidor_local.py --gerar 50 --pasta /tmp/paginas_resultados   # grava 50 páginas sintéticas
+    python benchmarks/servidor_local.py --pasta /tmp/paginas_resultados --porta 8765 --latencia 0.05 --falhas 0.1
+    python coletor_historico.py --url-modelo "http://127.0.0.1:8765/resultados?page={pagina}" --historico /tmp/h.db
+
+Cada requisição vira um nome de arquivo: /resultados?page=3 -> resultados_3.html, /resultados?data=2026-01-01 ->
+resultados_2026-01-01.html e /resultados -> resultados.html. Arquivo inexistente responde 404 (fim da paginação);
+com --falhas, uma fração das respostas é 503 com Retry-After, para testar as novas tentativas do coletor.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sintetico import gerar_paginas_resultados  # noqa: E402
+
+
+def nome_arquivo(caminho: str) -> str:
+    """Arquivo gravado correspondente ao caminho + query da requisição"""
+    partes = urlsplit(caminho)
+    nome = os.path.basename(partes.path.rstrip("/")) or "index"
+    valores = [valor for _, valor in parse_qsl(partes.query)]
+    return "_".join([nome] + valores) + ".html"
+
+
+class ServidorPaginas(ThreadingHTTPServer):
+    """Serve os arquivos de `pasta`, contando as requisições e o maior número delas simultâneas"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco: tuple, pasta: str, latencia: float = 0.0, falhas: float = 0.0, semente: int = 0):
+        super().__init__(endereco, _Requisicao)
+        self.pasta = pasta
+        self.latencia = latencia
+        self.falhas = falhas
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self.contadores = {'requisicoes': 0, 'falhas': 0, 'simultaneas': 0, 'max_simultaneas': 0}
+        self.instantes: list[float] = []
+
+    def _contar(self, campo: str, valor: int = 1) -> None:
+        with self._lock:
+            self.contadores[campo] += valor
+            if campo == 'simultaneas':
+                self.contadores['max_simultaneas'] = max(self.contadores['max_simultaneas'],
+                                                         self.contadores['simultaneas'])
+
+    def sortear_falha(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.falhas
+
+
+class _Requisicao(BaseHTTPRequestHandler):
+    server: ServidorPaginas
+
+    def do_GET(self) -> None:
+        servidor = self.server
+        servidor._contar('requisicoes')
+        servidor._contar('simultaneas')
+        with servidor._lock:
+            servidor.instantes.append(time.monotonic())
+        try:
+            if servidor.latencia:
+                time.sleep(servidor.latencia)
+            if servidor.sortear_falha():
+                servidor._contar('falhas')
+                self._responder(503, b"", {'Retry-After': "0"})
+                return
+            caminho = os.path.join(servidor.pasta, nome_arquivo(self.path))
+            if not os.path.isfile(caminho):
+                self._responder(404, b"")
+                return
+            with open(caminho, "rb") as arquivo:
+                self._responder(200, arquivo.read(), {'Content-Type': "text/html; charset=utf-8"})
+        finally:
+            servidor._contar('simultaneas', -1)
+
+    def _responder(self, status: int, corpo: bytes, headers: dict = None) -> None:
+        self.send_response(status)
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato: str, *args) -> None:
+        pass
+
+
+def iniciar_servidor(pasta: str, porta: int = 0, **opcoes) -> ServidorPaginas:
+    """Sobe o servidor numa thread daemon (porta 0 = porta livre); encerrar com .shutdown()"""
+    servidor = ServidorPaginas(("127.0.0.1", porta), pasta, **opcoes)
+    threading.Thread(target=servidor.serve_forever, name="servidor-paginas", daemon=True).start()
+    return servidor
+
+
+def gravar_paginas(pasta: str, num_paginas: int, jogos_por_pagina: int, semente: int = 0) -> None:
+    """Grava páginas sintéticas resultados_1.html .. resultados_N.html"""
+    os.makedirs(pasta, exist_ok=True)
+    for pagina, html in enumerate(gerar_paginas_resultados(num_paginas, jogos_por_pagina, semente), start=1):
+        with open(os.path.join(pasta, f"resultados_{pagina}.html"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(html)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pasta", required=True, help="pasta com as páginas gravadas")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos de espera por resposta")
+    parser.add_argument("--falhas", type=float, default=0.0, help="fração de respostas 503 (0.1 = 10%%)")
+    parser.add_argument("--gerar", type=int, default=0, metavar="N", help="grava N páginas sintéticas e sai")
+    parser.add_argument("--jogos-por-pagina", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.gerar:
+        gravar_paginas(args.pasta, args.gerar, args.jogos_por_pagina)
+        print(f"{args.gerar} páginas gravadas em {args.pasta}")
+        return 0
+
+    servidor = ServidorPaginas(("127.0.0.1", args.porta), args.pasta, latencia=args.latencia, falhas=args.falhas)
+    print(f"servindo {args.pasta} em http://127.0.0.1:{servidor.server_address[1]}/ (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Dados sintéticos para os benchmarks: históricos de resultados, partidas ao vivo e páginas das duas fontes.
+
+Tudo é determinístico pela semente, então o mesmo tamanho gera sempre o mesmo histórico.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from nucleo import completar_colunas_resultados
+
+# As quatro ligas de ALLOWED_COMPETITIONS (nomes curtos dos frames) -> (competição na página ao vivo,
+# campeonato na página de resultados, média de gols FT por equipe, jogos por hora)
+LIGAS = {
+    "GT 12 Min": ("E-soccer - GT Leagues - 12 mins de jogo", "GT League", 1.75, 4),
+    "H2H 8 Min": ("E-soccer - H2H GG League - 8 minutos de jogo", "H2H 8m", 1.35, 6),
+    "Battle 8 Min": ("E-soccer - Battle - 8 minutos de jogo", "Battle 8m", 1.5, 6),
+    "Volta 6 Min": ("Esoccer Battle Volta - 6 Minutos de Jogo", "Battle 6m", 1.9, 8),
+}
+JOGADORES_POR_LIGA = 40
+FIM_HISTORICO = pd.Timestamp("2026-10-01 12:00")
+
+
+def nomes_jogadores(liga: str, quantidade: int = JOGADORES_POR_LIGA) -> np.ndarray:
+    prefixo = liga.split()[0]
+    return np.array([f"{prefixo}_{i:03d}" for i in range(quantidade)], dtype=object)
+
+
+def gerar_historico(num_jogos: int, semente: int = 0, jogadores_por_liga: int = JOGADORES_POR_LIGA) -> pd.DataFrame:
+    """Histórico tipado (mesmo formato de montar_resultados), mais recente primeiro, dividido entre as ligas"""
+    rng = np.random.default_rng(semente)
+    partes = []
+    for i, (liga, (_, _, media_gols, jogos_hora)) in enumerate(LIGAS.items()):
+        n = num_jogos // len(LIGAS) + (i < num_jogos % len(LIGAS))
+        nomes = nomes_jogadores(liga, jogadores_por_liga)
+
+        # Cada jogador tem uma força de ataque própria; mandante e visitante sempre distintos
+        ataque = rng.lognormal(0.0, 0.25, jogadores_por_liga)
+        casa = rng.integers(0, jogadores_por_liga, n)
+        fora = (casa + rng.integers(1, jogadores_por_liga, n)) % jogadores_por_liga
+        gols_casa_ft = rng.poisson(media_gols * ataque[casa] / ataque[fora] ** 0.5)
+        gols_fora_ft = rng.poisson(media_gols * ataque[fora] / ataque[casa] ** 0.5)
+        gols_casa_ht = rng.binomial(gols_casa_ft, 0.42)
+        gols_fora_ht = rng.binomial(gols_fora_ft, 0.42)
+
+        minutos = np.arange(n)[::-1] * (60 // jogos_hora)
+        partes.append(pd.DataFrame({
+            'Data': FIM_HISTORICO - pd.to_timedelta(minutos, unit='min'),
+            'Liga': liga,
+            'Mandante': nomes[casa],
+            'Visitante': nomes[fora],
+            'Mandante HT': gols_casa_ht,
+            'Visitante HT': gols_fora_ht,
+            'Mandante FT': gols_casa_ft,
+            'Visitante FT': gols_fora_ft,
+        }))
+
+    df = pd.concat(partes, ignore_index=True)
+    df = df.sort_values('Data', ascending=False, kind='stable').reset_index(drop=True)
+    return completar_colunas_resultados(df)
+
+
+def gerar_partidas(num_partidas: int, semente: int = 0, jogadores_por_liga: int = JOGADORES_POR_LIGA) -> pd.DataFrame:
+    """Partidas ao vivo (Hora, Liga, Mandante, Visitante) entre jogadores do histórico sintético"""
+    rng = np.random.default_rng(semente + 1)
+    ligas = np.array(list(LIGAS), dtype=object)[np.arange(num_partidas) % len(LIGAS)]
+    nomes = {liga: nomes_jogadores(liga, jogadores_por_liga) for liga in LIGAS}
+    casa = rng.integers(0, jogadores_por_liga, num_partidas)
+    fora = (casa + rng.integers(1, jogadores_por_liga, num_partidas)) % jogadores_por_liga
+    return pd.DataFrame({
+        'Hora': [f"{12 + i // 60 % 12:02d}:{i % 60:02d}" for i in range(num_partidas)],
+        'Liga': ligas,
+        'Mandante': [nomes[liga][c] for liga, c in zip(ligas, casa)],
+        'Visitante': [nomes[liga][f] for liga, f in zip(ligas, fora)],
+    })
+
+
+def _pagina(linhas: list[list[str]]) -> str:
+    cabecalho = "<head><title>FIFA</title>" + "<script>var x = 1;</script>" * 20 + "</head>"
+    menu = "<nav>" + "".join(f"<a href='/p{i}'>Link {i}</a>" for i in range(200)) + "</nav>"
+    corpo = "".join("<tr>" + "".join(f"<td><span>{c}</span></td>" for c in linha) + "</tr>" for linha in linhas)
+    return f"<html>{cabecalho}<body>{menu}<table><tbody>{corpo}</tbody></table></body></html>"
+
+
+def gerar_pagina_ao_vivo(num_partidas: int = 300, semente: int = 0) -> str:
+    """Página no formato da fonte ao vivo (aceodds), com algumas competições fora das quatro ligas"""
+    partidas = gerar_partidas(num_partidas, semente)
+    linhas = [["Hora", "", "Jogo", "Competição"]]
+    for i, partida in enumerate(partidas.itertuples(index=False)):
+        competicao = LIGAS[partida.Liga][0] if i % 5 else "Futebol - Brasileirão"
+        linhas.append([partida.Hora, "",
+                       f"Ao Vivo Agora Time {i} ({partida.Mandante}) x Time {i + 1} ({partida.Visitante})",
+                       competicao])
+    return _pagina(linhas)
+
+
+def _pagina_resultados(df: pd.DataFrame) -> str:
+    linhas = [["Data", "Campeonato", "Jogador 1", "Jogador 2", "Placar HT", "Placar"]]
+    colunas = ['Data', 'Liga', 'Mandante', 'Visitante', 'Mandante HT', 'Visitante HT', 'Mandante FT', 'Visitante FT']
+    for i, (data, liga, casa, fora, casa_ht, fora_ht, casa_ft, fora_ft) in enumerate(zip(*(df[c] for c in colunas))):
+        linhas.append([data.strftime("%d/%m/%Y %H:%M"), LIGAS[liga][1],
+                       f"{casa} (Time {i % 13})", f"{fora} (Time {i % 7})",
+                       f"{casa_ht} x {fora_ht}", f"{casa_ft} x {fora_ft}"])
+    return _pagina(linhas)
+
+
+def gerar_pagina_resultados(num_jogos: int = 2000, semente: int = 0) -> str:
+    """Página no formato da fonte de resultados (fifastats) a partir de um histórico sintético"""
+    return _pagina_resultados(gerar_historico(num_jogos, semente))
+
+
+def gerar_paginas_resultados(num_paginas: int, jogos_por_pagina: int = 500, semente: int = 0) -> list[str]:
+    """Páginas 1..N da fonte de resultados, como na paginação do site (página 1 com os jogos mais recentes)"""
+    df = gerar_historico(num_paginas * jogos_por_pagina, semente)
+    return [_pagina_resultados(df.iloc[inicio:inicio + jogos_por_pagina])
+            for inicio in range(0, len(df), jogos_por_pagina)]
@@ -0,0 +1,308 @@
+"""Coleta retroativa do histórico: percorre as páginas de resultados e grava os jogos no histórico local em bloco.
+
+Uso:
+    python coletor_historico.py                                       # páginas 1, 2, ... até a primeira vazia/404
+    python coletor_historico.py --ate 2026-01-01 --concorrencia 8 --por-segundo 4
+    python coletor_historico.py --url-modelo "https://www.fifastats.net/resultados?data={data}" \\
+        --de 2026-10-01 --ate 2026-09-01
+    python coletor_historico.py --url-modelo "http://127.0.0.1:8765/resultados?page={pagina}"  # servidor_local.py
+
+A URL modelo recebe o número da página em {pagina} (1 = mais recente) ou o dia em {data} (do --de para trás até o
+--ate). As páginas são buscadas em paralelo (--concorrencia), com intervalo mínimo entre requisições ao mesmo host
+(--por-segundo) e novas tentativas com backoff; os jogos vão para o histórico SQLite do app a cada --lote jogos. O
+checkpoint (JSON) guarda as páginas já gravadas, então uma coleta interrompida (ou com páginas que falharam) continua
+de onde parou; uma coleta que termina sem falhas apaga o checkpoint, e a próxima recomeça da página 1.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+from nucleo import HISTORICO_DB, HistoricoResultados, extrair_linhas_tabela, montar_resultados
+
+URL_MODELO = "https://www.fifastats.net/resultados?page={pagina}"
+CHECKPOINT = "fifalgorithm_data/coleta_historico.json"
+MAX_PAGINAS = 10_000
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# REDE: mesmas regras de novas tentativas do app, com mais fôlego (a coleta não tem pressa)
+TIMEOUT = (5, 30)
+MAX_TENTATIVAS = 5
+BACKOFF_BASE = 1.0
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+class LimiteTaxa:
+    """Intervalo mínimo entre requisições ao mesmo host, compartilhado por todas as tarefas da coleta"""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1 / por_segundo if por_segundo > 0 else 0.0
+        self._proximo: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def aguardar(self, host: str) -> None:
+        """Reserva o próximo horário livre do host e dorme até ele"""
+        async with self._lock:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo.get(host, 0.0))
+            self._proximo[host] = horario + self.intervalo
+        await asyncio.sleep(horario - agora)
+
+    async def adiar(self, host: str, segundos: float) -> None:
+        """Empurra o host para depois de `segundos` (Retry-After de um 429/503)"""
+        async with self._lock:
+            self._proximo[host] = max(self._proximo.get(host, 0.0), time.monotonic() + segundos)
+
+
+class Checkpoint:
+    """Páginas já gravadas no histórico e onde a paginação termina, em JSON (temporário + rename)"""
+
+    VERSAO = 1
+
+    def __init__(self, caminho: str, url_modelo: str, origem: str = ""):
+        self.caminho = caminho
+        self.url_modelo = url_modelo
+        self.origem = origem
+        self.concluidas: set = set()
+        self.ultima: int = None
+        self.jogos_novos = 0
+
+    def carregar(self) -> bool:
+        """Retoma o checkpoint gravado; False se não existe ou é de outra coleta (outra URL ou origem)"""
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                conteudo = json.load(arquivo)
+        except (OSError, ValueError):
+            return False
+        if (conteudo.get('versao'), conteudo.get('url_modelo'), conteudo.get('origem')) != \
+                (self.VERSAO, self.url_modelo, self.origem):
+            return False
+        self.concluidas = set(conteudo.get('concluidas', []))
+        self.ultima = conteudo.get('ultima')
+        self.jogos_novos = conteudo.get('jogos_novos', 0)
+        return True
+
+    def salvar(self) -> None:
+        conteudo = {
+            'versao': self.VERSAO, 'url_modelo': self.url_modelo, 'origem': self.origem,
+            'concluidas': sorted(self.concluidas), 'ultima': self.ultima, 'jogos_novos': self.jogos_novos,
+            'gravado_em': time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(conteudo, arquivo)
+        os.replace(temporario, self.caminho)
+
+    def apagar(self) -> None:
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+
+class ColetorHistorico:
+    """Percorre as páginas 1..N da URL modelo com concorrência limitada e grava os jogos em bloco.
+
+    A página i é a i-ésima da paginação ({pagina}) ou o dia `de - (i - 1)` ({data}). Na paginação o fim é a
+    primeira página vazia ou 404, ou a primeira com jogos anteriores a `ate`; por data, o dia `ate`.
+    """
+
+    def __init__(self, historico: HistoricoResultados, url_modelo: str = URL_MODELO, checkpoint: str = CHECKPOINT,
+                 concorrencia: int = 4, por_segundo: float = 2.0, de: date = None, ate: date = None,
+                 max_paginas: int = MAX_PAGINAS, lote: int = 5000, formato_data: str = "%Y-%m-%d",
+                 sessao: requests.Session = None):
+        self.por_data = "{data}" in url_modelo
+        if not self.por_data and "{pagina}" not in url_modelo:
+            raise ValueError("a URL modelo precisa de {pagina} ou {data}")
+        if self.por_data and ate is None:
+            raise ValueError("a coleta por data precisa de --ate")
+
+        self.historico = historico
+        self.url_modelo = url_modelo
+        self.concorrencia = max(1, concorrencia)
+        self.limite = LimiteTaxa(por_segundo)
+        self.de = de or date.today()
+        self.ate = ate
+        self.lote = lote
+        self.formato_data = formato_data
+        self.max_paginas = (self.de - ate).days + 1 if self.por_data else max_paginas
+        self.checkpoint = Checkpoint(checkpoint, url_modelo, self.de.isoformat() if self.por_data else "")
+
+        self._sessao = sessao or requests.Session()
+        if sessao is None:
+            self._sessao.headers.update(HEADERS)
+            adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.concorrencia,
+                                                      max_retries=0)
+            self._sessao.mount("https://", adaptador)
+            self._sessao.mount("http://", adaptador)
+
+        # Páginas lidas e ainda não gravadas (gravação em bloco sob _lock_gravacao)
+        self._pendentes: List[tuple] = []
+        self._jogos_pendentes = 0
+        self._lock_gravacao = asyncio.Lock()
+        self.contadores = {
+            'paginas': 0, 'jogos_lidos': 0, 'jogos_novos': 0, 'requisicoes': 0, 'repeticoes': 0, 'falhas': 0
+        }
+
+    def url(self, pagina: int) -> str:
+        if self.por_data:
+            return self.url_modelo.format(data=(self.de - timedelta(days=pagina - 1)).strftime(self.formato_data))
+        return self.url_modelo.format(pagina=pagina)
+
+    def _fim(self) -> int:
+        ultima = self.checkpoint.ultima
+        return self.max_paginas if ultima is None else min(ultima, self.max_paginas)
+
+    def _marcar_fim(self, pagina: int) -> None:
+        if self.checkpoint.ultima is None or pagina < self.checkpoint.ultima:
+            self.checkpoint.ultima = pagina
+
+    async def _buscar(self, url: str) -> requests.Response:
+        """GET respeitando o limite do host, com novas tentativas (Retry-After ou backoff com jitter)"""
+        host = urlsplit(url).netloc
+        for tentativa in range(1, MAX_TENTATIVAS + 1):
+            await self.limite.aguardar(host)
+            self.contadores['requisicoes'] += 1
+            try:
+                resp = await asyncio.to_thread(self._sessao.get, url, timeout=TIMEOUT)
+                if resp.status_code not in STATUS_REPETIR or tentativa == MAX_TENTATIVAS:
+                    return resp
+                espera = resp.headers.get('Retry-After', "")
+                espera = float(espera) if espera.isdigit() else BACKOFF_BASE * 2 ** (tentativa - 1)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if tentativa == MAX_TENTATIVAS:
+                    raise
+                espera = BACKOFF_BASE * 2 ** (tentativa - 1)
+            self.contadores['repeticoes'] += 1
+            await self.limite.adiar(host, espera * random.uniform(0.5, 1.5))
+
+    async def _processar(self, pagina: int) -> None:
+        try:
+            resp = await self._buscar(self.url(pagina))
+        except requests.exceptions.RequestException as e:
+            self.contadores['falhas'] += 1
+            print(f"página {pagina}: {type(e).__name__}: {e}", file=sys.stderr)
+            return
+
+        if resp.status_code == 404 and not self.por_data:
+            self._marcar_fim(pagina - 1)
+            return
+        if resp.status_code != 200:
+            # Falha definitiva: a página fica fora do checkpoint e é tentada de novo na próxima coleta
+            self.contadores['falhas'] += 1
+            print(f"página {pagina}: status {resp.status_code}", file=sys.stderr)
+            return
+
+        df = await asyncio.to_thread(lambda: montar_resultados(extrair_linhas_tabela(resp.text)))
+        if 'Data' not in df.columns or df.empty:
+            if not self.por_data:
+                self._marcar_fim(pagina - 1)
+                return
+            df = pd.DataFrame()
+        elif self.ate is not None and not self.por_data and (df['Data'].dt.date < self.ate).any():
+            self._marcar_fim(pagina)
+
+        self.contadores['paginas'] += 1
+        self.contadores['jogos_lidos'] += len(df)
+        self._pendentes.append((pagina, df))
+        self._jogos_pendentes += len(df)
+        if self._jogos_pendentes >= self.lote:
+            await self.gravar()
+
+    async def gravar(self) -> None:
+        """Grava no histórico as páginas lidas e só então as marca como concluídas no checkpoint"""
+        async with self._lock_gravacao:
+            pendentes, self._pendentes, self._jogos_pendentes = self._pendentes, [], 0
+            if not pendentes:
+                return
+            frames = [df for _, df in pendentes if not df.empty]
+            novos = await asyncio.to_thread(self.historico.anexar, pd.concat(frames)) if frames else 0
+            self.contadores['jogos_novos'] += novos
+            self.checkpoint.jogos_novos += novos
+            self.checkpoint.concluidas.update(pagina for pagina, _ in pendentes)
+            self.checkpoint.salvar()
+            print(f"{len(self.checkpoint.concluidas)} páginas gravadas, +{novos} jogos novos "
+                  f"({self.contadores['requisicoes']} requisições)")
+
+    async def executar(self, recomecar: bool = False) -> Dict[str, int]:
+        if not recomecar and self.checkpoint.carregar():
+            print(f"retomando: {len(self.checkpoint.concluidas)} páginas já gravadas")
+
+        paginas = iter(range(1, self.max_paginas + 1))
+
+        async def trabalhador() -> None:
+            # Todas as tarefas consomem o mesmo iterador; páginas além do fim conhecido são descartadas
+            for pagina in paginas:
+                if pagina > self._fim():
+                    return
+                if pagina not in self.checkpoint.concluidas:
+                    await self._processar(pagina)
+
+        await asyncio.gather(*(trabalhador() for _ in range(self.concorrencia)))
+        await self.gravar()
+        if self.contadores['falhas']:
+            # As páginas com falha ficam fora de `concluidas`: a próxima execução retoma só elas
+            self.checkpoint.salvar()
+        else:
+            # Coleta completa: nada a retomar, e os jogos novos sempre entram no início da paginação
+            self.checkpoint.apagar()
+        return dict(self.contadores)
+
+
+def ler_data(texto: str) -> date:
+    return date.fromisoformat(texto)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url-modelo", default=URL_MODELO, help="URL com {pagina} ou {data}")
+    parser.add_argument("--historico", default=HISTORICO_DB, help="banco SQLite do histórico")
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    parser.add_argument("--recomecar", action="store_true", help="ignora o checkpoint e recomeça da página 1")
+    parser.add_argument("--concorrencia", type=int, default=4, help="páginas buscadas ao mesmo tempo")
+    parser.add_argument("--por-segundo", type=float, default=2.0, help="requisições por segundo por host (0 = livre)")
+    parser.add_argument("--de", type=ler_data, default=None, help="dia mais recente na coleta por data (padrão: hoje)")
+    parser.add_argument("--ate", type=ler_data, default=None, help="dia mais antigo a coletar (AAAA-MM-DD)")
+    parser.add_argument("--formato-data", default="%Y-%m-%d", help="formato de {data} na URL")
+    parser.add_argument("--max-paginas", type=int, default=MAX_PAGINAS)
+    parser.add_argument("--lote", type=int, default=5000, help="jogos acumulados por gravação no histórico")
+    args = parser.parse_args(argv)
+
+    try:
+        coletor = ColetorHistorico(HistoricoResultados(args.historico), args.url_modelo, args.checkpoint,
+                                   args.concorrencia, args.por_segundo, args.de, args.ate, args.max_paginas,
+                                   args.lote, args.formato_data)
+    except ValueError as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    try:
+        contadores = asyncio.run(coletor.executar(args.recomecar))
+    except KeyboardInterrupt:
+        print("interrompido: o checkpoint guarda as páginas já gravadas", file=sys.stderr)
+        return 130
+
+    print(f"{contadores['paginas']} páginas, {contadores['jogos_lidos']} jogos lidos, "
+          f"{contadores['jogos_novos']} novos em {time.perf_counter() - inicio:.1f}s "
+          f"({contadores['requisicoes']} requisições, {contadores['repeticoes']} repetidas, "
+          f"{contadores['falhas']} falhas) -> {args.historico}")
+    return 1 if contadores['falhas'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
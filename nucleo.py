@@ -0,0 +1,1690 @@
+"""Núcleo de previsão do FifaAlgorithm (sem Streamlit): modelo Poisson, índice do histórico, previsões e histórico local"""
+from __future__ import annotations
+import gzip
+import hashlib
+import io
+import json
+import operator
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from lxml import etree
+
+# PREVISÕES: "exato" (matriz de placares) ou "monte_carlo" (simulação semeada por partida)
+MODO_PREVISAO = "exato"
+NUM_SIMULACOES = 1000
+# LAMBDAS: "janelas" (confrontos + últimos 10/20 jogos a cada previsão) ou "avaliacoes" (AvaliacoesJogadores,
+# opcional com FIFA_MODELO_LAMBDA=avaliacoes até ser validado no backtest com histórico real)
+MODELO_LAMBDA = os.environ.get("FIFA_MODELO_LAMBDA", "janelas")
+# Meia-vida, em jogos do próprio jogador, das médias exponenciais de ataque e defesa
+MEIA_VIDA_AVALIACAO = 10
+# PREVISÕES EM BLOCOS: partidas por bloco (na ordem de início)
+TAMANHO_BLOCO_PREVISOES = 50
+
+# Histórico local de resultados (SQLite), alimentado pelo app e pelo coletor_historico.py
+HISTORICO_DB = "fifalgorithm_data/historico_resultados.db"
+
+# CACHE EM DISCO: HTML comprimido e frames em Parquet, com orçamento de tamanho (LRU). Subir VERSAO_CACHE
+# sempre que mudar o formato dos frames montados a partir das páginas ou publicados (invalida os gravados)
+CACHE_DIR = "fifalgorithm_data/cache"
+CACHE_MAX_BYTES = 64 * 2 ** 20
+VERSAO_CACHE = 1
+# REDE: "normal", "gravar" (guarda cada página baixada) ou "reproduzir" (só páginas gravadas, sem rede)
+MODO_REDE = os.environ.get("FIFA_MODO_REDE", "normal")
+GRAVACOES_DIR = os.environ.get("FIFA_GRAVACOES", "fifalgorithm_data/gravacoes")
+# FUSO DAS FONTES: as datas raspadas são o horário local do site, sem fuso; janelas por período ("última hora")
+# comparam com o relógio nesse fuso, não com o do servidor
+FUSO_FONTES = ZoneInfo(os.environ.get("FIFA_FUSO_FONTES", "America/Sao_Paulo"))
+
+COLUNAS_RESULTADOS = [
+    'Data', 'Liga', 'Mandante', 'Visitante',
+    'Mandante HT', 'Visitante HT', 'Total HT',
+    'Mandante FT', 'Visitante FT', 'Total FT', 'Válido'
+]
+
+
+def completar_colunas_resultados(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipa os placares, calcula totais e a máscara de validade e ordena as colunas finais"""
+    # Placares como inteiros pequenos anuláveis (vazio/inválido -> <NA>)
+    for coluna in ['Mandante HT', 'Visitante HT', 'Mandante FT', 'Visitante FT']:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('Int8')
+
+    df['Total HT'] = (df['Mandante HT'].fillna(0) + df['Visitante HT'].fillna(0)).to_numpy(dtype=np.int16)
+    df['Total FT'] = (df['Mandante FT'].fillna(0) + df['Visitante FT'].fillna(0)).to_numpy(dtype=np.int16)
+    df['Válido'] = (df['Mandante FT'].notna() & df['Visitante FT'].notna()).to_numpy(dtype=bool)
+
+    return compactar_resultados(df[[c for c in COLUNAS_RESULTADOS if c in df.columns]])
+
+
+def _categorias(coluna: pd.Series) -> pd.Index:
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.categories
+    return pd.Index(pd.unique(coluna.to_numpy(dtype=object))).dropna()
+
+
+def compactar_resultados(df: pd.DataFrame) -> pd.DataFrame:
+    """Liga, Mandante e Visitante como categorias; os dois jogadores compartilham o mesmo dicionário de IDs
+
+    Chamar de novo depois de concatenar históricos: categorias diferentes voltam a ser texto no concat.
+    """
+    df = df.copy(deep=False)
+    if 'Liga' in df.columns:
+        df['Liga'] = df['Liga'].astype(pd.CategoricalDtype(_categorias(df['Liga']).sort_values()))
+    if 'Mandante' in df.columns and 'Visitante' in df.columns:
+        jogadores = _categorias(df['Mandante']).union(_categorias(df['Visitante']))
+        tipo = pd.CategoricalDtype(jogadores)
+        df['Mandante'] = df['Mandante'].astype(tipo)
+        df['Visitante'] = df['Visitante'].astype(tipo)
+    return df
+
+
+def ids_jogadores(df: pd.DataFrame):
+    """(nomes, IDs do mandante, IDs do visitante); ID -1 para jogador ausente"""
+    if not (isinstance(df['Mandante'].dtype, pd.CategoricalDtype)
+            and df['Mandante'].dtype == df['Visitante'].dtype):
+        df = compactar_resultados(df[['Mandante', 'Visitante']])
+    return (df['Mandante'].cat.categories, df['Mandante'].cat.codes.to_numpy(),
+            df['Visitante'].cat.codes.to_numpy())
+
+
+class Medicao:
+    """Tempos por etapa (quantidade, total e máximo) de uma atualização ou renderização; thread-safe"""
+
+    def __init__(self, tipo: str):
+        self.tipo = tipo
+        self.inicio = time.time()
+        self.duracao: float = None
+        self.pico_memoria: int = None
+        self.extras: Dict = {}
+        self._etapas: Dict[str, List[float]] = {}
+        self._inicio_relogio = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, duracao: float) -> None:
+        with self._lock:
+            etapa = self._etapas.setdefault(nome, [0, 0.0, 0.0])
+            etapa[0] += 1
+            etapa[1] += duracao
+            etapa[2] = max(etapa[2], duracao)
+
+    @contextmanager
+    def etapa(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio)
+
+    def finalizar(self) -> None:
+        self.duracao = time.perf_counter() - self._inicio_relogio
+
+    def como_dict(self) -> Dict:
+        """Registro serializável (tempos em ms, memória em MB)"""
+        with self._lock:
+            etapas = {
+                nome: {'n': n, 'total_ms': round(total * 1000, 3), 'max_ms': round(maximo * 1000, 3)}
+                for nome, (n, total, maximo) in self._etapas.items()
+            }
+        return {
+            'tipo': self.tipo,
+            'inicio': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+            'duracao_ms': round(self.duracao * 1000, 3) if self.duracao is not None else None,
+            'pico_memoria_mb': round(self.pico_memoria / 2 ** 20, 3) if self.pico_memoria is not None else None,
+            **self.extras,
+            'etapas': etapas
+        }
+
+
+def etapa(medicao: Medicao, nome: str):
+    """Cronometra um trecho em `medicao`; sem medição não faz nada"""
+    return medicao.etapa(nome) if medicao is not None else nullcontext()
+
+
+def marcar_etapa(medicao: Medicao, nome: str, desde: float) -> float:
+    """Registra o tempo desde `desde` (perf_counter) e devolve o instante atual para a próxima etapa"""
+    agora = time.perf_counter()
+    if medicao is not None:
+        medicao.registrar(nome, agora - desde)
+    return agora
+
+
+def converter_datas(datas: pd.Series) -> pd.Series:
+    """Converte a coluna Data para datetime; valores inválidos viram NaT
+
+    ISO (aaaa-mm-dd, como o próprio app grava em CSV/SQLite) é lido primeiro e nunca com dayfirst, que trocaria
+    dia e mês; só o que não é ISO cai no formato do site (dd/mm/aaaa hh:mm).
+    """
+    if pd.api.types.is_datetime64_any_dtype(datas):
+        return datas
+    texto = datas.astype(str).str.strip()
+    convertidas = pd.to_datetime(texto, format='ISO8601', errors='coerce')
+    faltando = convertidas.isna()
+    if faltando.any():
+        convertidas = convertidas.combine_first(
+            pd.to_datetime(texto[faltando], format='mixed', dayfirst=True, errors='coerce')
+        )
+    return convertidas
+
+
+def agora_fontes() -> datetime:
+    """Agora no fuso das fontes, sem tzinfo (comparável com as datas raspadas)"""
+    return datetime.now(FUSO_FONTES).replace(tzinfo=None)
+
+
+def ponderar_lambda(media_confrontos, num_confrontos, media_forma, media_historico):
+    """Lambda FT: média ponderada confrontos + forma recente + histórico (aceita escalares ou arrays)"""
+    num_confrontos = np.asarray(num_confrontos)
+    peso_confrontos = np.where(num_confrontos > 0, np.minimum(0.5, 0.3 + num_confrontos * 0.04), 0.0)
+    lambda_confrontos = np.where(num_confrontos > 0, media_confrontos, 0.0)
+    peso_forma = 0.35
+    peso_historico = 0.15
+
+    pesos_total = peso_confrontos + peso_forma + peso_historico
+    lambda_final = (
+        (lambda_confrontos * peso_confrontos) +
+        (media_forma * peso_forma) +
+        (media_historico * peso_historico)
+    ) / pesos_total
+    return np.clip(lambda_final, 0.3, 3.5)
+
+
+class PoissonMonteCarloPredictor:
+    def __init__(self, num_simulacoes=1000, modo: str = "exato"):
+        self.num_simulacoes = num_simulacoes
+        self.max_gols = 8
+        # "exato" lê os mercados da matriz de placares; "monte_carlo" mantém a simulação por amostragem
+        self.modo = modo
+
+    def calcular_lambda_ponderado(self, jogador: str, confrontos: pd.DataFrame, forma: pd.DataFrame,
+                                  df_resultados: pd.DataFrame, indice: IndiceJogos = None) -> float:
+        """Calcula lambda Poisson com pesos para confrontos + forma recente"""
+        lambda_confrontos = self.analisar_desempenho_jogos(jogador, confrontos)['media_gols_feitos_ft']
+        lambda_forma = self.analisar_desempenho_jogos(jogador, forma)['media_gols_feitos_ft']
+
+        historico = self.obter_ultimos_jogos_gerais(jogador, df_resultados, 20, indice)
+        lambda_historico = self.analisar_desempenho_jogos(jogador, historico)['media_gols_feitos_ft']
+
+        return float(ponderar_lambda(lambda_confrontos, len(confrontos), lambda_forma, lambda_historico))
+
+    def calcular_lambda_ht(self, lambda_ft: float) -> float:
+        """Calcula lambda para o primeiro tempo (40% dos gols em média)"""
+        lambda_ht = lambda_ft * 0.4
+        return max(0.1, min(lambda_ht, 2.0))
+
+    def analisar_desempenho_jogos(self, jogador: str, jogos: pd.DataFrame) -> Dict:
+        """Analisa desempenho em um conjunto de jogos"""
+        desempenho = calcular_desempenho_jogador(jogador, jogos)
+        total_jogos = desempenho['jogos']
+        if total_jogos == 0:
+            return {'media_gols_feitos_ft': 1.5, 'media_gols_sofridos_ft': 1.5}
+
+        return {
+            'media_gols_feitos_ft': desempenho['gols_feitos'] / total_jogos,
+            'media_gols_sofridos_ft': desempenho['gols_sofridos'] / total_jogos
+        }
+
+    def obter_ultimos_jogos_gerais(self, jogador: str, df_resultados: pd.DataFrame, limite: int,
+                                   indice: IndiceJogos = None) -> pd.DataFrame:
+        """Busca últimos jogos gerais"""
+        if indice is not None:
+            return indice.ultimos_jogos(jogador, limite)
+
+        jogos = df_resultados[
+            (df_resultados['Mandante'] == jogador) |
+            (df_resultados['Visitante'] == jogador)
+            ].sort_values('Data', ascending=False).head(limite)
+        return jogos
+
+    def simular_monte_carlo_avancado(self, lambda_casa_ht: float, lambda_fora_ht: float,
+                                     lambda_casa_ft: float, lambda_fora_ft: float,
+                                     semente: int = None) -> Dict:
+        """Simulação Monte Carlo completa para HT e FT"""
+        lambdas = np.array([[lambda_casa_ht, lambda_fora_ht, lambda_casa_ft, lambda_fora_ft]])
+        sementes = None if semente is None else [semente]
+        return self.simular_monte_carlo_lote(lambdas, sementes)[0]
+
+    def simular_monte_carlo_lote(self, lambdas: np.ndarray, sementes: List[int] = None) -> List[Dict]:
+        """Monte Carlo vetorizado para várias partidas (lambdas: casa HT, fora HT, casa FT, fora FT)
+
+        Sem `sementes`, cada bloco de partidas sai de um único sorteio (partidas x 4 x simulações). Com
+        `sementes`, cada partida tem o próprio gerador: o resultado dela não depende de quais outras partidas
+        estão no lote (cache por partida, divisão em blocos do prever_lote).
+        """
+        lambdas = np.asarray(lambdas, dtype=float).reshape(-1, 4)
+        num_partidas = len(lambdas)
+        n = self.num_simulacoes
+        lado = self.max_gols + 1
+        gerador_comum = np.random.default_rng() if sementes is None else None
+
+        # Placares simulados acumulados como matriz empírica (partida x casa x fora)
+        contagem_ht = np.zeros(num_partidas * lado * lado)
+        contagem_ft = np.zeros(num_partidas * lado * lado)
+
+        # Blocos de partidas limitam a memória quando num_simulacoes é alto (ex: 100k)
+        tamanho_bloco = max(1, 2_000_000 // n)
+        for inicio in range(0, num_partidas, tamanho_bloco):
+            fim = min(inicio + tamanho_bloco, num_partidas)
+            if gerador_comum is not None:
+                amostras = gerador_comum.poisson(lambdas[inicio:fim, :, None], size=(fim - inicio, 4, n))
+                gols = np.minimum(amostras, self.max_gols).astype(np.int8)
+            else:
+                gols = np.empty((fim - inicio, 4, n), dtype=np.int8)
+                for i in range(inicio, fim):
+                    amostras = np.random.default_rng(sementes[i]).poisson(lambdas[i][:, None], size=(4, n))
+                    gols[i - inicio] = np.minimum(amostras, self.max_gols)
+
+            base = (np.arange(inicio, fim) * lado * lado)[:, None]
+            indices_ht = base + gols[:, 0].astype(np.int64) * lado + gols[:, 1]
+            indices_ft = base + gols[:, 2].astype(np.int64) * lado + gols[:, 3]
+            contagem_ht += np.bincount(indices_ht.ravel(), minlength=contagem_ht.size)
+            contagem_ft += np.bincount(indices_ft.ravel(), minlength=contagem_ft.size)
+
+        matriz_ht = contagem_ht.reshape(num_partidas, lado, lado) / n
+        matriz_ft = contagem_ft.reshape(num_partidas, lado, lado) / n
+        return self._calcular_mercados(matriz_ht, matriz_ft)
+
+    def calcular_probabilidades(self, lambda_casa_ht: float, lambda_fora_ht: float,
+                                lambda_casa_ft: float, lambda_fora_ft: float) -> Dict:
+        """Calcula os mercados no modo configurado (exato ou Monte Carlo)"""
+        lambdas = np.array([[lambda_casa_ht, lambda_fora_ht, lambda_casa_ft, lambda_fora_ft]])
+        return self.calcular_probabilidades_lote(lambdas)[0]
+
+    def calcular_probabilidades_lote(self, lambdas: np.ndarray, sementes: List[int] = None) -> List[Dict]:
+        """Calcula os mercados de várias partidas de uma vez no modo configurado"""
+        if self.modo == "monte_carlo":
+            return self.simular_monte_carlo_lote(lambdas, sementes)
+        return self.calcular_probabilidades_exatas_lote(lambdas)
+
+    def _distribuicao_gols(self, lambdas_gols: np.ndarray) -> np.ndarray:
+        """Distribuição Poisson truncada em max_gols (cauda acumulada no último placar)"""
+        # Importado aqui: scipy.stats sozinho custa mais que metade do tempo de import do app
+        from scipy.stats import poisson
+
+        lambdas_gols = np.asarray(lambdas_gols, dtype=float)[..., None]
+        gols = np.arange(self.max_gols)
+        probs = np.empty(lambdas_gols.shape[:-1] + (self.max_gols + 1,))
+        probs[..., :-1] = poisson.pmf(gols, lambdas_gols)
+        probs[..., -1] = poisson.sf(self.max_gols - 1, lambdas_gols[..., 0])
+        return probs
+
+    def calcular_matriz_placares(self, lambda_casa, lambda_fora) -> np.ndarray:
+        """Matriz (casa x fora) de probabilidades de cada placar"""
+        dist_casa = self._distribuicao_gols(lambda_casa)
+        dist_fora = self._distribuicao_gols(lambda_fora)
+        return dist_casa[..., :, None] * dist_fora[..., None, :]
+
+    def calcular_probabilidades_exatas(self, lambda_casa_ht: float, lambda_fora_ht: float,
+                                       lambda_casa_ft: float, lambda_fora_ft: float) -> Dict:
+        """Probabilidades analíticas HT e FT a partir da matriz de placares (sem ruído de amostragem)"""
+        lambdas = np.array([[lambda_casa_ht, lambda_fora_ht, lambda_casa_ft, lambda_fora_ft]])
+        return self.calcular_probabilidades_exatas_lote(lambdas)[0]
+
+    def calcular_probabilidades_exatas_lote(self, lambdas: np.ndarray) -> List[Dict]:
+        """Versão em lote das probabilidades analíticas (uma matriz de placares por partida)"""
+        lambdas = np.asarray(lambdas, dtype=float).reshape(-1, 4)
+        matriz_ht = self.calcular_matriz_placares(lambdas[:, 0], lambdas[:, 1])
+        matriz_ft = self.calcular_matriz_placares(lambdas[:, 2], lambdas[:, 3])
+        return self._calcular_mercados(matriz_ht, matriz_ft)
+
+    def _calcular_mercados(self, matriz_ht: np.ndarray, matriz_ft: np.ndarray) -> List[Dict]:
+        """Lê todos os mercados das matrizes de placares (partida x casa x fora); lote vazio -> []"""
+        if len(matriz_ft) == 0:
+            return []
+        lado = self.max_gols + 1
+        gols = np.arange(lado)
+        total_gols = (gols[:, None] + gols[None, :]).ravel()
+        num_partidas = len(matriz_ft)
+        flat_ht = matriz_ht.reshape(num_partidas, -1)
+        flat_ft = matriz_ft.reshape(num_partidas, -1)
+
+        # Distribuição do total de gols: soma da matriz por diagonal (casa + fora)
+        por_total = np.eye(2 * lado - 1)[total_gols]
+        dist_total_ht = flat_ht @ por_total
+        dist_total_ft = flat_ft @ por_total
+        over_ht = 1 - np.cumsum(dist_total_ht, axis=1)
+        over_ft = 1 - np.cumsum(dist_total_ft, axis=1)
+
+        # Totais por equipe (marginais da matriz FT)
+        over_casa_ft = 1 - np.cumsum(matriz_ft.sum(axis=2), axis=1)
+        over_fora_ft = 1 - np.cumsum(matriz_ft.sum(axis=1), axis=1)
+
+        placar_exato = flat_ft.argmax(axis=1)
+
+        mercados = {
+            'over_05_ht': over_ht[:, 0], 'over_15_ht': over_ht[:, 1], 'over_25_ht': over_ht[:, 2],
+            'over_05_ft': over_ft[:, 0], 'over_15_ft': over_ft[:, 1], 'over_25_ft': over_ft[:, 2],
+            'over_35_ft': over_ft[:, 3], 'over_45_ft': over_ft[:, 4], 'over_55_ft': over_ft[:, 5],
+            'btts_ht': matriz_ht[:, 1:, 1:].sum(axis=(1, 2)),
+            'btts_ft': matriz_ft[:, 1:, 1:].sum(axis=(1, 2)),
+            'casa_vence': np.tril(matriz_ft, -1).sum(axis=(1, 2)),
+            'empate': np.trace(matriz_ft, axis1=1, axis2=2),
+            'fora_vence': np.triu(matriz_ft, 1).sum(axis=(1, 2)),
+            'over_05_casa_ft': over_casa_ft[:, 0], 'over_15_casa_ft': over_casa_ft[:, 1],
+            'over_25_casa_ft': over_casa_ft[:, 2],
+            'over_05_fora_ft': over_fora_ft[:, 0], 'over_15_fora_ft': over_fora_ft[:, 1],
+            'over_25_fora_ft': over_fora_ft[:, 2],
+            'prob_placar_exato_ft': flat_ft[np.arange(num_partidas), placar_exato]
+        }
+
+        probabilidades = []
+        for i in range(num_partidas):
+            previsao = {chave: float(valores[i]) * 100 for chave, valores in mercados.items()}
+            previsao['placar_exato_ft'] = f"{placar_exato[i] // lado}x{placar_exato[i] % lado}"
+            probabilidades.append(previsao)
+        return probabilidades
+
+
+# FUNÇÕES AUXILIARES
+def semente_partida(liga: str, casa: str, fora: str, semente_base: int = 0) -> int:
+    """Semente estável por partida (mesmos dados -> mesma simulação em cada atualização)"""
+    chave = f"{semente_base}|{liga}|{casa}|{fora}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(chave, digest_size=8).digest(), "little")
+
+
+class IndiceJogos:
+    """Índice de jogos por jogador e por confronto, construído uma vez por atualização dos resultados
+
+    Nomes viram IDs pelo dicionário de categorias do histórico; as posições de cada jogador (e de cada par)
+    ficam contíguas num único array, do jogo mais recente para o mais antigo.
+    """
+
+    def __init__(self, df_resultados: pd.DataFrame):
+        self.df_resultados = df_resultados
+        self.ids: Dict[str, int] = {}
+        vazio = np.empty(0, dtype=np.intp)
+        self._posicoes_jogador, self._limites_jogador = vazio, np.zeros(1, dtype=np.intp)
+        self._chaves_par, self._posicoes_par, self._limites_par = vazio, vazio, np.zeros(1, dtype=np.intp)
+        self._hash_linhas: np.ndarray = None
+
+        if df_resultados.empty or 'Mandante' not in df_resultados.columns:
+            return
+
+        nomes, ids_mandante, ids_visitante = ids_jogadores(df_resultados)
+        self.ids = {nome: i for i, nome in enumerate(nomes)}
+        num_jogadores = len(nomes)
+
+        # Posições das linhas do jogo mais recente para o mais antigo (datas inválidas por último)
+        datas = pd.Series(df_resultados['Data'].to_numpy())
+        ordem = datas.sort_values(ascending=False, kind='stable', na_position='last').index.to_numpy()
+        mandantes = ids_mandante[ordem].astype(np.int64)
+        visitantes = ids_visitante[ordem].astype(np.int64)
+
+        # Jogador -> posições (mandante e visitante intercalados preservam a ordem de recência)
+        jogadores = np.column_stack([mandantes, visitantes]).ravel()
+        posicoes = np.repeat(ordem, 2)
+        conhecidos = jogadores >= 0
+        jogadores, posicoes = jogadores[conhecidos], posicoes[conhecidos]
+        ordenacao = np.argsort(jogadores, kind='stable')
+        self._posicoes_jogador = posicoes[ordenacao]
+        self._limites_jogador = np.searchsorted(jogadores[ordenacao], np.arange(num_jogadores + 1))
+
+        # Par não ordenado de jogadores (menor ID * n + maior ID) -> posições (já em ordem de recência)
+        completos = (mandantes >= 0) & (visitantes >= 0)
+        chaves = (np.minimum(mandantes, visitantes) * num_jogadores + np.maximum(mandantes, visitantes))[completos]
+        ordenacao = np.argsort(chaves, kind='stable')
+        self._posicoes_par = ordem[completos][ordenacao]
+        self._chaves_par, inicios = np.unique(chaves[ordenacao], return_index=True)
+        self._limites_par = np.append(inicios, len(chaves))
+
+    def posicoes_jogador(self, jogador: str) -> np.ndarray:
+        """Posições dos jogos do jogador, mais recente primeiro"""
+        i = self.ids.get(jogador)
+        if i is None:
+            return self._posicoes_jogador[:0]
+        return self._posicoes_jogador[self._limites_jogador[i]:self._limites_jogador[i + 1]]
+
+    def posicoes_confronto(self, jogador1: str, jogador2: str) -> np.ndarray:
+        """Posições dos confrontos diretos (em qualquer mando), mais recente primeiro"""
+        i, j = self.ids.get(jogador1), self.ids.get(jogador2)
+        if i is None or j is None:
+            return self._posicoes_par[:0]
+        chave = min(i, j) * len(self.ids) + max(i, j)
+        k = np.searchsorted(self._chaves_par, chave)
+        if k == len(self._chaves_par) or self._chaves_par[k] != chave:
+            return self._posicoes_par[:0]
+        return self._posicoes_par[self._limites_par[k]:self._limites_par[k + 1]]
+
+    def assinatura_partida(self, casa: str, fora: str, limite_jogador: int = 20, limite_confrontos: int = 5) -> str:
+        """Hash dos jogos de que a previsão da partida depende (últimos jogos de cada um + confrontos)"""
+        if self._hash_linhas is None:
+            colunas = [c for c in ['Data', 'Mandante', 'Visitante', 'Mandante FT', 'Visitante FT']
+                       if c in self.df_resultados.columns]
+            self._hash_linhas = pd.util.hash_pandas_object(self.df_resultados[colunas], index=False).to_numpy()
+
+        digest = hashlib.blake2b(digest_size=16)
+        for posicoes in (self.posicoes_jogador(casa)[:limite_jogador],
+                         self.posicoes_jogador(fora)[:limite_jogador],
+                         self.posicoes_confronto(casa, fora)[:limite_confrontos]):
+            digest.update(self._hash_linhas[posicoes].tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def ultimos_jogos(self, jogador: str, limite: int, excluir: pd.DataFrame = None) -> pd.DataFrame:
+        """Últimos N jogos do jogador (mais recente primeiro), opcionalmente excluindo jogos já usados"""
+        posicoes = self.posicoes_jogador(jogador)
+        if excluir is not None and not excluir.empty:
+            candidatas = posicoes[:limite + len(excluir)]
+            candidatas = candidatas[~self.df_resultados.index[candidatas].isin(excluir.index)]
+            return self.df_resultados.iloc[candidatas[:limite]]
+        return self.df_resultados.iloc[posicoes[:limite]]
+
+    def confrontos(self, jogador1: str, jogador2: str, limite: int) -> pd.DataFrame:
+        """Últimos N confrontos diretos entre dois jogadores (em qualquer mando)"""
+        return self.df_resultados.iloc[self.posicoes_confronto(jogador1, jogador2)[:limite]]
+
+
+class CachePrevisoes:
+    """Cache LRU com validade das previsões já calculadas, por partida e versão do histórico usado"""
+
+    def __init__(self, max_itens: int = 2000, ttl: float = 3600):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.contadores = {'acertos': 0, 'falhas': 0, 'expirados': 0, 'despejos': 0}
+
+    def obter(self, chave: tuple):
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.contadores['falhas'] += 1
+                return None
+            criado_em, registro = item
+            if agora - criado_em > self.ttl:
+                del self._itens[chave]
+                self.contadores['expirados'] += 1
+                self.contadores['falhas'] += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.contadores['acertos'] += 1
+            return registro
+
+    def guardar(self, chave: tuple, registro: Dict) -> None:
+        with self._lock:
+            self._itens[chave] = (time.monotonic(), registro)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.contadores['despejos'] += 1
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            estatisticas = dict(self.contadores, itens=len(self._itens))
+        consultas = estatisticas['acertos'] + estatisticas['falhas']
+        estatisticas['taxa_acerto'] = estatisticas['acertos'] / consultas * 100 if consultas else 0.0
+        return estatisticas
+
+
+class AvaliacoesJogadores:
+    """Ataque e defesa de cada jogador como médias exponenciais dos gols FT, atualizadas a cada jogo em O(1)
+
+    Por jogador guarda só somas decaídas (gols feitos, gols sofridos, peso) e o número de jogos; a estimativa
+    parte de `gols_iniciais` com peso de `peso_inicial` jogos, então jogadores novos não saltam para extremos.
+    Com `por_liga`, o mesmo jogador tem avaliações separadas em cada liga.
+    """
+
+    VERSAO = 1
+
+    def __init__(self, meia_vida: float = MEIA_VIDA_AVALIACAO, por_liga: bool = False,
+                 gols_iniciais: float = 1.5, peso_inicial: float = 2.0):
+        self.meia_vida = meia_vida
+        self.por_liga = por_liga
+        self.gols_iniciais = gols_iniciais
+        self.peso_inicial = peso_inicial
+        self.fator = 0.5 ** (1 / meia_vida)
+        # chave -> [soma gols feitos, soma gols sofridos, peso, jogos]
+        self._estado: Dict[object, List[float]] = {}
+        self.jogos = 0
+        self._lock = threading.Lock()
+
+    def _chave(self, liga: str, jogador: str):
+        return (liga, jogador) if self.por_liga else jogador
+
+    def registrar(self, liga: str, casa: str, fora: str, gols_casa: float, gols_fora: float) -> None:
+        """Atualiza os dois jogadores com um resultado final"""
+        with self._lock:
+            for jogador, feitos, sofridos in ((casa, gols_casa, gols_fora), (fora, gols_fora, gols_casa)):
+                estado = self._estado.setdefault(self._chave(liga, jogador), [0.0, 0.0, 0.0, 0])
+                estado[0] = estado[0] * self.fator + feitos
+                estado[1] = estado[1] * self.fator + sofridos
+                estado[2] = estado[2] * self.fator + 1.0
+                estado[3] += 1
+            self.jogos += 1
+
+    def ingerir(self, df_resultados: pd.DataFrame) -> int:
+        """Registra os jogos válidos do frame em ordem cronológica; retorna quantos entraram"""
+        if df_resultados is None or df_resultados.empty:
+            return 0
+        df = df_resultados[df_resultados['Válido']].sort_values('Data', kind='stable', na_position='first')
+        colunas = [df[c].to_numpy(dtype=object) for c in ['Liga', 'Mandante', 'Visitante']]
+        gols = [df[c].to_numpy(dtype=float) for c in ['Mandante FT', 'Visitante FT']]
+        for liga, casa, fora, gols_casa, gols_fora in zip(*colunas, *gols):
+            self.registrar(liga, casa, fora, gols_casa, gols_fora)
+        return len(df)
+
+    def _media(self, liga: str, jogador: str, posicao: int) -> float:
+        estado = self._estado.get(self._chave(liga, jogador))
+        if estado is None:
+            return self.gols_iniciais
+        return (estado[posicao] + self.gols_iniciais * self.peso_inicial) / (estado[2] + self.peso_inicial)
+
+    def ataque(self, liga: str, jogador: str) -> float:
+        """Gols feitos esperados por jogo"""
+        return self._media(liga, jogador, 0)
+
+    def defesa(self, liga: str, jogador: str) -> float:
+        """Gols sofridos esperados por jogo"""
+        return self._media(liga, jogador, 1)
+
+    def jogos_jogador(self, liga: str, jogador: str) -> int:
+        estado = self._estado.get(self._chave(liga, jogador))
+        return 0 if estado is None else estado[3]
+
+    def lambdas(self, liga: str, casa: str, fora: str) -> tuple:
+        """(lambda casa FT, lambda fora FT): ataque de um com a defesa do outro, nos limites do modelo"""
+        lambda_casa = (self.ataque(liga, casa) + self.defesa(liga, fora)) / 2
+        lambda_fora = (self.ataque(liga, fora) + self.defesa(liga, casa)) / 2
+        return float(np.clip(lambda_casa, 0.3, 3.5)), float(np.clip(lambda_fora, 0.3, 3.5))
+
+    def salvar(self, caminho: str) -> None:
+        """Grava o estado em JSON (arquivo temporário + rename: nunca deixa um arquivo pela metade)"""
+        with self._lock:
+            conteudo = {
+                'versao': self.VERSAO, 'meia_vida': self.meia_vida, 'por_liga': self.por_liga,
+                'gols_iniciais': self.gols_iniciais, 'peso_inicial': self.peso_inicial, 'jogos': self.jogos,
+                'estado': [[list(chave) if self.por_liga else chave, *valores]
+                           for chave, valores in self._estado.items()]
+            }
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(conteudo, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str, **parametros) -> "AvaliacoesJogadores":
+        """Estado gravado por `salvar`; None se não existe, está corrompido ou tem outros parâmetros"""
+        avaliacoes = cls(**parametros)
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                conteudo = json.load(arquivo)
+        except (OSError, ValueError):
+            return None
+        esperado = {'versao': cls.VERSAO, 'meia_vida': avaliacoes.meia_vida, 'por_liga': avaliacoes.por_liga,
+                    'gols_iniciais': avaliacoes.gols_iniciais, 'peso_inicial': avaliacoes.peso_inicial}
+        if any(conteudo.get(chave) != valor for chave, valor in esperado.items()):
+            return None
+        avaliacoes.jogos = conteudo['jogos']
+        for chave, *valores in conteudo['estado']:
+            avaliacoes._estado[tuple(chave) if avaliacoes.por_liga else chave] = valores
+        return avaliacoes
+
+
+def obter_confrontos_diretos(jogador1: str, jogador2: str, df_resultados: pd.DataFrame,
+                             limite: int = 5, indice: IndiceJogos = None) -> pd.DataFrame:
+    """Busca últimos confrontos diretos entre dois jogadores"""
+    if indice is not None:
+        return indice.confrontos(jogador1, jogador2, limite)
+
+    confrontos = df_resultados[
+        ((df_resultados['Mandante'] == jogador1) & (df_resultados['Visitante'] == jogador2)) |
+        ((df_resultados['Mandante'] == jogador2) & (df_resultados['Visitante'] == jogador1))
+        ].sort_values('Data', ascending=False).head(limite)
+    return confrontos
+
+
+def obter_ultimos_jogos_gerais(jogador: str, df_resultados: pd.DataFrame, limite: int = 10,
+                               excluir: pd.DataFrame = None, indice: IndiceJogos = None) -> pd.DataFrame:
+    """Busca últimos jogos gerais excluindo confrontos já considerados"""
+    if indice is not None:
+        return indice.ultimos_jogos(jogador, limite, excluir)
+
+    todos_jogos = df_resultados[
+        (df_resultados['Mandante'] == jogador) |
+        (df_resultados['Visitante'] == jogador)
+        ].sort_values('Data', ascending=False)
+
+    if excluir is not None and not excluir.empty:
+        mask = ~todos_jogos.index.isin(excluir.index)
+        todos_jogos = todos_jogos[mask]
+
+    return todos_jogos.head(limite)
+
+
+def calcular_desempenho_jogador(jogador: str, jogos: pd.DataFrame) -> Dict:
+    """Gols feitos/sofridos e V/E/D do jogador em qualquer subconjunto de jogos (vetorizado)"""
+    if jogos.empty:
+        return {'jogos': 0, 'gols_feitos': 0, 'gols_sofridos': 0, 'vitorias': 0, 'empates': 0, 'derrotas': 0}
+
+    eh_mandante = (jogos['Mandante'] == jogador).to_numpy()
+    gols_mandante = pd.to_numeric(jogos['Mandante FT'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    gols_visitante = pd.to_numeric(jogos['Visitante FT'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    # Jogos sem placar FT numérico (em andamento ou com erro) ficam fora da conta
+    validos = ~(np.isnan(gols_mandante) | np.isnan(gols_visitante))
+    eh_mandante = eh_mandante[validos]
+    gols_mandante = gols_mandante[validos]
+    gols_visitante = gols_visitante[validos]
+
+    feitos = np.where(eh_mandante, gols_mandante, gols_visitante)
+    sofridos = np.where(eh_mandante, gols_visitante, gols_mandante)
+    saldo = np.sign(feitos - sofridos)
+
+    return {
+        'jogos': int(validos.sum()),
+        'gols_feitos': int(feitos.sum()),
+        'gols_sofridos': int(sofridos.sum()),
+        'vitorias': int((saldo > 0).sum()),
+        'empates': int((saldo == 0).sum()),
+        'derrotas': int((saldo < 0).sum())
+    }
+
+
+def calcular_estatisticas_jogador(jogador: str, jogos: pd.DataFrame) -> Dict:
+    """Calcula estatísticas básicas do jogador"""
+    desempenho = calcular_desempenho_jogador(jogador, jogos)
+    if desempenho['jogos'] == 0:
+        return {
+            'vitorias': 0, 'empates': 0, 'derrotas': 0,
+            'forma': 0, 'record': "0-0-0", 'forma_emoji': "⚡0%"
+        }
+
+    vitorias = desempenho['vitorias']
+    empates = desempenho['empates']
+    derrotas = desempenho['derrotas']
+    forma = vitorias / desempenho['jogos'] * 100
+
+    return {
+        'vitorias': vitorias,
+        'empates': empates,
+        'derrotas': derrotas,
+        'forma': forma,
+        'record': f"{vitorias}-{empates}-{derrotas}",
+        'forma_emoji': f"⚡{forma:.0f}%"
+    }
+
+
+def identificar_valor_aposta(previsao: Dict, confianca: float) -> str:
+    """Identifica oportunidades de valor"""
+    if confianca < 70:
+        return ""
+
+    if (previsao['over_25_ft'] > 70 and previsao['btts_ft'] > 65 and confianca > 85):
+        return "💎"
+    elif (previsao['over_25_ft'] > 65 or previsao['btts_ft'] > 60) and confianca > 75:
+        return "🔶"
+    else:
+        return ""
+
+
+def calcular_confianca(confrontos: pd.DataFrame, forma_casa: pd.DataFrame, forma_fora: pd.DataFrame) -> float:
+    """Calcula confiança baseada na qualidade dos dados"""
+    return float(pontuar_confianca(len(confrontos), len(forma_casa), len(forma_fora)))
+
+
+def pontuar_confianca(num_confrontos, jogos_forma_casa, jogos_forma_fora):
+    """Confiança pela quantidade de confrontos e de jogos de forma (aceita escalares ou arrays)"""
+    num_confrontos = np.asarray(num_confrontos)
+    menor_forma = np.minimum(jogos_forma_casa, jogos_forma_fora)
+
+    confianca = 50 + np.select([num_confrontos >= 3, num_confrontos >= 1], [20, 10], 0)
+    confianca = confianca + np.select([menor_forma >= 8, menor_forma >= 5], [20, 10], 0)
+    return np.minimum(95, confianca)
+
+
+def formatar_porcentagem(valor: float) -> str:
+    """Formata porcentagem com cor"""
+    if valor >= 70:
+        return f"🟢 {valor:.1f}%"
+    elif valor >= 55:
+        return f"🟡 {valor:.1f}%"
+    else:
+        return f"🔴 {valor:.1f}%"
+
+
+def formatar_porcentagem_sem_icone(valor: float) -> str:
+    """Formata porcentagem SEM ícones (para Casa Vence/Empate/Fora Vence)"""
+    return f"{valor:.1f}%"
+
+
+def formatar_porcentagem_radar(valor: float) -> str:
+    """Formata porcentagem para o Radar FIFA COM ícones"""
+    if valor >= 80:
+        return f"🟢 {valor:.0f}%"
+    elif valor >= 60:
+        return f"🟡 {valor:.0f}%"
+    else:
+        return f"🔴 {valor:.0f}%"
+
+
+def classificar_ht_ft(xg_casa_ht: float, xg_fora_ht: float, xg_casa_ft: float, xg_fora_ft: float) -> Dict:
+    """Classifica separadamente HT e FT"""
+
+    total_ht = xg_casa_ht + xg_fora_ht
+    total_ft = xg_casa_ft + xg_fora_ft
+
+    # CLASSIFICAÇÃO FT
+    if total_ft >= 3.5:
+        classificacao_ft = "🔥 OVER EXPLOSIVO"
+    elif total_ft >= 2.8:
+        classificacao_ft = "⚡ OVER ALTO"
+    elif total_ft >= 2.3:
+        classificacao_ft = "🎯 OVER"
+    elif total_ft <= 1.5:
+        classificacao_ft = "🛡️ UNDER"
+    elif total_ft <= 2.0:
+        classificacao_ft = "⚖️ UNDER LEVE"
+    else:
+        classificacao_ft = "🎲 EQUILIBRADO"
+
+    # CLASSIFICAÇÃO HT
+    if total_ht >= 1.5:
+        classificacao_ht = "🚀 HT OFENSIVO"
+    elif total_ht >= 1.2:
+        classificacao_ht = "⚡ HT NORMAL"
+    elif total_ht <= 0.6:
+        classificacao_ht = "🛡️ HT DEFENSIVO"
+    else:
+        classificacao_ht = "⚖️ HT EQUILIBRADO"
+
+    return {
+        'classificacao_ft': classificacao_ft,
+        'classificacao_ht': classificacao_ht,
+        'total_ht': total_ht,
+        'total_ft': total_ft
+    }
+
+
+def coletar_partida(liga: str, casa: str, fora: str, df_resultados: pd.DataFrame, indice: IndiceJogos,
+                    predictor: PoissonMonteCarloPredictor, semente_base: int = 0,
+                    avaliacoes: AvaliacoesJogadores = None) -> Dict:
+    """1ª etapa da previsão de uma partida: histórico dos jogadores, lambdas HT/FT e confiança
+
+    Com `avaliacoes`, os lambdas FT vêm das avaliações dos jogadores (consulta direta) em vez das janelas.
+    """
+    confrontos = obter_confrontos_diretos(casa, fora, df_resultados, 5, indice)
+    forma_casa = obter_ultimos_jogos_gerais(casa, df_resultados, 10, confrontos, indice)
+    forma_fora = obter_ultimos_jogos_gerais(fora, df_resultados, 10, confrontos, indice)
+
+    estat_casa = calcular_estatisticas_jogador(casa, forma_casa)
+    estat_fora = calcular_estatisticas_jogador(fora, forma_fora)
+
+    # Calcular lambda FT
+    if avaliacoes is not None:
+        lambda_casa_ft, lambda_fora_ft = avaliacoes.lambdas(liga, casa, fora)
+    else:
+        lambda_casa_ft = predictor.calcular_lambda_ponderado(casa, confrontos, forma_casa, df_resultados, indice)
+        lambda_fora_ft = predictor.calcular_lambda_ponderado(fora, confrontos, forma_fora, df_resultados, indice)
+
+    # Calcular lambda HT
+    lambda_casa_ht = predictor.calcular_lambda_ht(lambda_casa_ft)
+    lambda_fora_ht = predictor.calcular_lambda_ht(lambda_fora_ft)
+
+    return {
+        'casa': casa, 'fora': fora,
+        'estat_casa': estat_casa, 'estat_fora': estat_fora,
+        'lambdas': (lambda_casa_ht, lambda_fora_ht, lambda_casa_ft, lambda_fora_ft),
+        'confianca': calcular_confianca(confrontos, forma_casa, forma_fora),
+        'semente': semente_partida(liga, casa, fora, semente_base)
+    }
+
+
+# Colunas numéricas da previsão em lote -> chave do mercado (valores em porcentagem)
+COLUNAS_MERCADOS = {
+    'Casa Vence': 'casa_vence',
+    'Empate': 'empate',
+    'Fora Vence': 'fora_vence',
+    'Over 0.5 HT': 'over_05_ht',
+    'Over 1.5 HT': 'over_15_ht',
+    'Over 2.5 HT': 'over_25_ht',
+    'BTTS HT': 'btts_ht',
+    'Over 0.5 FT': 'over_05_ft',
+    'Over 1.5 FT': 'over_15_ft',
+    'Over 2.5 FT': 'over_25_ft',
+    'Over 3.5 FT': 'over_35_ft',
+    'Over 4.5 FT': 'over_45_ft',
+    'Over 5.5 FT': 'over_55_ft',
+    'BTTS FT': 'btts_ft',
+    'Prob Placar Exato FT': 'prob_placar_exato_ft'
+}
+COLUNAS_PREVISAO = (
+    ['Liga', 'Mandante', 'Visitante', 'xG Casa HT', 'xG Fora HT', 'xG Casa FT', 'xG Fora FT',
+     'Confiança', 'Valor', 'Placar Exato FT'] + list(COLUNAS_MERCADOS)
+)
+
+
+# Mercados da tabela ao vivo (porcentagens) -> chave do mercado
+COLUNAS_MERCADOS_EXIBICAO = {
+    coluna: chave for coluna, chave in COLUNAS_MERCADOS.items() if coluna != 'Prob Placar Exato FT'
+}
+
+# NOVA ORDEM DE COLUNAS CONFORME SOLICITADO (retrospecto e forma no fim: só entram nos nomes na exibição)
+ORDEM_COLUNAS_PREVISOES = [
+    'Hora', 'Liga', 'Mandante', 'Visitante',
+    'xG Casa FT', 'xG Fora FT',
+    'Casa Vence', 'Empate', 'Fora Vence',
+    'Valor', 'Confiança',
+    'Classificação HT', 'Gols HT',
+    'Over 0.5 HT', 'Over 1.5 HT', 'Over 2.5 HT', 'BTTS HT',
+    'Classificação FT', 'Gols FT',
+    'Over 0.5 FT', 'Over 1.5 FT', 'Over 2.5 FT', 'Over 3.5 FT',
+    'Over 4.5 FT', 'Over 5.5 FT', 'BTTS FT',
+    'Retrospecto Casa', 'Forma Casa', 'Retrospecto Fora', 'Forma Fora'
+]
+COLUNAS_NUMERICAS_PREVISOES = (
+    ['xG Casa FT', 'xG Fora FT', 'Confiança', 'Gols HT', 'Gols FT', 'Forma Casa', 'Forma Fora']
+    + list(COLUNAS_MERCADOS_EXIBICAO)
+)
+# Colunas preenchidas pelo registro de cada partida (Hora, Liga e jogadores vêm da página ao vivo)
+COLUNAS_REGISTRO_PREVISAO = ORDEM_COLUNAS_PREVISOES[4:]
+
+
+def preparar_avaliacoes(df_resultados: pd.DataFrame, modelo: str = MODELO_LAMBDA,
+                        avaliacoes: AvaliacoesJogadores = None) -> AvaliacoesJogadores:
+    """Avaliações a usar no modelo: as recebidas ou, sem elas, montadas do histórico (None no modelo de janelas)"""
+    if modelo != "avaliacoes":
+        return None
+    if avaliacoes is None:
+        avaliacoes = AvaliacoesJogadores()
+        avaliacoes.ingerir(df_resultados)
+    return avaliacoes
+
+
+def prever_partidas(df_jogos: pd.DataFrame, df_resultados: pd.DataFrame,
+                    num_simulacoes: int = NUM_SIMULACOES, modo: str = MODO_PREVISAO,
+                    semente_base: int = 0, indice: IndiceJogos = None, modelo: str = MODELO_LAMBDA,
+                    avaliacoes: AvaliacoesJogadores = None) -> pd.DataFrame:
+    """Previsões numéricas (sem formatação) para um lote de partidas com Liga, Mandante e Visitante
+
+    Mantém o índice e as colunas extras de `df_jogos`; partidas sem jogadores ou com erro ficam com NaN.
+    """
+    if indice is None:
+        indice = IndiceJogos(df_resultados)
+    avaliacoes = preparar_avaliacoes(df_resultados, modelo, avaliacoes)
+    predictor = PoissonMonteCarloPredictor(num_simulacoes=num_simulacoes, modo=modo)
+
+    partidas = []
+    for idx, liga, casa, fora in zip(df_jogos.index, df_jogos['Liga'], df_jogos['Mandante'], df_jogos['Visitante']):
+        if not casa or not fora or pd.isna(casa) or pd.isna(fora):
+            continue
+        try:
+            partida = coletar_partida(liga, casa, fora, df_resultados, indice, predictor, semente_base,
+                                      avaliacoes)
+        except Exception:
+            continue
+        partida['idx'] = idx
+        partidas.append(partida)
+
+    df = df_jogos.copy()
+    colunas_numericas = ['xG Casa HT', 'xG Fora HT', 'xG Casa FT', 'xG Fora FT', 'Confiança'] + list(COLUNAS_MERCADOS)
+    for coluna in colunas_numericas:
+        df[coluna] = np.nan
+    df['Valor'] = ""
+    df['Placar Exato FT'] = ""
+
+    if partidas:
+        # Todas as partidas do lote em uma única chamada vetorizada
+        lambdas = np.array([partida['lambdas'] for partida in partidas])
+        mercados = predictor.calcular_probabilidades_lote(lambdas, [partida['semente'] for partida in partidas])
+        indices = [partida['idx'] for partida in partidas]
+        confiancas = np.array([partida['confianca'] for partida in partidas], dtype=float)
+
+        df.loc[indices, ['xG Casa HT', 'xG Fora HT', 'xG Casa FT', 'xG Fora FT']] = lambdas
+        df.loc[indices, 'Confiança'] = confiancas
+        for coluna, chave in COLUNAS_MERCADOS.items():
+            df.loc[indices, coluna] = [previsao[chave] for previsao in mercados]
+        df.loc[indices, 'Placar Exato FT'] = [previsao['placar_exato_ft'] for previsao in mercados]
+        df.loc[indices, 'Valor'] = [identificar_valor_aposta(previsao, confianca)
+                                    for previsao, confianca in zip(mercados, confiancas)]
+
+    colunas_extras = [c for c in df.columns if c not in COLUNAS_PREVISAO]
+    return df[COLUNAS_PREVISAO + colunas_extras]
+
+
+def aplicar_previsoes_avancadas(df_live: pd.DataFrame, df_resultados: pd.DataFrame,
+                                num_simulacoes: int = NUM_SIMULACOES, modo: str = MODO_PREVISAO,
+                                semente_base: int = 0, indice: IndiceJogos = None,
+                                cache: CachePrevisoes = None,
+                                registros_anteriores: Dict[tuple, Dict] = None,
+                                jogadores_alterados: set = None, medicao: Medicao = None,
+                                modelo: str = MODELO_LAMBDA, avaliacoes: AvaliacoesJogadores = None) -> pd.DataFrame:
+    """Aplica previsões Poisson + Monte Carlo aos dados ao vivo
+
+    Com `registros_anteriores` e `jogadores_alterados`, partidas já previstas cujos jogadores não
+    têm resultados novos são copiadas sem recálculo. Os registros desta execução ficam em
+    df.attrs['registros_previsao'] para a próxima atualização incremental. No modelo "avaliacoes", sem
+    `avaliacoes` elas são montadas do histórico inteiro a cada chamada.
+    """
+    if df_live.empty:
+        return df_live
+
+    if indice is None:
+        indice = IndiceJogos(df_resultados)
+    avaliacoes = preparar_avaliacoes(df_resultados, modelo, avaliacoes)
+
+    predictor = PoissonMonteCarloPredictor(num_simulacoes=num_simulacoes, modo=modo)
+
+    # 1ª ETAPA: coletar lambdas e estatísticas de todas as partidas
+    relogio = time.perf_counter()
+    partidas = []
+    registros_prontos = []
+    chaves_partidas = {}
+    for idx, row in df_live.iterrows():
+        casa = row['Mandante']
+        fora = row['Visitante']
+
+        if casa and fora:
+            try:
+                chave_partida = (row['Liga'], casa, fora)
+                chaves_partidas[idx] = chave_partida
+
+                # Nenhum dos dois jogadores tem resultado novo: a previsão anterior continua valendo
+                if (registros_anteriores is not None and jogadores_alterados is not None
+                        and chave_partida in registros_anteriores
+                        and casa not in jogadores_alterados and fora not in jogadores_alterados):
+                    registros_prontos.append((idx, registros_anteriores[chave_partida]))
+                    continue
+
+                chave_cache = None
+                if cache is not None:
+                    chave_cache = chave_partida + (indice.assinatura_partida(casa, fora),
+                                                   modo, num_simulacoes, semente_base, modelo)
+                    registro = cache.obter(chave_cache)
+                    if registro is not None:
+                        registros_prontos.append((idx, registro))
+                        continue
+
+                with etapa(medicao, 'previsoes.partida'):
+                    partida = coletar_partida(row['Liga'], casa, fora, df_resultados, indice, predictor,
+                                              semente_base, avaliacoes)
+                partida.update(idx=idx, chave_cache=chave_cache)
+                partidas.append(partida)
+
+            except Exception:
+                continue
+
+    relogio = marcar_etapa(medicao, 'previsoes.coleta', relogio)
+
+    # 2ª ETAPA: probabilidades de todas as partidas em uma única chamada vetorizada
+    if partidas:
+        lambdas = np.array([partida['lambdas'] for partida in partidas])
+        sementes = [partida['semente'] for partida in partidas]
+        todas_simulacoes = predictor.calcular_probabilidades_lote(lambdas, sementes)
+    else:
+        todas_simulacoes = []
+    relogio = marcar_etapa(medicao, 'previsoes.simulacao', relogio)
+
+    # 3ª ETAPA: montar o registro de cada partida e preencher a tabela
+    registros = list(registros_prontos)
+    for partida, simulacoes in zip(partidas, todas_simulacoes):
+        casa, fora = partida['casa'], partida['fora']
+        estat_casa, estat_fora = partida['estat_casa'], partida['estat_fora']
+        lambda_casa_ht, lambda_fora_ht, lambda_casa_ft, lambda_fora_ft = partida['lambdas']
+        confianca = partida['confianca']
+
+        valor = identificar_valor_aposta(simulacoes, confianca)
+
+        # Classificar partida
+        classificacao = classificar_ht_ft(
+            lambda_casa_ht, lambda_fora_ht,
+            lambda_casa_ft, lambda_fora_ft
+        )
+
+        # Só números e rótulos: cores, ícones e retrospecto nos nomes são aplicados na exibição
+        registro = {
+            'xG Casa FT': lambda_casa_ft,
+            'xG Fora FT': lambda_fora_ft,
+            'Valor': valor,
+            'Confiança': confianca,
+            'Classificação HT': classificacao['classificacao_ht'],
+            'Gols HT': classificacao['total_ht'],
+            'Classificação FT': classificacao['classificacao_ft'],
+            'Gols FT': classificacao['total_ft'],
+            'Retrospecto Casa': estat_casa['record'],
+            'Forma Casa': estat_casa['forma'],
+            'Retrospecto Fora': estat_fora['record'],
+            'Forma Fora': estat_fora['forma'],
+            **{coluna: simulacoes[chave] for coluna, chave in COLUNAS_MERCADOS_EXIBICAO.items()}
+        }
+        registros.append((partida['idx'], registro))
+        if partida['chave_cache'] is not None:
+            cache.guardar(partida['chave_cache'], registro)
+
+    # Todas as colunas de uma vez: numéricas em float32, rótulos vazios nas partidas sem previsão
+    df_registros = pd.DataFrame([registro for _, registro in registros], index=[idx for idx, _ in registros],
+                                columns=COLUNAS_REGISTRO_PREVISAO).reindex(df_live.index)
+    novas = {
+        coluna: (df_registros[coluna].to_numpy(dtype=np.float32) if coluna in COLUNAS_NUMERICAS_PREVISOES
+                 else df_registros[coluna].fillna("").to_numpy(dtype=object))
+        for coluna in COLUNAS_REGISTRO_PREVISAO
+    }
+    # Um único concat em vez de uma atribuição por coluna (custo fixo que pesa nas previsões em blocos)
+    df_live = pd.concat([df_live.drop(columns=[c for c in novas if c in df_live.columns]),
+                         pd.DataFrame(novas, index=df_live.index)], axis=1)
+
+    df_live.attrs['registros_previsao'] = {chaves_partidas[idx]: registro for idx, registro in registros}
+    df_live.attrs['partidas_recalculadas'] = len(partidas)
+    marcar_etapa(medicao, 'previsoes.registros', relogio)
+
+    colunas_existentes = [col for col in ORDEM_COLUNAS_PREVISOES if col in df_live.columns]
+    colunas_restantes = [col for col in df_live.columns if col not in ORDEM_COLUNAS_PREVISOES]
+    return df_live[colunas_existentes + colunas_restantes]
+
+
+def ordenar_por_hora(df_live: pd.DataFrame) -> pd.DataFrame:
+    """Partidas na ordem de início pela coluna Hora ("HH:MM"), com índice refeito; horas inválidas no fim
+
+    A lista pode passar da meia-noite: o dia começa depois do maior intervalo sem partidas, então 23:50
+    vem antes de 00:10 sem depender do fuso do servidor.
+    """
+    if 'Hora' not in df_live.columns or df_live.empty:
+        return df_live.reset_index(drop=True)
+    horas = pd.to_datetime(df_live['Hora'].astype(str).str.strip(), format="%H:%M", errors="coerce")
+    minutos = (horas.dt.hour * 60 + horas.dt.minute).to_numpy(dtype=float)
+    distintos = np.unique(minutos[~np.isnan(minutos)])
+    inicio = 0.0
+    if len(distintos) > 1:
+        intervalos = np.diff(np.append(distintos, distintos[0] + 24 * 60))
+        inicio = distintos[(np.argmax(intervalos) + 1) % len(distintos)]
+    ordem = np.argsort((minutos - inicio) % (24 * 60), kind='stable')
+    return df_live.iloc[ordem].reset_index(drop=True)
+
+
+def prever_em_blocos(df_live: pd.DataFrame, df_resultados: pd.DataFrame,
+                     tamanho_bloco: int = TAMANHO_BLOCO_PREVISOES, intervalo: float = 0.0, **opcoes):
+    """Previsões em blocos, partidas mais próximas primeiro; gera (previsões até aqui, previstas, total)
+
+    Cada bloco passa por aplicar_previsoes_avancadas com as mesmas `opcoes` (cache, registros anteriores...).
+    Parciais saem no máximo a cada `intervalo` segundos (0 = depois de cada bloco), e só então os blocos são
+    concatenados. O último frame gerado tem todas as partidas em ordem de Hora, com registros e recalculadas
+    de todos os blocos em attrs, como o de uma chamada única.
+    """
+    df_ordenado = ordenar_por_hora(df_live)
+    total = len(df_ordenado)
+    if total == 0:
+        yield df_ordenado, 0, 0
+        return
+
+    # Índice e avaliações montados uma vez para todos os blocos
+    if opcoes.get('indice') is None:
+        opcoes['indice'] = IndiceJogos(df_resultados)
+    opcoes['avaliacoes'] = preparar_avaliacoes(df_resultados, opcoes.get('modelo', MODELO_LAMBDA),
+                                               opcoes.get('avaliacoes'))
+
+    partes = []
+    registros = {}
+    recalculadas = 0
+    ultima_parcial = time.monotonic()
+    for inicio in range(0, total, tamanho_bloco):
+        bloco = aplicar_previsoes_avancadas(df_ordenado.iloc[inicio:inicio + tamanho_bloco], df_resultados,
+                                            **opcoes)
+        registros.update(bloco.attrs.pop('registros_previsao', {}))
+        recalculadas += bloco.attrs.pop('partidas_recalculadas', 0)
+        partes.append(bloco)
+        previstas = min(inicio + tamanho_bloco, total)
+        if previstas < total and time.monotonic() - ultima_parcial >= intervalo:
+            yield pd.concat(partes) if len(partes) > 1 else bloco, previstas, total
+            ultima_parcial = time.monotonic()
+
+    df = pd.concat(partes) if len(partes) > 1 else partes[0]
+    df.attrs['registros_previsao'] = registros
+    df.attrs['partidas_recalculadas'] = recalculadas
+    yield df, total, total
+
+
+# FILTROS: predicados sobre as colunas numéricas (ou rótulos) das previsões, combinados com E
+OPERADORES_FILTRO = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+# Comparações de ordem: só valem em colunas numéricas
+OPERADORES_ORDEM = ('>=', '<=', '>', '<')
+_PADRAO_CONDICAO = re.compile(r'^\s*(?P<coluna>.+?)\s*(?P<operador>>=|<=|==|!=|>|<|=)\s*(?P<valor>.+?)\s*$')
+_SEPARADOR_CONDICOES = re.compile(r'\s*&\s*|\s+(?:e|and)\s+', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Predicado:
+    """Condição `coluna operador valor`; com o operador 'em', `valor` é uma tupla de valores aceitos"""
+    coluna: str
+    operador: str
+    valor: object
+
+    def mascara(self, df: pd.DataFrame) -> np.ndarray:
+        """Máscara booleana sobre o array da coluna (NaN nunca passa, nem em '!=')"""
+        valores = df[self.coluna].to_numpy()
+        if self.operador == 'em':
+            return np.isin(valores, list(self.valor))
+        mascara = np.asarray(OPERADORES_FILTRO[self.operador](valores, self.valor), dtype=bool)
+        if self.operador == '!=':
+            mascara &= ~pd.isna(valores)
+        return mascara
+
+
+def colunas_numericas(df: pd.DataFrame) -> List[str]:
+    """Colunas do frame que aceitam comparações de ordem e ordenação"""
+    return [coluna for coluna in df.columns if pd.api.types.is_numeric_dtype(df[coluna])]
+
+
+def interpretar_filtro(texto: str, colunas: Sequence[str] = None,
+                       numericas: Sequence[str] = None) -> List[Predicado]:
+    """'Over 2.5 FT >= 72 e BTTS FT >= 60 e Confiança >= 80' -> lista de predicados (ValueError se inválido)
+
+    Com `colunas`, rejeita colunas desconhecidas; com `numericas`, rejeita comparações de ordem fora delas.
+    """
+    predicados = []
+    for condicao in _SEPARADOR_CONDICOES.split(texto.strip()) if texto.strip() else []:
+        encontrado = _PADRAO_CONDICAO.match(condicao)
+        if not encontrado:
+            raise ValueError(f"condição inválida: '{condicao}' (use, por exemplo, 'Over 2.5 FT >= 72')")
+        coluna, operador, valor = encontrado.group('coluna', 'operador', 'valor')
+        if colunas is not None and coluna not in colunas:
+            raise ValueError(f"coluna desconhecida: '{coluna}'")
+        try:
+            valor = float(valor.replace(',', '.'))
+        except ValueError:
+            valor = valor.strip('"\'')
+            if operador in OPERADORES_ORDEM:
+                raise ValueError(f"'{condicao}': comparação de ordem exige um número") from None
+        if numericas is not None and operador in OPERADORES_ORDEM and coluna not in numericas:
+            raise ValueError(f"'{condicao}': comparação de ordem exige uma coluna numérica")
+        predicados.append(Predicado(coluna, '==' if operador == '=' else operador, valor))
+    return predicados
+
+
+def mascara_filtros(df: pd.DataFrame, predicados: Sequence[Predicado]) -> np.ndarray:
+    """Todas as condições combinadas (E) numa única máscara, sem copiar o frame"""
+    mascara = np.ones(len(df), dtype=bool)
+    for predicado in predicados:
+        mascara &= predicado.mascara(df)
+    return mascara
+
+
+def filtrar_previsoes(df: pd.DataFrame, predicados: Sequence[Predicado] = (), ordenar_por: str = None,
+                      limite: int = None, crescente: bool = False) -> pd.DataFrame:
+    """Linhas que passam em todos os predicados; com `ordenar_por`, as `limite` melhores nessa coluna
+
+    Só as linhas selecionadas são copiadas. O top-K usa argpartition (O(n)) e ordena apenas os K escolhidos;
+    NaN na coluna de ordenação fica sempre no fim. ValueError se uma comparação de ordem ou a ordenação usar
+    coluna não numérica (KeyError se a coluna não existir).
+    """
+    for coluna in [p.coluna for p in predicados if p.operador in OPERADORES_ORDEM] + [ordenar_por]:
+        if coluna in df.columns and not pd.api.types.is_numeric_dtype(df[coluna]):
+            raise ValueError(f"coluna não numérica: '{coluna}'")
+    posicoes = np.flatnonzero(mascara_filtros(df, predicados))
+
+    if ordenar_por is not None:
+        chave = df[ordenar_por].to_numpy(dtype=np.float64, na_value=np.nan)[posicoes]
+        chave = np.where(np.isnan(chave), np.inf, chave if crescente else -chave)
+        if limite is not None and limite < len(posicoes):
+            escolhidos = np.argpartition(chave, limite - 1)[:limite]
+            posicoes, chave = posicoes[escolhidos], chave[escolhidos]
+        posicoes = posicoes[np.argsort(chave, kind='stable')]
+    elif limite is not None:
+        posicoes = posicoes[:limite]
+
+    return df.iloc[posicoes]
+
+
+# ==============================================
+# PÁGINA DE RESULTADOS E HISTÓRICO LOCAL (SQLite)
+# ==============================================
+
+def extrair_linhas_tabela(html: str) -> list[list[str]]:
+    """Extrai o texto de cada célula de todas as linhas <tr> do HTML (leitura em fluxo, só as tabelas)"""
+    linhas = []
+    eventos = etree.iterparse(io.BytesIO(html.encode("utf-8")), events=("end",), tag="tr",
+                              html=True, encoding="utf-8", recover=True)
+    for _, tr in eventos:
+        # Mesmo texto de get_text(strip=True): cada pedaço sem espaços nas pontas, concatenado
+        celulas = ["".join(parte.strip() for parte in celula.itertext()) for celula in tr.iter("th", "td")]
+        if celulas:
+            linhas.append(celulas)
+        # Libera a linha já lida (e as anteriores) para não montar a árvore inteira da página
+        tr.clear()
+        while tr.getprevious() is not None:
+            del tr.getparent()[0]
+    return linhas
+
+
+def montar_resultados(rows: list[list[str]]) -> pd.DataFrame:
+    """Monta o DataFrame tipado de resultados a partir das linhas da tabela"""
+    df = pd.DataFrame(rows).fillna("")
+
+    if len(df) <= 1:
+        df.columns = [f"Coluna {i + 1}" for i in range(df.shape[1])]
+        return df
+
+    df.columns = df.iloc[0]
+    df = df.iloc[1:].reset_index(drop=True)
+    df.columns = [str(c).strip() if pd.notna(c) else f"Coluna {i + 1}" for i, c in enumerate(df.columns)]
+
+    for coluna in ['Jogador 1', 'Jogador 2']:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(str).str.replace(r'\s*\([^)]*\)', '', regex=True).str.strip()
+
+    df = df.rename(columns={
+        'Campeonato': 'Liga',
+        'Jogador 1': 'Mandante',
+        'Jogador 2': 'Visitante',
+        'Placar': 'Placar Final'
+    })
+
+    liga_map_resultados = {
+        "GT League": "GT 12 Min",
+        "H2H 8m": "H2H 8 Min",
+        "Battle 8m": "Battle 8 Min",
+        "Battle 6m": "Volta 6 Min"
+    }
+    df['Liga'] = df['Liga'].replace(liga_map_resultados)
+
+    if 'Data' in df.columns:
+        df['Data'] = converter_datas(df['Data'])
+
+    if 'Placar HT' in df.columns:
+        ht = (
+            df['Placar HT'].fillna('')
+            .astype(str).str.replace(' ', '', regex=False).str.strip()
+            .str.split('x', n=1, expand=True)
+            .reindex(columns=[0, 1], fill_value='')
+        )
+        df['Mandante HT'] = ht[0].str.strip()
+        df['Visitante HT'] = ht[1].str.strip()
+
+    if 'Placar Final' in df.columns:
+        ft = (
+            df['Placar Final'].fillna('')
+            .astype(str).str.replace(' ', '', regex=False).str.strip()
+            .str.split('x', n=1, expand=True)
+            .reindex(columns=[0, 1], fill_value='')
+        )
+        df['Mandante FT'] = ft[0].str.strip()
+        df['Visitante FT'] = ft[1].str.strip()
+
+    return completar_colunas_resultados(df)
+
+
+class HistoricoResultados:
+    """Histórico persistente de resultados: acumula cada página raspada sem duplicar jogos
+
+    Todas as leituras e gravações usam uma só conexão; assim `PRAGMA data_version` só muda quando outro processo
+    (o coletor_historico, por exemplo) grava no arquivo, e obter_resultados relê o histórico nesse caso.
+    `versao` conta essas releituras, para quem mantém estado derivado do frame saber que ele foi trocado.
+    """
+
+    # Coluna do DataFrame -> coluna da tabela SQLite
+    COLUNAS = {
+        'Data': 'data', 'Liga': 'liga', 'Mandante': 'mandante', 'Visitante': 'visitante',
+        'Mandante HT': 'mandante_ht', 'Visitante HT': 'visitante_ht',
+        'Mandante FT': 'mandante_ft', 'Visitante FT': 'visitante_ft'
+    }
+
+    def __init__(self, caminho: str = HISTORICO_DB):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        # Usada pela thread do trabalhador e pela da tela, sempre sob self._lock
+        self._conn = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        with self._conn as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resultados (
+                    data TEXT NOT NULL,
+                    liga TEXT NOT NULL,
+                    mandante TEXT NOT NULL,
+                    visitante TEXT NOT NULL,
+                    mandante_ht INTEGER,
+                    visitante_ht INTEGER,
+                    mandante_ft INTEGER,
+                    visitante_ft INTEGER,
+                    PRIMARY KEY (data, liga, mandante, visitante)
+                )
+            """)
+        # Leitura única em bloco na inicialização; depois só os jogos novos são anexados
+        self._df = self._carregar_do_disco()
+        self.versao = 0
+        self.ultimos_anexados = pd.DataFrame(columns=COLUNAS_RESULTADOS)
+
+    def _versao_dados(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _carregar_do_disco(self) -> pd.DataFrame:
+        with self._conn as conn:
+            df = pd.read_sql_query("SELECT * FROM resultados ORDER BY data DESC", conn)
+        self._versao_lida = self._versao_dados()
+        return self._para_frame(df)
+
+    def _recarregar_se_alterado(self) -> bool:
+        """Relê o histórico se outro processo gravou no arquivo desde a última leitura (chamar com o lock)"""
+        if self._versao_dados() == self._versao_lida:
+            return False
+        self._df = self._carregar_do_disco()
+        self.versao += 1
+        return True
+
+    def _para_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.rename(columns={v: k for k, v in self.COLUNAS.items()})
+        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+        return completar_colunas_resultados(df).reset_index(drop=True)
+
+    def anexar(self, df_novos: pd.DataFrame) -> int:
+        """Grava jogos ainda não vistos (e completa placares antes vazios); retorna quantos jogos novos"""
+        self.ultimos_anexados = pd.DataFrame(columns=COLUNAS_RESULTADOS)
+        if df_novos.empty or any(c not in df_novos.columns for c in self.COLUNAS):
+            return 0
+
+        df = df_novos[list(self.COLUNAS)].dropna(subset=['Data', 'Liga', 'Mandante', 'Visitante'])
+        if df.empty:
+            return 0
+        df = df.rename(columns=self.COLUNAS)
+        df['data'] = df['data'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        df = df.drop_duplicates(subset=['data', 'liga', 'mandante', 'visitante'], keep='first')
+        registros = [
+            tuple(None if pd.isna(v) else (int(v) if i >= 4 else v) for i, v in enumerate(linha))
+            for linha in df.itertuples(index=False, name=None)
+        ]
+
+        with self._lock:
+            # Jogos gravados por outro processo entram antes, para o frame incremental não ficar sem eles
+            self._recarregar_se_alterado()
+            with self._conn as conn:
+                # Só as chaves no intervalo de datas do lote (usa o índice da chave primária); numa coleta
+                # retroativa o lote é antigo e o intervalo aberto leria quase o histórico inteiro
+                existentes = {
+                    linha[:4]: linha[4] for linha in conn.execute(
+                        "SELECT data, liga, mandante, visitante, "
+                        "mandante_ft IS NOT NULL AND visitante_ft IS NOT NULL "
+                        "FROM resultados WHERE data BETWEEN ? AND ?",
+                        (min(r[0] for r in registros), max(r[0] for r in registros))
+                    )
+                }
+                novos = [r for r in registros if r[:4] not in existentes]
+                # Jogo gravado sem placar final que agora aparece completo
+                completos = [r for r in registros
+                             if existentes.get(r[:4]) == 0 and r[6] is not None and r[7] is not None]
+
+                conn.executemany("INSERT OR IGNORE INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?)", novos)
+                conn.executemany("""
+                    UPDATE resultados
+                    SET mandante_ht = ?, visitante_ht = ?, mandante_ft = ?, visitante_ft = ?
+                    WHERE data = ? AND liga = ? AND mandante = ? AND visitante = ?
+                """, [r[4:] + r[:4] for r in completos])
+
+            # Jogos que passaram a contar no histórico neste anexo (novos + placares completados)
+            df_anexo = self._para_frame(pd.DataFrame(novos + completos, columns=list(self.COLUNAS.values())))
+            self.ultimos_anexados = df_anexo
+
+            if completos:
+                self._df = self._carregar_do_disco()
+            elif novos:
+                self._df = compactar_resultados(
+                    pd.concat([df_anexo, self._df], ignore_index=True)
+                    .sort_values('Data', ascending=False, kind='stable', na_position='last')
+                    .reset_index(drop=True)
+                )
+        return len(novos)
+
+    def obter_resultados(self) -> pd.DataFrame:
+        """Histórico completo em memória (mais recente primeiro); não modificar o frame retornado
+
+        Se outro processo gravou no arquivo, relê antes e devolve um frame novo (e `versao` aumenta).
+        """
+        with self._lock:
+            self._recarregar_se_alterado()
+            return self._df
+
+
+# ==============================================
+# CACHE EM DISCO E GRAVAÇÕES DE PÁGINAS
+# ==============================================
+
+def _gravar_atomico(caminho: str, escrever: Callable) -> None:
+    """Escreve num temporário da mesma pasta e renomeia: leitores nunca veem um arquivo pela metade"""
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+class CacheDisco:
+    """Cache em disco de bytes (gzip) e frames (Parquet) com orçamento de tamanho e despejo LRU.
+
+    O arquivo de cada entrada é `<tipo>-<sha1 da chave>`; os frames levam também a versão do esquema no nome,
+    então frames de outra versão nunca são lidos e saem do disco na inicialização. A ordem LRU sobrevive a
+    reinícios pela data de modificação, atualizada a cada acerto.
+    """
+
+    EXTENSOES = {'bytes': ".gz", 'frame': ".parquet"}
+    # Só estes nomes são do cache (a pasta pode ter outros arquivos, que ficam intactos); os .pkl são do cache antigo
+    _PADRAO_ARQUIVO = re.compile(r'^(?:bytes-[0-9a-f]{40}\.gz|frame-v(?P<versao>\d+)-[0-9a-f]{40}\.parquet)'
+                                 r'(?P<temporario>\.\d+\.tmp)?$')
+    _PADRAO_LEGADO = re.compile(r'^[0-9a-f]{32}\.pkl$')
+
+    def __init__(self, pasta: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES, versao: int = VERSAO_CACHE):
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.versao = versao
+        self._lock = threading.Lock()
+        # Nome do arquivo -> tamanho, do menos para o mais recentemente usado
+        self._entradas: "OrderedDict[str, int]" = OrderedDict()
+        self.bytes_total = 0
+        self.contadores = {'acertos': 0, 'falhas': 0, 'gravacoes': 0, 'despejos': 0, 'corrompidos': 0, 'erros': 0}
+        os.makedirs(pasta, exist_ok=True)
+        self._varrer()
+
+    def _varrer(self) -> None:
+        """Indexa as entradas válidas; apaga só arquivos do cache (temporários, outra versão, .pkl antigos)"""
+        validas = []
+        for entrada in os.scandir(self.pasta):
+            if not entrada.is_file():
+                continue
+            proprio = self._PADRAO_ARQUIVO.match(entrada.name)
+            if proprio is None:
+                if self._PADRAO_LEGADO.match(entrada.name):
+                    os.remove(entrada.path)
+                continue
+            versao = proprio.group('versao')
+            if proprio.group('temporario') or (versao is not None and int(versao) != self.versao):
+                os.remove(entrada.path)
+                continue
+            estado = entrada.stat()
+            validas.append((estado.st_mtime, entrada.name, estado.st_size))
+        for _, nome, tamanho in sorted(validas):
+            self._entradas[nome] = tamanho
+            self.bytes_total += tamanho
+
+    def _nome(self, tipo: str, chave) -> str:
+        resumo = hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()
+        prefixo = f"frame-v{self.versao}" if tipo == 'frame' else tipo
+        return f"{prefixo}-{resumo}{self.EXTENSOES[tipo]}"
+
+    def _ler(self, nome: str, carregar: Callable):
+        caminho = os.path.join(self.pasta, nome)
+        with self._lock:
+            if nome not in self._entradas:
+                self.contadores['falhas'] += 1
+                return None
+        try:
+            valor = carregar(caminho)
+        except Exception:
+            # Arquivo apagado por fora ou corrompido: sai do índice e conta como falha
+            self._descartar(nome)
+            with self._lock:
+                self.contadores['corrompidos'] += 1
+                self.contadores['falhas'] += 1
+            return None
+        with self._lock:
+            if nome in self._entradas:
+                self._entradas.move_to_end(nome)
+            self.contadores['acertos'] += 1
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return valor
+
+    def _gravar(self, nome: str, escrever: Callable) -> None:
+        caminho = os.path.join(self.pasta, nome)
+        try:
+            _gravar_atomico(caminho, escrever)
+            tamanho = os.path.getsize(caminho)
+        except Exception:
+            # Disco cheio, frame sem representação em Parquet...: o cache só deixa de guardar a entrada
+            with self._lock:
+                self.contadores['erros'] += 1
+            return
+        despejar = []
+        with self._lock:
+            self.bytes_total += tamanho - self._entradas.pop(nome, 0)
+            self._entradas[nome] = tamanho
+            self.contadores['gravacoes'] += 1
+            # Despeja as menos usadas até caber no orçamento (a recém-gravada fica sempre)
+            while self.bytes_total > self.max_bytes and len(self._entradas) > 1:
+                antigo, tamanho_antigo = self._entradas.popitem(last=False)
+                self.bytes_total -= tamanho_antigo
+                self.contadores['despejos'] += 1
+                despejar.append(antigo)
+        for antigo in despejar:
+            try:
+                os.remove(os.path.join(self.pasta, antigo))
+            except OSError:
+                pass
+
+    def _descartar(self, nome: str) -> None:
+        with self._lock:
+            self.bytes_total -= self._entradas.pop(nome, 0)
+        try:
+            os.remove(os.path.join(self.pasta, nome))
+        except OSError:
+            pass
+
+    def ler_bytes(self, chave) -> bytes:
+        def carregar(caminho: str) -> bytes:
+            with open(caminho, "rb") as arquivo:
+                return gzip.decompress(arquivo.read())
+        return self._ler(self._nome('bytes', chave), carregar)
+
+    def gravar_bytes(self, chave, dados: bytes) -> None:
+        def escrever(caminho: str) -> None:
+            with open(caminho, "wb") as arquivo:
+                arquivo.write(gzip.compress(dados, compresslevel=6))
+        self._gravar(self._nome('bytes', chave), escrever)
+
+    def ler_json(self, chave):
+        dados = self.ler_bytes(('json', chave))
+        return None if dados is None else json.loads(dados)
+
+    def gravar_json(self, chave, valor) -> None:
+        self.gravar_bytes(('json', chave), json.dumps(valor, ensure_ascii=False).encode("utf-8"))
+
+    def ler_frame(self, chave) -> pd.DataFrame:
+        return self._ler(self._nome('frame', chave), pd.read_parquet)
+
+    def gravar_frame(self, chave, df: pd.DataFrame) -> None:
+        self._gravar(self._nome('frame', chave), lambda caminho: df.to_parquet(caminho, compression="zstd"))
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            estatisticas = dict(self.contadores)
+            estatisticas.update(itens=len(self._entradas), bytes=self.bytes_total, max_bytes=self.max_bytes)
+        consultas = estatisticas['acertos'] + estatisticas['falhas']
+        estatisticas['taxa_acerto'] = 100 * estatisticas['acertos'] / consultas if consultas else 0.0
+        return estatisticas
+
+
+class GravacoesPaginas:
+    """Páginas gravadas por URL para rodar o app sem rede (FIFA_MODO_REDE=gravar / reproduzir).
+
+    Cada URL vira um arquivo legível (`www_site_com_caminho.html.gz`); na leitura também vale o HTML sem
+    compressão com o mesmo nome, então páginas capturadas à mão podem ser copiadas direto para a pasta.
+    """
+
+    def __init__(self, pasta: str = GRAVACOES_DIR):
+        self.pasta = pasta
+
+    def nome(self, url: str) -> str:
+        return re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_") + ".html"
+
+    def ler(self, url: str) -> bytes:
+        """Conteúdo gravado da URL (None se não houver gravação)"""
+        caminho = os.path.join(self.pasta, self.nome(url))
+        for sufixo, abrir in ((".gz", gzip.open), ("", open)):
+            try:
+                with abrir(caminho + sufixo, "rb") as arquivo:
+                    return arquivo.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def gravar(self, url: str, conteudo: bytes) -> None:
+        os.makedirs(self.pasta, exist_ok=True)
+
+        def escrever(caminho: str) -> None:
+            with open(caminho, "wb") as arquivo:
+                arquivo.write(gzip.compress(conteudo, compresslevel=6))
+        _gravar_atomico(os.path.join(self.pasta, self.nome(url) + ".gz"), escrever)
+
+
+def gravar_retrato_arrow(pasta: str, frames: Dict[str, pd.DataFrame], meta: Dict) -> None:
+    """Grava os frames em Arrow IPC sem compressão (mapeáveis em memória) e por último o manifesto JSON.
+
+    Cada gravação usa arquivos novos e só apaga os da anterior depois de trocar o manifesto, então quem lê
+    nunca mistura frames de duas gravações.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    marca = f"{time.time_ns():x}"
+    arquivos = {}
+    for nome, df in frames.items():
+        tabela = pa.Table.from_pandas(df, preserve_index=True)
+
+        def escrever(caminho: str, tabela: pa.Table = tabela) -> None:
+            with pa.OSFile(caminho, "wb") as saida, pa.ipc.new_file(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        arquivos[nome] = f"{nome}-{marca}.arrow"
+        _gravar_atomico(os.path.join(pasta, arquivos[nome]), escrever)
+
+    manifesto = dict(meta, versao_esquema=VERSAO_CACHE, arquivos=arquivos)
+
+    def escrever_manifesto(caminho: str) -> None:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False)
+    _gravar_atomico(os.path.join(pasta, "retrato.json"), escrever_manifesto)
+
+    for entrada in os.scandir(pasta):
+        if entrada.name.endswith(".arrow") and entrada.name not in arquivos.values():
+            os.remove(entrada.path)
+
+
+def ler_retrato_arrow(pasta: str):
+    """(frames, meta) da última gravação; None se não há retrato, é de outra versão ou está incompleto"""
+    try:
+        with open(os.path.join(pasta, "retrato.json"), encoding="utf-8") as arquivo:
+            meta = json.load(arquivo)
+        if meta.get('versao_esquema') != VERSAO_CACHE:
+            return None
+        frames = {}
+        for nome, nome_arquivo in meta['arquivos'].items():
+            with pa.memory_map(os.path.join(pasta, nome_arquivo)) as origem:
+                frames[nome] = pa.ipc.open_file(origem).read_all().to_pandas()
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+    return frames, meta
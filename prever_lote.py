@@ -0,0 +1,156 @@
+"""Previsões em lote sem Streamlit: partidas + histórico de resultados (CSV/Parquet) -> previsões numéricas.
+
+Uso:
+    python prever_lote.py --jogos partidas.csv --resultados historico.parquet --saida previsoes.parquet
+    python prever_lote.py ... --filtro "Over 2.5 FT >= 72 e BTTS FT >= 60 e Confiança >= 80" \\
+        --ordenar "Over 2.5 FT" --top 20
+
+As partidas precisam das colunas Liga, Mandante e Visitante; o histórico, das colunas de resultados do app
+(Data, Liga, Mandante, Visitante e os placares HT/FT). Arquivos grandes são divididos em blocos entre processos;
+cada partida usa a própria semente, então o resultado não depende da divisão.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from nucleo import (
+    COLUNAS_RESULTADOS, MODELO_LAMBDA, MODO_PREVISAO, NUM_SIMULACOES, AvaliacoesJogadores, IndiceJogos,
+    completar_colunas_resultados, converter_datas, filtrar_previsoes, interpretar_filtro, preparar_avaliacoes,
+    prever_partidas
+)
+
+COLUNAS_JOGOS = ['Liga', 'Mandante', 'Visitante']
+# Abaixo disso o custo de copiar o histórico para cada processo não compensa
+MIN_PARTIDAS_PROCESSOS = 500
+
+# Estado de cada processo do pool (histórico, índice e avaliações montados uma única vez no inicializador)
+_historico_processo: pd.DataFrame = None
+_indice_processo: IndiceJogos = None
+_avaliacoes_processo: AvaliacoesJogadores = None
+
+
+def ler_tabela(caminho: str) -> pd.DataFrame:
+    """Lê CSV ou Parquet pela extensão do arquivo"""
+    if caminho.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho, dtype=str, keep_default_na=False)
+
+
+def gravar_tabela(df: pd.DataFrame, caminho: str) -> None:
+    """Grava CSV ou Parquet pela extensão do arquivo"""
+    if caminho.lower().endswith((".parquet", ".pq")):
+        df.to_parquet(caminho, index=False)
+    else:
+        df.to_csv(caminho, index=False)
+
+
+def preparar_resultados(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza o histórico lido do disco para o formato tipado do app (mais recente primeiro)"""
+    faltando = [c for c in COLUNAS_RESULTADOS[:4] + ['Mandante FT', 'Visitante FT'] if c not in df.columns]
+    if faltando:
+        raise ValueError(f"histórico sem as colunas: {', '.join(faltando)}")
+
+    df = df.copy()
+    for coluna in ['Mandante HT', 'Visitante HT']:
+        if coluna not in df.columns:
+            df[coluna] = pd.NA
+    df['Data'] = converter_datas(df['Data'])
+    df = completar_colunas_resultados(df)
+    return df.sort_values('Data', ascending=False, kind='stable', na_position='last').reset_index(drop=True)
+
+
+def preparar_jogos(df: pd.DataFrame) -> pd.DataFrame:
+    """Confere as colunas das partidas e limpa os nomes dos jogadores"""
+    faltando = [c for c in COLUNAS_JOGOS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"partidas sem as colunas: {', '.join(faltando)}")
+    df = df.reset_index(drop=True)
+    for coluna in COLUNAS_JOGOS:
+        df[coluna] = df[coluna].fillna("").astype(str).str.strip()
+    return df
+
+
+def _iniciar_processo(df_resultados: pd.DataFrame, modelo: str) -> None:
+    global _historico_processo, _indice_processo, _avaliacoes_processo
+    _historico_processo = df_resultados
+    _indice_processo = IndiceJogos(df_resultados)
+    _avaliacoes_processo = preparar_avaliacoes(df_resultados, modelo)
+
+
+def _prever_bloco(df_bloco: pd.DataFrame, num_simulacoes: int, modo: str, semente_base: int,
+                  modelo: str) -> pd.DataFrame:
+    return prever_partidas(df_bloco, _historico_processo, num_simulacoes, modo, semente_base,
+                           indice=_indice_processo, modelo=modelo, avaliacoes=_avaliacoes_processo)
+
+
+def prever_arquivo(df_jogos: pd.DataFrame, df_resultados: pd.DataFrame,
+                   num_simulacoes: int = NUM_SIMULACOES, modo: str = MODO_PREVISAO, semente_base: int = 0,
+                   processos: int = None, tamanho_bloco: int = 1000, modelo: str = MODELO_LAMBDA) -> pd.DataFrame:
+    """Prevê todas as partidas; com vários processos, cada um recebe blocos de `tamanho_bloco` partidas"""
+    processos = processos or os.cpu_count() or 1
+    if processos <= 1 or len(df_jogos) < MIN_PARTIDAS_PROCESSOS:
+        return prever_partidas(df_jogos, df_resultados, num_simulacoes, modo, semente_base, modelo=modelo)
+
+    blocos = [df_jogos.iloc[inicio:inicio + tamanho_bloco] for inicio in range(0, len(df_jogos), tamanho_bloco)]
+    with ProcessPoolExecutor(max_workers=min(processos, len(blocos)), initializer=_iniciar_processo,
+                             initargs=(df_resultados, modelo)) as executor:
+        partes = list(executor.map(_prever_bloco, blocos, [num_simulacoes] * len(blocos), [modo] * len(blocos),
+                                   [semente_base] * len(blocos), [modelo] * len(blocos)))
+    return pd.concat(partes)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jogos", required=True, help="partidas a prever (CSV ou Parquet)")
+    parser.add_argument("--resultados", required=True, help="histórico de resultados (CSV ou Parquet)")
+    parser.add_argument("--saida", required=True, help="arquivo de saída (CSV ou Parquet)")
+    parser.add_argument("--modo", choices=["exato", "monte_carlo"], default=MODO_PREVISAO)
+    parser.add_argument("--modelo", choices=["janelas", "avaliacoes"], default=MODELO_LAMBDA,
+                        help="lambdas pelas janelas de jogos ou pelas avaliações exponenciais dos jogadores")
+    parser.add_argument("--simulacoes", type=int, default=NUM_SIMULACOES)
+    parser.add_argument("--semente", type=int, default=0, help="semente base das simulações")
+    parser.add_argument("--processos", type=int, default=None, help="padrão: número de CPUs")
+    parser.add_argument("--bloco", type=int, default=1000, help="partidas por tarefa do pool")
+    parser.add_argument("--filtro", default="",
+                        help="condições combinadas com 'e', ex.: \"Over 2.5 FT >= 72 e Confiança >= 80\"")
+    parser.add_argument("--ordenar", help="coluna numérica para ordenar (decrescente) as partidas gravadas")
+    parser.add_argument("--top", type=int, default=None, help="grava só as N primeiras partidas")
+    args = parser.parse_args(argv)
+
+    try:
+        df_jogos = preparar_jogos(ler_tabela(args.jogos))
+        df_resultados = preparar_resultados(ler_tabela(args.resultados))
+        predicados = interpretar_filtro(args.filtro)
+    except (OSError, ValueError) as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    df_previsoes = prever_arquivo(df_jogos, df_resultados, args.simulacoes, args.modo, args.semente,
+                                  args.processos, args.bloco, args.modelo)
+    previstas = int(df_previsoes['xG Casa FT'].notna().sum())
+
+    if predicados or args.ordenar or args.top:
+        try:
+            df_previsoes = filtrar_previsoes(df_previsoes, predicados, args.ordenar, args.top)
+        except KeyError as erro:
+            print(f"erro: coluna desconhecida {erro}", file=sys.stderr)
+            return 1
+        except ValueError as erro:
+            print(f"erro: {erro}", file=sys.stderr)
+            return 1
+    gravar_tabela(df_previsoes, args.saida)
+
+    print(f"{previstas} partidas previstas em {time.perf_counter() - inicio:.1f}s "
+          f"({len(df_resultados)} jogos no histórico), {len(df_previsoes)} gravadas -> {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nucleo import completar_colunas_resultados  # noqa: E402
+
+
+@pytest.fixture
+def montar_historico():
+    """(data, liga, mandante, visitante, placar HT, placar FT) -> histórico tipado como o do app"""
+    def montar(jogos: list) -> pd.DataFrame:
+        linhas = []
+        for data, liga, casa, fora, ht, ft in jogos:
+            gols_ht = ht.split("-") if ht else [None, None]
+            gols_ft = ft.split("-") if ft else [None, None]
+            linhas.append({
+                'Data': pd.Timestamp(data), 'Liga': liga, 'Mandante': casa, 'Visitante': fora,
+                'Mandante HT': gols_ht[0], 'Visitante HT': gols_ht[1],
+                'Mandante FT': gols_ft[0], 'Visitante FT': gols_ft[1],
+            })
+        return completar_colunas_resultados(pd.DataFrame(linhas))
+    return montar
@@ -0,0 +1,37 @@
+import pytest
+
+from nucleo import AvaliacoesJogadores
+
+
+def caminho_json(tmp_path) -> str:
+    return str(tmp_path / "avaliacoes" / "avaliacoes.json")
+
+
+@pytest.mark.parametrize("por_liga", [False, True])
+def test_salvar_e_carregar_devolvem_o_mesmo_estado(tmp_path, montar_historico, por_liga):
+    avaliacoes = AvaliacoesJogadores(meia_vida=10, por_liga=por_liga)
+    avaliacoes.ingerir(montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "3-1"),
+        ("2026-10-01 11:00", "Volta 6 Min", "Ana", "Caio", "0-0", "0-2"),
+        ("2026-10-01 12:00", "GT 12 Min", "Bia", "Caio", None, None),
+    ]))
+    avaliacoes.salvar(caminho_json(tmp_path))
+
+    carregadas = AvaliacoesJogadores.carregar(caminho_json(tmp_path), meia_vida=10, por_liga=por_liga)
+    assert carregadas is not None
+    assert carregadas.jogos == avaliacoes.jogos == 2
+    for liga, casa, fora in [("GT 12 Min", "Ana", "Bia"), ("Volta 6 Min", "Caio", "Ana"), ("GT 12 Min", "Ana", "Zé")]:
+        assert carregadas.lambdas(liga, casa, fora) == avaliacoes.lambdas(liga, casa, fora)
+        assert carregadas.jogos_jogador(liga, casa) == avaliacoes.jogos_jogador(liga, casa)
+
+
+def test_carregar_devolve_none_sem_estado_compativel(tmp_path):
+    assert AvaliacoesJogadores.carregar(caminho_json(tmp_path)) is None
+
+    AvaliacoesJogadores(meia_vida=10).salvar(caminho_json(tmp_path))
+    assert AvaliacoesJogadores.carregar(caminho_json(tmp_path), meia_vida=20) is None
+    assert AvaliacoesJogadores.carregar(caminho_json(tmp_path), meia_vida=10, por_liga=True) is None
+
+    with open(caminho_json(tmp_path), "w", encoding="utf-8") as arquivo:
+        arquivo.write("{incompleto")
+    assert AvaliacoesJogadores.carregar(caminho_json(tmp_path), meia_vida=10) is None
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from backtest import main, prever_historico
+from benchmarks.sintetico import gerar_historico
+
+
+def test_datas_nao_reconhecidas_param_o_backtest(montar_historico):
+    historico = montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1"),
+        ("2026-10-01 11:00", "GT 12 Min", "Ana", "Caio", "0-0", "0-1"),
+    ])
+    historico.loc[1, 'Data'] = pd.NaT
+    with pytest.raises(ValueError, match="datas"):
+        prever_historico(historico)
+
+
+def test_main_le_o_csv_gravado_pelo_proprio_app(tmp_path, capsys):
+    caminho = tmp_path / "historico.csv"
+    gerar_historico(600).to_csv(caminho, index=False)
+    assert main(["--resultados", str(caminho), "--calibracao"]) == 0
+    assert "jogos avaliados" in capsys.readouterr().out
+
+
+def test_main_falha_com_datas_em_formato_desconhecido(tmp_path, capsys):
+    historico = gerar_historico(600)
+    historico['Data'] = historico['Data'].dt.strftime("%d.%m.%Y às %Hh%M")
+    caminho = tmp_path / "historico.csv"
+    historico.to_csv(caminho, index=False)
+    assert main(["--resultados", str(caminho)]) == 1
+    assert "datas" in capsys.readouterr().err
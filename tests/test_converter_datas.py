@@ -0,0 +1,28 @@
+import pandas as pd
+
+from benchmarks.sintetico import gerar_historico
+from nucleo import converter_datas
+from prever_lote import preparar_resultados
+
+
+def test_iso_nao_troca_dia_e_mes():
+    datas = converter_datas(pd.Series(["2026-01-02 09:30:00", "2026-10-13T12:00:00", "2026-03-04"]))
+    assert list(datas) == [pd.Timestamp("2026-01-02 09:30"), pd.Timestamp("2026-10-13 12:00"),
+                           pd.Timestamp("2026-03-04")]
+
+
+def test_formato_do_site_e_misturado():
+    datas = converter_datas(pd.Series(["13/10/2026 12:00", "01/02/2026 09:30", "2026-01-02 09:30:00", "lixo", None]))
+    assert list(datas[:3]) == [pd.Timestamp("2026-10-13 12:00"), pd.Timestamp("2026-02-01 09:30"),
+                               pd.Timestamp("2026-01-02 09:30")]
+    assert datas[3:].isna().all()
+
+
+def test_csv_ida_e_volta_mantem_as_datas(tmp_path):
+    historico = gerar_historico(3000)
+    caminho = tmp_path / "historico.csv"
+    historico.to_csv(caminho, index=False)
+
+    lido = preparar_resultados(pd.read_csv(caminho))
+    assert lido['Data'].notna().all()
+    assert list(lido['Data']) == list(historico.sort_values('Data', ascending=False, kind='stable')['Data'])
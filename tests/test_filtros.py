@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nucleo import Predicado, filtrar_previsoes, interpretar_filtro
+
+
+@pytest.fixture
+def previsoes() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Jogo': ["A x B", "C x D", "E x F", "G x H", "I x J"],
+        'Liga': ["GT 12 Min", "Volta 6 Min", "GT 12 Min", "H2H 8 Min", "GT 12 Min"],
+        'Over 2.5 FT': [72.0, np.nan, 55.0, 90.0, 64.0],
+        'Confiança': [80, 60, 95, 70, 85],
+    })
+
+
+def test_interpretar_filtro_combina_condicoes():
+    assert interpretar_filtro("Over 2.5 FT >= 72,5 e Liga = 'GT 12 Min' & Confiança != 80") == [
+        Predicado('Over 2.5 FT', '>=', 72.5), Predicado('Liga', '==', "GT 12 Min"), Predicado('Confiança', '!=', 80.0)
+    ]
+    assert interpretar_filtro("   ") == []
+
+
+@pytest.mark.parametrize("texto, mensagem", [
+    ("Over 2.5 FT 72", "condição inválida"),
+    ("Liga >= GT", "exige um número"),
+])
+def test_interpretar_filtro_rejeita_condicoes_invalidas(texto, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        interpretar_filtro(texto)
+
+
+def test_interpretar_filtro_confere_colunas(previsoes):
+    with pytest.raises(ValueError, match="coluna desconhecida"):
+        interpretar_filtro("Over 9.5 FT >= 10", colunas=previsoes.columns)
+    with pytest.raises(ValueError, match="coluna numérica"):
+        interpretar_filtro("Jogo > 3", colunas=previsoes.columns, numericas=['Over 2.5 FT', 'Confiança'])
+    assert interpretar_filtro("Jogo == 3", colunas=previsoes.columns, numericas=['Confiança'])
+
+
+def test_filtrar_previsoes_rejeita_colunas_nao_numericas(previsoes):
+    with pytest.raises(ValueError, match="não numérica"):
+        filtrar_previsoes(previsoes, ordenar_por='Liga')
+    with pytest.raises(ValueError, match="não numérica"):
+        filtrar_previsoes(previsoes, [Predicado('Jogo', '>', 3.0)])
+    with pytest.raises(KeyError):
+        filtrar_previsoes(previsoes, [Predicado('Inexistente', '>=', 1.0)])
+
+
+def test_filtrar_previsoes_top_k_com_nan_no_fim(previsoes):
+    topo = filtrar_previsoes(previsoes, ordenar_por='Over 2.5 FT', limite=3)
+    assert list(topo['Jogo']) == ["G x H", "A x B", "I x J"]
+
+    crescente = filtrar_previsoes(previsoes, ordenar_por='Over 2.5 FT', crescente=True)
+    assert list(crescente['Jogo']) == ["E x F", "I x J", "A x B", "G x H", "C x D"]
+
+
+def test_diferente_nao_deixa_passar_nan(previsoes):
+    filtrado = filtrar_previsoes(previsoes, [Predicado('Over 2.5 FT', '!=', 55.0),
+                                             Predicado('Liga', 'em', ("GT 12 Min", "Volta 6 Min"))])
+    assert list(filtrado['Jogo']) == ["A x B", "I x J"]
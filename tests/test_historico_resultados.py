@@ -0,0 +1,89 @@
+import pandas as pd
+
+from nucleo import COLUNAS_RESULTADOS, HistoricoResultados
+
+
+def caminho_db(tmp_path) -> str:
+    return str(tmp_path / "historico.db")
+
+
+def test_anexar_nao_duplica_jogos(tmp_path, montar_historico):
+    historico = HistoricoResultados(caminho_db(tmp_path))
+    pagina = montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1"),
+        ("2026-10-01 11:00", "GT 12 Min", "Ana", "Caio", "0-0", "0-1"),
+    ])
+    assert historico.anexar(pagina) == 2
+    assert historico.anexar(pagina) == 0
+    assert historico.ultimos_anexados.empty
+
+    seguinte = montar_historico([
+        ("2026-10-01 11:00", "GT 12 Min", "Ana", "Caio", "0-0", "0-1"),
+        ("2026-10-01 12:00", "GT 12 Min", "Bia", "Caio", "1-1", "2-2"),
+    ])
+    assert historico.anexar(seguinte) == 1
+    assert list(historico.ultimos_anexados['Mandante']) == ["Bia"]
+    assert len(historico.obter_resultados()) == 3
+
+
+def test_duplicados_dentro_do_mesmo_lote(tmp_path, montar_historico):
+    historico = HistoricoResultados(caminho_db(tmp_path))
+    jogo = ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1")
+    assert historico.anexar(montar_historico([jogo, jogo])) == 1
+
+
+def test_completa_placar_pendente(tmp_path, montar_historico):
+    historico = HistoricoResultados(caminho_db(tmp_path))
+    assert historico.anexar(montar_historico([("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", None)])) == 1
+    assert not historico.obter_resultados()['Válido'].iloc[0]
+
+    # O mesmo jogo agora com placar final: não é novo, mas entra em ultimos_anexados e passa a valer
+    completo = montar_historico([("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1")])
+    assert historico.anexar(completo) == 0
+    assert len(historico.ultimos_anexados) == 1
+    df = historico.obter_resultados()
+    assert len(df) == 1
+    assert df['Válido'].iloc[0]
+    assert (df['Mandante FT'].iloc[0], df['Visitante FT'].iloc[0]) == (2, 1)
+
+    # Placar vazio de novo não apaga o que já foi gravado
+    pendente = montar_historico([("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", None)])
+    assert historico.anexar(pendente) == 0
+    assert historico.obter_resultados()['Válido'].iloc[0]
+
+
+def test_persiste_entre_instancias(tmp_path, montar_historico):
+    HistoricoResultados(caminho_db(tmp_path)).anexar(montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1"),
+        ("2026-10-01 12:00", "Volta 6 Min", "Davi", "Eva", "0-0", "3-0"),
+    ]))
+    df = HistoricoResultados(caminho_db(tmp_path)).obter_resultados()
+    assert [str(data) for data in df['Data']] == ["2026-10-01 12:00:00", "2026-10-01 10:00:00"]
+    assert list(df['Total FT']) == [3, 3]
+
+
+def test_lote_vazio_ou_sem_colunas(tmp_path, montar_historico):
+    historico = HistoricoResultados(caminho_db(tmp_path))
+    assert historico.anexar(pd.DataFrame(columns=COLUNAS_RESULTADOS)) == 0
+    assert historico.anexar(montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1")
+    ]).drop(columns=['Liga'])) == 0
+
+
+def test_rele_o_que_outro_processo_gravou(tmp_path, montar_historico):
+    app = HistoricoResultados(caminho_db(tmp_path))
+    app.anexar(montar_historico([("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1")]))
+    anterior = app.obter_resultados()
+    assert app.versao == 0 and app.obter_resultados() is anterior
+
+    coletor = HistoricoResultados(caminho_db(tmp_path))
+    coletor.anexar(montar_historico([("2026-09-30 08:00", "Volta 6 Min", "Davi", "Eva", "0-0", "3-0")]))
+
+    df = app.obter_resultados()
+    assert app.versao == 1
+    assert list(df['Mandante']) == ["Ana", "Davi"]
+
+    # O que a própria instância grava não conta como alteração externa
+    app.anexar(montar_historico([("2026-10-01 11:00", "GT 12 Min", "Bia", "Ana", "0-1", "1-1")]))
+    assert app.versao == 1
+    assert len(app.obter_resultados()) == 3
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from nucleo import IndiceJogos, obter_confrontos_diretos, obter_ultimos_jogos_gerais
+
+
+@pytest.fixture
+def historico(montar_historico):
+    # Fora de ordem de propósito: o índice ordena por Data, não pela posição da linha
+    return montar_historico([
+        ("2026-10-01 10:00", "GT 12 Min", "Ana", "Bia", "1-0", "2-1"),
+        ("2026-10-01 12:00", "GT 12 Min", "Bia", "Ana", "0-0", "1-1"),
+        ("2026-10-01 11:00", "GT 12 Min", "Ana", "Caio", "1-1", "3-2"),
+        ("2026-10-01 09:00", "GT 12 Min", "Caio", "Bia", "0-1", "0-2"),
+        ("2026-10-01 13:00", "GT 12 Min", "Ana", "Bia", None, None),
+    ])
+
+
+def datas(df: pd.DataFrame) -> list:
+    return [str(data) for data in df['Data']]
+
+
+def test_ultimos_jogos_mais_recentes_primeiro(historico):
+    indice = IndiceJogos(historico)
+    assert datas(indice.ultimos_jogos("Ana", 3)) == [
+        "2026-10-01 13:00:00", "2026-10-01 12:00:00", "2026-10-01 11:00:00"
+    ]
+    assert len(indice.ultimos_jogos("Caio", 10)) == 2
+
+
+def test_confrontos_em_qualquer_mando(historico):
+    indice = IndiceJogos(historico)
+    assert datas(indice.confrontos("Ana", "Bia", 10)) == [
+        "2026-10-01 13:00:00", "2026-10-01 12:00:00", "2026-10-01 10:00:00"
+    ]
+    assert datas(indice.confrontos("Bia", "Ana", 2)) == ["2026-10-01 13:00:00", "2026-10-01 12:00:00"]
+
+
+def test_jogador_desconhecido_ou_sem_confrontos(historico):
+    indice = IndiceJogos(historico)
+    assert indice.ultimos_jogos("Zeca", 5).empty
+    assert indice.confrontos("Ana", "Zeca", 5).empty
+    assert indice.confrontos("Bia", "Bia", 5).empty
+
+
+def test_historico_vazio():
+    indice = IndiceJogos(pd.DataFrame())
+    assert len(indice.posicoes_jogador("Ana")) == 0
+    assert len(indice.posicoes_confronto("Ana", "Bia")) == 0
+
+
+def test_excluir_jogos_ja_usados(historico):
+    indice = IndiceJogos(historico)
+    confrontos = indice.confrontos("Ana", "Bia", 2)
+    assert datas(indice.ultimos_jogos("Ana", 2, excluir=confrontos)) == [
+        "2026-10-01 11:00:00", "2026-10-01 10:00:00"
+    ]
+
+
+def test_mesmo_resultado_que_a_busca_sem_indice(historico):
+    indice = IndiceJogos(historico)
+    for jogador in ["Ana", "Bia", "Caio"]:
+        assert obter_ultimos_jogos_gerais(jogador, historico, 3, indice=indice).index.equals(
+            obter_ultimos_jogos_gerais(jogador, historico, 3).index)
+    assert obter_confrontos_diretos("Ana", "Bia", historico, 5, indice=indice).index.equals(
+        obter_confrontos_diretos("Ana", "Bia", historico, 5).index)
+
+
+def test_assinatura_muda_so_com_jogos_dos_jogadores(historico, montar_historico):
+    assinatura = IndiceJogos(historico).assinatura_partida("Ana", "Bia")
+    assert IndiceJogos(historico.copy()).assinatura_partida("Ana", "Bia") == assinatura
+
+    outro_jogo = montar_historico([("2026-10-01 14:00", "GT 12 Min", "Davi", "Eva", "0-0", "1-0")])
+    com_outro = pd.concat([historico, outro_jogo], ignore_index=True)
+    assert IndiceJogos(com_outro).assinatura_partida("Ana", "Bia") == assinatura
+
+    novo_da_ana = montar_historico([("2026-10-01 14:00", "GT 12 Min", "Ana", "Eva", "0-0", "1-0")])
+    com_novo = pd.concat([historico, novo_da_ana], ignore_index=True)
+    assert IndiceJogos(com_novo).assinatura_partida("Ana", "Bia") != assinatura
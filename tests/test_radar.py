@@ -0,0 +1,37 @@
+import pandas as pd
+
+from app import RadarIncremental
+
+AGORA = pd.Timestamp("2026-10-01 12:30")
+
+
+def jogos(montar_historico, inicio: int, fim: int) -> pd.DataFrame:
+    """Um jogo por minuto a partir das 12:00 (minutos [inicio, fim)), placares variados"""
+    return montar_historico([
+        (f"2026-10-01 12:{minuto:02d}", "GT 12 Min", f"J{minuto % 4}", f"J{(minuto + 1) % 4}",
+         f"{minuto % 2}-{minuto % 3}", f"{minuto % 4}-{minuto % 3}")
+        for minuto in range(inicio, fim)
+    ])
+
+
+def test_ingerir_equivale_a_carregar_tudo(montar_historico):
+    radar = RadarIncremental()
+    radar.carregar(jogos(montar_historico, 0, 20), agora=AGORA)
+    radar.ingerir(jogos(montar_historico, 20, 30))
+
+    completo = RadarIncremental()
+    completo.carregar(jogos(montar_historico, 0, 30), agora=AGORA)
+    pd.testing.assert_frame_equal(radar.tabela(agora=AGORA), completo.tabela(agora=AGORA))
+
+
+def test_jogo_repetido_nao_conta_duas_vezes(montar_historico):
+    radar = RadarIncremental()
+    radar.carregar(jogos(montar_historico, 0, 20), agora=AGORA)
+    antes = radar.tabela(agora=AGORA)
+
+    radar.ingerir(jogos(montar_historico, 10, 20))
+    pd.testing.assert_frame_equal(radar.tabela(agora=AGORA), antes)
+
+    radar.ingerir(jogos(montar_historico, 20, 21))
+    radar.ingerir(jogos(montar_historico, 20, 21))
+    assert radar.tabela(agora=AGORA).set_index('Janela').loc["Últimos 50", 'Jogos'] == 21